@@ -1,10 +1,19 @@
 import pytest
 import logging
 import os
+import json
+import allure
 import http.client as http_client
 from datetime import datetime
-from core import ROOT_WORKING_DIRECTORY, LOGS_FOLDER
-from helpers import HelperPosts, HelperComments, HelperProfile, HelperPerformance
+from core import (ROOT_WORKING_DIRECTORY, LOGS_FOLDER, JSON_SERVER_STUB, JSON_SERVER_STUB_LATENCY,
+                  JSON_SERVER_STUB_RATE_LIMIT, JSON_SERVER_STUB_ERROR_RATE, connection_stats, latency_recorder,
+                  LatencyRecorder, phase_recorder, PhaseRecorder, BenchmarkBaseline, LogPipeline, merge_worker_logs,
+                  DURATION_SCHEDULING, DurationScheduling, duration_history, RESPONSE_CACHE, response_cache,
+                  rate_governor, retry_policy, LIVE_METRICS, LIVE_METRICS_PORT, LIVE_METRICS_FILE, live_metrics,
+                  MetricsExporter, SAMPLE_STORE, SampleStore, shared_sample_store, sample_export_format)
+from helpers import (HelperPosts, HelperComments, HelperProfile, HelperPerformance, HelperBenchmark, PayloadPool,
+                     shared_payload_pool, close_shared_payload_pool, LeasedDataPool)
+from stub_server import JsonServerStub, stub_address_from_base_url
 from faker import Faker
 
 
@@ -30,44 +39,120 @@ def pytest_configure(config):
     else:
         log_file = os.environ["PYTEST_LOG_FILE"]  # all the other workers use the same file
 
+    # the per-run paths are named after the log file, so a preset PYTEST_LOG_FILE gets them too;
+    # xdist workers inherit the controller's values
+    run_name = os.path.splitext(log_file)[0]
+    os.environ.setdefault("PYTEST_LOG_WORKER_DIR", f"{run_name}-workers")
+    os.environ.setdefault("PYTEST_LATENCY_DIR", f"{run_name}-latency")
+    os.environ.setdefault("PYTEST_PAYLOAD_POOL", f"{run_name}-payloads.bin")
+    os.environ.setdefault("PYTEST_LIVE_METRICS_DIR", f"{run_name}-live-metrics")
+    os.environ.setdefault("PYTEST_SAMPLE_STORE_DIR", f"{run_name}-samples")
+
+    # every process (xdist worker) logs through a queue into its own file; the files are merged
+    # into PYTEST_LOG_FILE when the session ends
+    worker = os.getenv("PYTEST_XDIST_WORKER", "master")
     logger = logging.getLogger("pytest-logger")
-    logger.setLevel(logging.DEBUG)
 
     if not logger.handlers:
-        file_handler = logging.FileHandler(log_file, encoding="utf-8")
-        file_formatter = logging.Formatter('%(asctime)s [%(levelname)s] %(message)s')
-        file_handler.setFormatter(file_formatter)
-        file_handler.setLevel(logging.DEBUG)
-        logger.addHandler(file_handler)
-
-        console_handler = logging.StreamHandler()
-        console_formatter = logging.Formatter('%(asctime)s [%(levelname)s] %(message)s')
-        console_handler.setFormatter(console_formatter)
-        console_handler.setLevel(logging.DEBUG)
-        logger.addHandler(console_handler)
+        config.log_pipeline = LogPipeline(os.path.join(os.environ["PYTEST_LOG_WORKER_DIR"], f"{worker}.log"),
+                                          worker)
+        config.log_pipeline.attach(logger)
 
         for ext_logger_name in ["urllib3", "requests", "http.client"]:
-            ext_logger = logging.getLogger(ext_logger_name)
-            ext_logger.setLevel(logging.DEBUG)
-            ext_logger.addHandler(file_handler)
+            ext_logger = config.log_pipeline.attach(logging.getLogger(ext_logger_name))
             ext_logger.propagate = False  # Avoid double logging
+        config.log_pipeline.start()
 
     pytest.logger = logger
 
-    # register a custom marker: flaky + regression
+    # serve BASE_URL from the in-process json-server stub instead of the Node container.
+    # Only the controller process starts it; xdist workers inherit the address through BASE_URL.
+    if JSON_SERVER_STUB and not hasattr(config, "workerinput"):
+        host, port = stub_address_from_base_url()
+        rate_limit = tuple(float(value) for value in JSON_SERVER_STUB_RATE_LIMIT.split(":")) \
+            if JSON_SERVER_STUB_RATE_LIMIT else None
+        config.json_server_stub = JsonServerStub(host=host, port=port, latency=JSON_SERVER_STUB_LATENCY,
+                                                 rate_limit=rate_limit, error_rate=JSON_SERVER_STUB_ERROR_RATE)
+        config.json_server_stub.start()
+        logger.info(f"Serving {config.json_server_stub.base_url} from the in-process json-server stub")
+
+    # generate the payloads of the whole session once; xdist workers map the same file
+    if not hasattr(config, "workerinput"):
+        PayloadPool.build(os.environ["PYTEST_PAYLOAD_POOL"])
+
+    # every process publishes its request counters each second; the controller merges them into
+    # one OpenMetrics endpoint (LIVE_METRICS_PORT) and file, so long load runs can be watched live
+    if LIVE_METRICS:
+        live_metrics.start_publisher()
+        if not hasattr(config, "workerinput"):
+            config.metrics_exporter = MetricsExporter(port=LIVE_METRICS_PORT, file_path=LIVE_METRICS_FILE)
+            if config.metrics_exporter.start():
+                logger.info(f"[Live Metrics] serving {config.metrics_exporter.url}, also written to {LIVE_METRICS_FILE}")
+            else:
+                logger.warning(f"[Live Metrics] port {LIVE_METRICS_PORT} unavailable, only writing {LIVE_METRICS_FILE}")
+
+    # check the sample export up front, so a missing pyarrow is known before the run, not at its end
+    if SAMPLE_STORE and not hasattr(config, "workerinput"):
+        config.sample_export_format, warning = sample_export_format()
+        if warning:
+            logger.warning(f"[Sample Store] {warning}")
+
+    # register a custom marker: flaky + regression. Reruns follow --reruns / --reruns-delay (pytest.ini: once,
+    # without delay), since transient HTTP failures are already retried per request
     config.addinivalue_line("markers", "flaky_regression: Combines regression + flaky retry for unstable tests")
-    setattr(pytest.mark, "flaky_regression",
-            pytest.mark.regression(pytest.mark.flaky(reruns=3, reruns_delay=1)))
+    flaky = pytest.mark.flaky(reruns=config.getoption("reruns", 1) or 0,
+                              reruns_delay=config.getoption("reruns_delay", 0) or 0)
+    setattr(pytest.mark, "flaky_regression", lambda test: pytest.mark.regression(flaky(test)))
+
+
+def pytest_unconfigure(config):
+    stub = getattr(config, "json_server_stub", None)
+    if stub:
+        stub.stop()
+
+    # workers publish their final counts before the controller, which waits for them, exports the totals
+    live_metrics.stop_publisher()
+    metrics_exporter = getattr(config, "metrics_exporter", None)
+    if metrics_exporter:
+        metrics_exporter.stop()
 
+    log_pipeline = getattr(config, "log_pipeline", None)
+    if log_pipeline:
+        log_pipeline.stop()
+    # the payload pool is only needed while tests run; the workers have exited by now, so the
+    # controller removes it rather than leaving a file per session in the uploaded output folder
+    close_shared_payload_pool()
+    if not hasattr(config, "workerinput"):
+        merge_worker_logs(os.environ["PYTEST_LOG_WORKER_DIR"], os.environ["PYTEST_LOG_FILE"])
+        if os.path.exists(os.environ["PYTEST_PAYLOAD_POOL"]):
+            os.remove(os.environ["PYTEST_PAYLOAD_POOL"])
 
+
+@pytest.hookimpl(hookwrapper=True)
 def pytest_runtest_call(item):
     """
-    Hook to log test docstrings before execution.
+    Hook to log test docstrings before execution and to attach the phase timings
+    of the slowest requests sent by the test, and its request-level retries, to its Allure report.
+    The retry count is also kept as the `request_retries` user property (JUnit XML / HTML report).
     """
     test_docstring = item.function.__doc__
     if test_docstring:
         pytest.logger.info(f"\nRunning Test: {item.name}\n{test_docstring.strip()}\n")
 
+    phase_recorder.reset_slowest()
+    retry_policy.reset_events()
+    yield
+    slowest = phase_recorder.slowest()
+    if slowest:
+        allure.attach(json.dumps(slowest, indent=2), name="Slowest requests by phase",
+                      attachment_type=allure.attachment_type.JSON)
+    retries = retry_policy.events()
+    item.user_properties.append(("request_retries", len(retries)))
+    if retries:
+        pytest.logger.warning(f"[Retries] {item.name} | {len(retries)} request retries")
+        allure.attach(json.dumps(retries, indent=2), name="Request retries",
+                      attachment_type=allure.attachment_type.JSON)
+
 
 def pytest_collection_modifyitems(session, config, items):
     """
@@ -76,12 +161,16 @@ def pytest_collection_modifyitems(session, config, items):
       - Within both smoke and other tests:
           - Tests are sorted in the following order:
             profile -> posts -> comments -> e2e -> performance
+      - On xdist workers with DURATION_SCHEDULING, tests within both groups are instead sorted
+        longest first by their duration in previous runs (area order breaks ties), which is the
+        order `DurationScheduling` hands them out in.
       """
+    longest_first = DURATION_SCHEDULING and hasattr(config, "workerinput")
 
     def get_priority(item):
         """
         Returns a tuple used for sorting:
-        (is_smoke, area_priority)
+        (is_smoke, predicted duration, area_priority)
         where smaller values run earlier.
         """
         is_smoke = "smoke" in item.keywords
@@ -97,7 +186,8 @@ def pytest_collection_modifyitems(session, config, items):
             area = 4
         else:
             area = 99  # unknown, put last
-        return not is_smoke, area  # smoke tests first (False < True), then area
+        duration = -duration_history.predict(item.nodeid) if longest_first else 0
+        return not is_smoke, duration, area  # smoke tests first (False < True), then longest, then area
 
     items.sort(key=get_priority)
     pytest.logger.info("Final test execution order:")
@@ -105,11 +195,164 @@ def pytest_collection_modifyitems(session, config, items):
         pytest.logger.info(f" - {item.nodeid}")
 
 
+@pytest.hookimpl(optionalhook=True)
+def pytest_xdist_make_scheduler(config, log):
+    """
+    Distributes tests longest-processing-time-first based on the durations of previous runs.
+    Only replaces the default `--dist load` scheduler; other `--dist` modes are left to xdist.
+    """
+    if not DURATION_SCHEDULING or config.getoption("dist") != "load":
+        return None
+    config.duration_scheduler = DurationScheduling(config, log)
+    return config.duration_scheduler
+
+
+def pytest_runtest_logreport(report):
+    """
+    Collects the setup, call and teardown durations of every test. With xdist the controller
+    receives the reports of all workers, so only it records them.
+    """
+    if not os.getenv("PYTEST_XDIST_WORKER"):
+        duration_history.record(report.nodeid, report.duration)
+
+
+def pytest_sessionfinish(session, exitstatus):
+    """
+    Logs the keep-alive connection reuse of this process (one line per xdist worker) and dumps its
+    latency histograms. The controller process (or the only process without xdist) merges the dumps
+    of all workers into one latency report.
+    """
+    stats = connection_stats.snapshot()
+    pytest.logger.info(
+        f"[Connection Pool] worker={stats['worker']} | {stats['requests_sent']} requests | "
+        f"{stats['new_connections']} new connections | {stats['reused_connections']} reused"
+    )
+    if RESPONSE_CACHE and response_cache.hits + response_cache.revalidations + response_cache.misses:
+        pytest.logger.info(f"[Response Cache] worker={stats['worker']} | {response_cache.format_stats()}")
+    if retry_policy.requests:
+        pytest.logger.info(f"[Retries] worker={stats['worker']} | {retry_policy.format_stats()}")
+    if rate_governor.enabled and rate_governor.stats():
+        pytest.logger.info(f"[Rate Governor] worker={stats['worker']} | {rate_governor.format_stats()}")
+
+    data_pool = getattr(session.config, "test_data_pool", None)
+    if hasattr(session.config, "workerinput"):
+        if data_pool:
+            pytest.logger.info(
+                f"[Test Data Pool] worker={stats['worker']} | {LeasedDataPool.format_stats(data_pool.stats())}"
+            )
+        session.config.workeroutput["test_data_pool"] = data_pool.stats() if data_pool else {}
+    else:
+        pool_stats = [data_pool.stats()] if data_pool else []
+        pool_stats += [worker_stats for worker_stats in getattr(session.config, "worker_data_pool_stats", [])
+                       if worker_stats]
+        if pool_stats:
+            totals = {key: sum(worker_stats[key] for worker_stats in pool_stats) for key in pool_stats[0]}
+            pytest.logger.info(f"[Test Data Pool] all workers | {LeasedDataPool.format_stats(totals)}")
+
+        duration_history.save()
+        scheduler = getattr(session.config, "duration_scheduler", None)
+        if scheduler:
+            pytest.logger.info(f"[Scheduling] {scheduler.summary()}")
+
+    latency_dir = os.environ["PYTEST_LATENCY_DIR"]
+    latency_recorder.dump(os.path.join(latency_dir, "workers", f"{stats['worker']}.json"))
+    phase_recorder.dump(os.path.join(latency_dir, "phases", f"{stats['worker']}.json"))
+    if not hasattr(session.config, "workerinput"):
+        write_latency_report(latency_dir)
+
+    # after the latency reports, so a failing export cannot cost the other artifacts
+    if SAMPLE_STORE:
+        shared_sample_store().flush()
+        if not hasattr(session.config, "workerinput"):
+            export_samples(os.environ["PYTEST_SAMPLE_STORE_DIR"], session.config.sample_export_format)
+
+    # write out the queued records, the controller merges the worker log files once all workers finished
+    log_pipeline = getattr(session.config, "log_pipeline", None)
+    if log_pipeline:
+        log_pipeline.flush()
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error):
+    """
+    Collects the test data pool statistics each xdist worker sends back when it finishes.
+    """
+    node.config.worker_data_pool_stats = getattr(node.config, "worker_data_pool_stats", [])
+    node.config.worker_data_pool_stats.append(getattr(node, "workeroutput", {}).get("test_data_pool"))
+
+
+def export_samples(sample_dir, export_format):
+    """
+    Exports the per-request samples of all workers and load processes as `<sample_dir>.npz` or
+    `.parquet` (see SAMPLE_STORE_EXPORT). A failed export is logged; the samples stay in `sample_dir`.
+    """
+    samples = SampleStore.load(sample_dir)
+    try:
+        pytest.logger.info(f"[Sample Store] {len(samples)} request samples in {sample_dir}")
+        path = samples.export(sample_dir, export_format)
+        if path:
+            pytest.logger.info(f"[Sample Store] exported to {path}")
+    except (ImportError, OSError) as e:
+        pytest.logger.warning(f"[Sample Store] {export_format} export failed: {e}")
+    finally:
+        samples.close()
+
+
+def write_latency_report(latency_dir):
+    """
+    Merges the latency and request phase histograms of all workers, writes the percentiles as
+    JSON artifacts and attaches them to the Allure report.
+    """
+    report = LatencyRecorder.load_and_merge(os.path.join(latency_dir, "workers")).report()
+    report_body = json.dumps(report, indent=2)
+    report_path = os.path.join(latency_dir, "latency_report.json")
+    with open(report_path, "w", encoding="utf-8") as f:
+        f.write(report_body)
+
+    allure.global_attach(report_body, name="Latency percentiles per endpoint",
+                         attachment_type=allure.attachment_type.JSON)
+    for endpoint, statuses in report.items():
+        for status, summary in statuses.items():
+            pytest.logger.info(
+                f"[Latency] {endpoint} {status} | count={summary['count']} | p50={summary['p50_ms']}ms | "
+                f"p99={summary['p99_ms']}ms | max={summary['max_ms']}ms"
+            )
+    pytest.logger.info(f"Latency report written to {report_path}")
+
+    phase_report = PhaseRecorder.load_and_merge(os.path.join(latency_dir, "phases")).report()
+    phase_report_body = json.dumps(phase_report, indent=2)
+    phase_report_path = os.path.join(latency_dir, "phase_report.json")
+    with open(phase_report_path, "w", encoding="utf-8") as f:
+        f.write(phase_report_body)
+
+    allure.global_attach(phase_report_body, name="Request phase percentiles per endpoint",
+                         attachment_type=allure.attachment_type.JSON)
+    for endpoint, phases in phase_report.items():
+        pytest.logger.info(f"[Phases] {endpoint} | " + " | ".join(
+            f"{phase} p50={summary['p50_ms']}ms p99={summary['p99_ms']}ms" for phase, summary in phases.items()))
+    pytest.logger.info(f"Phase report written to {phase_report_path}")
+
+
 @pytest.fixture(scope="session")
 def faker_fixture():
     return Faker()
 
 
+@pytest.fixture(scope="session")
+def payload_pool():
+    return shared_payload_pool()
+
+
+@pytest.fixture(scope="session")
+def test_data_pool(request, helper_posts, helper_comments, payload_pool):
+    """
+    Posts and comments leased to tests instead of created per test, see `LeasedDataPool`.
+    """
+    pool = LeasedDataPool(helper_posts, helper_comments, payload_pool)
+    request.config.test_data_pool = pool
+    yield pool
+
+
 @pytest.fixture(scope='session')
 def helper_posts():
     yield HelperPosts()
@@ -128,3 +371,33 @@ def helper_profile():
 @pytest.fixture(scope='session')
 def helper_performance():
     yield HelperPerformance()
+
+
+@pytest.fixture(scope='session')
+def helper_benchmark():
+    yield HelperBenchmark()
+
+
+@pytest.fixture(scope='session')
+def benchmark_baseline():
+    yield BenchmarkBaseline()
+
+
+@pytest.fixture
+def json_server_stub_factory():
+    """
+    Starts dedicated json-server stubs on free ports, e.g. with injected latency or rate limiting:
+        stub = json_server_stub_factory(rate_limit=(20, 5))
+        helper = HelperPerformance(base_url=stub.base_url)
+    """
+    stubs = []
+
+    def start_stub(**options):
+        stub = JsonServerStub(**options)
+        stub.start()
+        stubs.append(stub)
+        return stub
+
+    yield start_stub
+    for stub in stubs:
+        stub.stop()
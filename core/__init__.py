@@ -1,2 +1,19 @@
 from .constants import *
-from .request_dispatcher import http_request
+from .request_dispatcher import (http_request, configure_session_pool, connection_stats, async_http_request,
+                                 close_async_session, async_session_pool)
+from .load_scheduler import ConstantArrivalRateScheduler, ClosedLoopRunner, LoadResult, RequestSample
+from .latency_histogram import LatencyHistogram, LatencyRecorder, latency_recorder
+from .phase_timing import RequestPhases, PhaseRecorder, phase_recorder, PHASES
+from .benchmark_baseline import BenchmarkBaseline, MissingBaselineWarning
+from . import json_codec
+from .json_codec import LazyJson, JSON_BACKEND
+from .log_pipeline import LogPipeline, RequestLogSampler, request_log_sampler, merge_worker_logs, PER_REQUEST
+from .duration_scheduling import DurationHistory, DurationScheduling, duration_history
+from .response_cache import ResponseCache, CachedResponse, response_cache
+from .rate_governor import RateGovernor, EndpointBudget, rate_governor, parse_rate_spec, retry_after_seconds
+from .retry_policy import RetryPolicy, retry_policy, RETRYABLE_ERRORS, RETRYABLE_STATUSES, IDEMPOTENT_METHODS
+from .resource_monitor import ResourceMonitor, SoakResult, trend_slope, parse_drift_limits, server_pid
+from .capacity_search import CapacitySearch, CapacityResult, latency_knee, error_rate
+from .live_metrics import LiveMetrics, MetricsExporter, live_metrics, render_openmetrics, merge_snapshots
+from .sample_store import (SampleStore, SampleColumns, shared_sample_store, sample_export_format, COLUMNS,
+                           ENDPOINTS)
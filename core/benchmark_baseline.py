@@ -0,0 +1,124 @@
+import os
+import json
+import warnings
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from .constants import BENCHMARK_BASELINE_FILE, BENCHMARK_TOLERANCE, BENCHMARK_REQUIRE_BASELINE
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
+
+BASELINE_FORMAT_VERSION = 1
+
+
+@contextmanager
+def _file_lock(path):
+    """Exclusive lock on `path` across processes: flock on POSIX, a locked byte on Windows."""
+    with open(path, "a+") as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        elif msvcrt is not None:
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)  # retries for up to 10s
+        try:
+            yield
+        finally:
+            if fcntl is None and msvcrt is not None:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class MissingBaselineWarning(UserWarning):
+    """A benchmark was checked without a recorded baseline, so it gated nothing."""
+
+
+class BenchmarkBaseline:
+    """
+    Versioned JSON file holding the reference p95 latency and throughput of every benchmark.
+    A benchmark regresses when its p95 grows, or its throughput drops, by more than `tolerance`
+    (a fraction, 0.2 = 20%) compared to the stored baseline.
+
+    A benchmark without a baseline cannot regress: it raises a `MissingBaselineWarning`, listed in
+    pytest's warnings summary, or fails the check when `require` (BENCHMARK_REQUIRE_BASELINE) is set.
+    """
+    def __init__(self, path=BENCHMARK_BASELINE_FILE, tolerance=BENCHMARK_TOLERANCE, require=BENCHMARK_REQUIRE_BASELINE):
+        self.path = path
+        self.tolerance = tolerance
+        self.require = require
+        self.benchmarks = self._read().get("benchmarks", {})
+
+    def _read(self):
+        if not os.path.exists(self.path):
+            return {"version": BASELINE_FORMAT_VERSION, "benchmarks": {}}
+        with open(self.path, encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != BASELINE_FORMAT_VERSION:
+            raise ValueError(f"Unsupported baseline format version {data.get('version')} in {self.path}. "
+                             f"Expected {BASELINE_FORMAT_VERSION}")
+        return data
+
+    def get(self, name):
+        return self.benchmarks.get(name)
+
+    def check(self, name, result):
+        """
+        Args:
+            name (str): Benchmark name, e.g. a `BlogApiEndpointKeys` value.
+            result (LoadResult): Outcome of the benchmark run.
+
+        Returns:
+            List[str]: One message per regressed metric, or for the missing baseline when it is required.
+            Empty when within tolerance.
+        """
+        baseline = self.get(name)
+        if not baseline:
+            message = (f"{name}: no baseline recorded in {self.path}, "
+                       f"run with BENCHMARK_UPDATE_BASELINE=true and commit the file to gate it")
+            if self.require:
+                return [message]
+            warnings.warn(message, MissingBaselineWarning, stacklevel=2)
+            return []
+
+        regressions = []
+        p95_ms = result.latency_percentile(95) * 1000
+        max_p95_ms = baseline["p95_ms"] * (1 + self.tolerance)
+        if p95_ms > max_p95_ms:
+            regressions.append(f"{name}: p95 {p95_ms:.2f}ms exceeds baseline {baseline['p95_ms']:.2f}ms "
+                               f"(+{self.tolerance:.0%} allowed)")
+
+        min_throughput = baseline["throughput_rps"] * (1 - self.tolerance)
+        if result.achieved_rate < min_throughput:
+            regressions.append(f"{name}: throughput {result.achieved_rate:.1f} rps is below baseline "
+                               f"{baseline['throughput_rps']:.1f} rps (-{self.tolerance:.0%} allowed)")
+        return regressions
+
+    def update(self, name, result):
+        """
+        Stores `result` as the new baseline of `name`. The file is locked for the read-modify-write,
+        so xdist workers updating different benchmarks at once do not overwrite each other, and
+        replaced atomically, so a reader never sees it half written.
+        """
+        entry = {
+            "p95_ms": round(result.latency_percentile(95) * 1000, 3),
+            "throughput_rps": round(result.achieved_rate, 2),
+            "requests": result.total,
+            "recorded_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        }
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with _file_lock(f"{self.path}.lock"):
+            data = self._read()
+            data["benchmarks"][name] = entry
+            data["benchmarks"] = dict(sorted(data["benchmarks"].items()))
+            with open(f"{self.path}.tmp", "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2)
+                f.write("\n")
+            os.replace(f"{self.path}.tmp", self.path)
+        self.benchmarks[name] = entry
+        return entry
@@ -0,0 +1,133 @@
+from .constants import (HTTPStatusCodes, CAPACITY_SLO_P99_MS, CAPACITY_MAX_ERROR_RATE, CAPACITY_START_RPS,
+                        CAPACITY_MAX_RPS, CAPACITY_STEP_FACTOR, CAPACITY_PRECISION)
+
+
+def error_rate(result):
+    """Share of the samples of `result` that failed: 429s, 5xx responses and requests without a response."""
+    if not result.total:
+        return 0.0
+    failed = sum(1 for sample in result.samples
+                 if sample.status_code is None or sample.status_code >= HTTPStatusCodes.INTERNAL_SERVER_ERROR.value
+                 or sample.status_code == HTTPStatusCodes.TOO_MANY_REQUESTS.value)
+    return failed / result.total
+
+
+def latency_knee(points):
+    """
+    Knee of a latency curve: the point farthest below the straight line from the first to the
+    last point, with both axes scaled to [0, 1]. Below the knee latency barely grows with the rate,
+    above it queueing takes over.
+
+    Args:
+        points (List[Tuple[float, float]]): (rate, latency) pairs.
+
+    Returns:
+        float: The rate at the knee, None with fewer than three points.
+    """
+    points = sorted(points)
+    if len(points) < 3:
+        return None
+    (x0, y0), (x1, y1) = points[0], points[-1]
+    if x1 == x0 or y1 == y0:
+        return None
+    distances = [((x - x0) / (x1 - x0)) - ((y - y0) / (y1 - y0)) for x, y in points]
+    index = max(range(len(points)), key=distances.__getitem__)
+    return points[index][0] if distances[index] > 0 else None
+
+
+class CapacityResult:
+    """
+    Outcome of a `CapacitySearch`: every measured step and `capacity_rps`, the highest rate that met
+    the SLO (None if even the start rate did not), plus the `knee_rps` of the latency curve.
+    """
+    def __init__(self, steps, slo_p99_ms, max_error_rate):
+        self.steps = steps
+        self.slo_p99_ms = slo_p99_ms
+        self.max_error_rate = max_error_rate
+        self.capacity_rps = max((step["rate"] for step in steps if step["passed"]), default=None)
+        self.knee_rps = latency_knee([(step["rate"], step["p99_ms"]) for step in steps])
+
+    def table(self):
+        lines = [f"{'phase':<7} {'rate':>8} {'achieved':>9} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}  result"]
+        for step in self.steps:
+            lines.append(f"{step['phase']:<7} {step['rate']:>8.1f} {step['achieved']:>9.1f} {step['p50_ms']:>8.1f} "
+                         f"{step['p99_ms']:>8.1f} {step['error_rate']:>7.1%}  {'ok' if step['passed'] else 'FAIL'}")
+        return "\n".join(lines)
+
+    def summary(self):
+        capacity = f"{self.capacity_rps:.1f} rps" if self.capacity_rps else "below the start rate"
+        knee = f"{self.knee_rps:.1f} rps" if self.knee_rps else "n/a"
+        return (f"capacity {capacity} | knee {knee} | SLO p99 <= {self.slo_p99_ms}ms, "
+                f"errors <= {self.max_error_rate:.1%} | {len(self.steps)} steps")
+
+
+class CapacitySearch:
+    """
+    Finds the highest sustainable arrival rate: the rate is ramped geometrically from `start_rps`
+    (x `step_factor` per step) until a step breaks the SLO, then the gap between the last passing
+    and the first failing rate is bisected until it is within `precision` of the passing rate.
+
+    A step passes when its p99 stays at or under `slo_p99_ms` and its `error_rate` (429, 5xx and
+    connection failures) under `max_error_rate`, and the client kept up with the target rate
+    (otherwise the load generator, not the server, was the limit).
+    """
+    MIN_ACHIEVED_FRACTION = 0.9
+
+    def __init__(self, run_step, slo_p99_ms=CAPACITY_SLO_P99_MS, max_error_rate=CAPACITY_MAX_ERROR_RATE,
+                 start_rps=CAPACITY_START_RPS, max_rps=CAPACITY_MAX_RPS, step_factor=CAPACITY_STEP_FACTOR,
+                 precision=CAPACITY_PRECISION):
+        """
+        Args:
+            run_step (Callable[[float], LoadResult]): Runs the workload at a given rate.
+        """
+        if step_factor <= 1:
+            raise ValueError(f"step_factor must be above 1, got {step_factor}")
+        self.run_step = run_step
+        self.slo_p99_ms = slo_p99_ms
+        self.max_error_rate = max_error_rate
+        self.start_rps = start_rps
+        self.max_rps = max_rps
+        self.step_factor = step_factor
+        self.precision = precision
+
+    def measure(self, rate, phase):
+        result = self.run_step(rate)
+        step = {
+            "phase": phase,
+            "rate": round(rate, 2),
+            "achieved": round(result.achieved_rate, 2),
+            "requests": result.total,
+            "p50_ms": round(result.latency_percentile(50) * 1000, 3),
+            "p99_ms": round(result.latency_percentile(99) * 1000, 3),
+            "error_rate": round(error_rate(result), 4),
+        }
+        step["passed"] = (step["p99_ms"] <= self.slo_p99_ms and step["error_rate"] <= self.max_error_rate
+                          and result.achieved_rate >= rate * self.MIN_ACHIEVED_FRACTION)
+        return step
+
+    def run(self):
+        """
+        Returns:
+            CapacityResult: The steps of the ramp and the bisection, and the capacity found.
+        """
+        steps = []
+        passing, failing = None, None
+        rate = self.start_rps
+        while rate <= self.max_rps:
+            steps.append(self.measure(rate, "ramp"))
+            if not steps[-1]["passed"]:
+                failing = rate
+                break
+            passing = rate
+            rate *= self.step_factor
+
+        if passing is not None and failing is not None:
+            while (failing - passing) > passing * self.precision:
+                rate = (passing + failing) / 2
+                steps.append(self.measure(rate, "search"))
+                if steps[-1]["passed"]:
+                    passing = rate
+                else:
+                    failing = rate
+
+        return CapacityResult(steps, self.slo_p99_ms, self.max_error_rate)
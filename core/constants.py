@@ -10,19 +10,82 @@ ROOT_WORKING_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file_
 LOGS_FOLDER = 'output'
 NONEXISTENT_ID = uuid.uuid4()
 EXTRA_FIELD = "extra_field"
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "50"))
+ASYNC_MAX_IN_FLIGHT = int(os.getenv("ASYNC_MAX_IN_FLIGHT", "1000"))
+LOAD_TARGET_RPS = float(os.getenv("LOAD_TARGET_RPS", "100"))
+LOAD_DURATION_SECONDS = float(os.getenv("LOAD_DURATION_SECONDS", "2"))
+BULK_MAX_PARALLEL = int(os.getenv("BULK_MAX_PARALLEL", "20"))
+PAYLOAD_POOL_SIZE = int(os.getenv("PAYLOAD_POOL_SIZE", "10000"))
+PAYLOAD_POOL_SEED = int(os.getenv("PAYLOAD_POOL_SEED", "42"))
+LOG_SAMPLE_EVERY = int(os.getenv("LOG_SAMPLE_EVERY", "100"))
+LOG_MAX_PER_SECOND = int(os.getenv("LOG_MAX_PER_SECOND", "20"))
+SLOWEST_REQUESTS_PER_TEST = int(os.getenv("SLOWEST_REQUESTS_PER_TEST", "5"))
+DURATION_SCHEDULING = os.getenv("DURATION_SCHEDULING", "true").lower() in ("1", "true", "yes")
+TEST_DURATIONS_FILE = os.getenv("TEST_DURATIONS_FILE",
+                                os.path.join(ROOT_WORKING_DIRECTORY, LOGS_FOLDER, "test_durations.json"))
+TEST_DURATION_SMOOTHING = float(os.getenv("TEST_DURATION_SMOOTHING", "0.5"))
+RESPONSE_CACHE = os.getenv("RESPONSE_CACHE", "false").lower() in ("1", "true", "yes")
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "1000"))
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "300"))
+RESPONSE_CACHE_FRESH_SECONDS = float(os.getenv("RESPONSE_CACHE_FRESH_SECONDS", "0"))
+CLIENT_RATE_LIMIT = os.getenv("CLIENT_RATE_LIMIT")  # "<requests per second>:<burst>" of every endpoint
+CLIENT_RATE_LIMIT_ENDPOINTS = os.getenv("CLIENT_RATE_LIMIT_ENDPOINTS")  # e.g. "GET_POSTS=20:5,CREATE_POST=5"
+CLIENT_BACKOFF_BASE = float(os.getenv("CLIENT_BACKOFF_BASE", "0.5"))
+CLIENT_BACKOFF_MAX = float(os.getenv("CLIENT_BACKOFF_MAX", "30"))
+RETRY_MAX_ATTEMPTS = int(os.getenv("RETRY_MAX_ATTEMPTS", "3"))
+RETRY_BACKOFF_BASE = float(os.getenv("RETRY_BACKOFF_BASE", "0.05"))
+RETRY_BACKOFF_MAX = float(os.getenv("RETRY_BACKOFF_MAX", "2"))
+RETRY_BUDGET_RATIO = float(os.getenv("RETRY_BUDGET_RATIO", "0.1"))
+RETRY_BUDGET_MIN = int(os.getenv("RETRY_BUDGET_MIN", "10"))
+RETRY_NON_IDEMPOTENT = os.getenv("RETRY_NON_IDEMPOTENT", "false").lower() in ("1", "true", "yes")
+SOAK_DURATION_SECONDS = float(os.getenv("SOAK_DURATION_SECONDS", "0"))  # 0 skips the soak test
+SOAK_WINDOW_SECONDS = float(os.getenv("SOAK_WINDOW_SECONDS", "60"))
+SOAK_RATE = float(os.getenv("SOAK_RATE", "20"))
+SOAK_MAX_SLOPES = os.getenv("SOAK_MAX_SLOPES")  # e.g. "p99_ms=30,client_rss_mb=10:5", see parse_drift_limits
+CAPACITY_SLO_P99_MS = float(os.getenv("CAPACITY_SLO_P99_MS", "200"))
+CAPACITY_MAX_ERROR_RATE = float(os.getenv("CAPACITY_MAX_ERROR_RATE", "0.01"))  # share of 429, 5xx and failed requests
+CAPACITY_START_RPS = float(os.getenv("CAPACITY_START_RPS", "10"))
+CAPACITY_MAX_RPS = float(os.getenv("CAPACITY_MAX_RPS", "2000"))
+CAPACITY_STEP_FACTOR = float(os.getenv("CAPACITY_STEP_FACTOR", "2"))
+CAPACITY_STEP_SECONDS = float(os.getenv("CAPACITY_STEP_SECONDS", "5"))
+CAPACITY_PRECISION = float(os.getenv("CAPACITY_PRECISION", "0.05"))
+LIVE_METRICS = os.getenv("LIVE_METRICS", "false").lower() in ("1", "true", "yes")
+LIVE_METRICS_PORT = int(os.getenv("LIVE_METRICS_PORT", "9464"))
+LIVE_METRICS_FILE = os.getenv("LIVE_METRICS_FILE", os.path.join(ROOT_WORKING_DIRECTORY, LOGS_FOLDER, "live_metrics.prom"))
+LIVE_METRICS_DIR = os.getenv("LIVE_METRICS_DIR", os.path.join(ROOT_WORKING_DIRECTORY, LOGS_FOLDER, "live-metrics"))
+LIVE_METRICS_INTERVAL = float(os.getenv("LIVE_METRICS_INTERVAL", "1"))
+SAMPLE_STORE = os.getenv("SAMPLE_STORE", "false").lower() in ("1", "true", "yes")
+SAMPLE_STORE_DIR = os.getenv("SAMPLE_STORE_DIR", os.path.join(ROOT_WORKING_DIRECTORY, LOGS_FOLDER, "samples"))
+SAMPLE_STORE_CHUNK = int(os.getenv("SAMPLE_STORE_CHUNK", "65536"))  # samples kept in memory before spilling
+SAMPLE_STORE_EXPORT = os.getenv("SAMPLE_STORE_EXPORT", "npz")  # npz, parquet or none, written when the session ends
+LOAD_PROCESSES = int(os.getenv("LOAD_PROCESSES", str(os.cpu_count() or 1)))
+JSON_SERVER_STUB = os.getenv("JSON_SERVER_STUB", "false").lower() in ("1", "true", "yes")
+JSON_SERVER_STUB_LATENCY = os.getenv("JSON_SERVER_STUB_LATENCY")  # e.g. "lognormal:5:0.5"
+JSON_SERVER_STUB_RATE_LIMIT = os.getenv("JSON_SERVER_STUB_RATE_LIMIT")  # "<requests per second>:<burst>"
+JSON_SERVER_STUB_ERROR_RATE = float(os.getenv("JSON_SERVER_STUB_ERROR_RATE", "0"))
+BENCHMARK_BASELINE_FILE = os.getenv("BENCHMARK_BASELINE_FILE",
+                                    os.path.join(ROOT_WORKING_DIRECTORY, "benchmarks", "baseline.json"))
+BENCHMARK_TOLERANCE = float(os.getenv("BENCHMARK_TOLERANCE", "0.2"))
+BENCHMARK_REQUESTS = int(os.getenv("BENCHMARK_REQUESTS", "200"))
+BENCHMARK_CONCURRENCY = int(os.getenv("BENCHMARK_CONCURRENCY", "10"))
+BENCHMARK_UPDATE_BASELINE = os.getenv("BENCHMARK_UPDATE_BASELINE", "false").lower() in ("1", "true", "yes")
+BENCHMARK_REQUIRE_BASELINE = os.getenv("BENCHMARK_REQUIRE_BASELINE", "false").lower() in ("1", "true", "yes")
 
 
 class HTTPStatusCodes(Enum):
     OK = 200
     CREATED = 201
     NO_CONTENT = 204
+    NOT_MODIFIED = 304
     BAD_REQUEST = 400
     UNAUTHORIZED = 401
     FORBIDDEN = 403
     NOT_FOUND = 404
     TOO_MANY_REQUESTS = 429
     INTERNAL_SERVER_ERROR = 500
+    BAD_GATEWAY = 502
     SERVICE_UNAVAILABLE = 503
+    GATEWAY_TIMEOUT = 504
 
 
 class PostFields(Enum):
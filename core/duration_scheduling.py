@@ -0,0 +1,124 @@
+import os
+import json
+import time
+import heapq
+from xdist.scheduler import LoadScheduling
+from .constants import TEST_DURATIONS_FILE, TEST_DURATION_SMOOTHING
+
+DEFAULT_TEST_DURATION = 1.0  # seconds, predicted for every test while there is no history at all
+
+
+class DurationHistory:
+    """
+    Per-test durations (setup + call + teardown, in seconds) of previous runs, keyed by node id.
+    Each run's durations are blended into the stored ones with `smoothing` (1.0 keeps only the
+    latest run), so one slow outlier does not reshuffle the next schedule.
+    """
+    def __init__(self, path=TEST_DURATIONS_FILE, smoothing=TEST_DURATION_SMOOTHING):
+        self.path = path
+        self.smoothing = smoothing
+        self.durations = self._read()
+        self.current = {}
+        self.default = sum(self.durations.values()) / len(self.durations) if self.durations \
+            else DEFAULT_TEST_DURATION
+
+    def _read(self):
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return {nodeid: float(seconds) for nodeid, seconds in json.load(f).items()}
+        except (ValueError, AttributeError):
+            return {}  # unreadable history only costs one run with the default prediction
+
+    def predict(self, nodeid):
+        return self.durations.get(nodeid, self.default)
+
+    def record(self, nodeid, seconds):
+        self.current[nodeid] = self.current.get(nodeid, 0.0) + seconds
+
+    def save(self):
+        if not self.current:
+            return
+        merged = dict(self.durations)
+        for nodeid, seconds in self.current.items():
+            previous = merged.get(nodeid)
+            merged[nodeid] = seconds if previous is None \
+                else self.smoothing * seconds + (1 - self.smoothing) * previous
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(f"{self.path}.tmp", "w", encoding="utf-8") as f:
+            json.dump({nodeid: round(seconds, 4) for nodeid, seconds in sorted(merged.items())}, f, indent=2)
+        os.replace(f"{self.path}.tmp", self.path)
+
+
+duration_history = DurationHistory()
+
+
+class DurationScheduling(LoadScheduling):
+    """
+    xdist scheduler for longest-processing-time-first distribution. Workers collect the tests
+    smoke first and then by predicted duration, longest first (see `pytest_collection_modifyitems`);
+    this scheduler hands them out in that order while keeping only two tests pending per worker
+    (the running one and the next), so whichever worker frees up first takes the longest test left
+    instead of a pre-assigned chunk.
+    """
+    PENDING_PER_NODE = 2  # a worker only runs a test once it knows the next one
+
+    def __init__(self, config, log=None, history=None):
+        super().__init__(config, log)
+        self.history = history or duration_history
+        self.predicted_makespan = None
+        self.started = None
+        self.finished = None
+        self.node_busy = {}
+
+    def schedule(self):
+        assert self.collection_is_completed
+        if self.collection is not None:
+            for node in self.nodes:
+                self.check_schedule(node)
+            return
+
+        if not self._check_nodes_have_same_collection():
+            self.log("**Different tests collected, aborting run**")
+            return
+
+        self.collection = next(iter(self.node2collection.values()))
+        self.pending[:] = range(len(self.collection))
+        self.predicted_makespan = self._predict_makespan(len(self.nodes))
+        self.started = time.monotonic()
+
+        # deal the first tests round-robin, so the longest ones start on different workers
+        for _ in range(self.PENDING_PER_NODE):
+            for node in self.nodes:
+                self._send_tests(node, 1)
+        if not self.pending:
+            for node in self.nodes:
+                node.shutdown()
+
+    def check_schedule(self, node, duration=0):
+        if node.shutting_down:
+            return
+        if self.pending:
+            self._send_tests(node, self.PENDING_PER_NODE - len(self.node2pending[node]))
+        else:
+            node.shutdown()
+        self.log("num items waiting for node:", len(self.pending))
+
+    def mark_test_complete(self, node, item_index, duration=0):
+        self.node_busy[node.gateway.id] = self.node_busy.get(node.gateway.id, 0.0) + duration
+        self.finished = time.monotonic()
+        super().mark_test_complete(node, item_index, duration)
+
+    def _predict_makespan(self, workers):
+        """Replays the dispatch order with the predicted durations: each test goes to the first free worker."""
+        free_at = [0.0] * max(workers, 1)
+        for nodeid in self.collection:
+            heapq.heappush(free_at, heapq.heappop(free_at) + self.history.predict(nodeid))
+        return max(free_at)
+
+    def summary(self):
+        actual = (self.finished - self.started) if self.started and self.finished else 0.0
+        busy = " | ".join(f"{worker}={seconds:.1f}s" for worker, seconds in sorted(self.node_busy.items()))
+        return (f"predicted makespan {self.predicted_makespan or 0.0:.1f}s | actual makespan {actual:.1f}s | "
+                f"busy per worker: {busy}")
@@ -0,0 +1,95 @@
+import json
+
+try:
+    import orjson
+except ImportError:  # optional fast backend, the stdlib decoder is always available
+    orjson = None
+
+JSON_BACKEND = "orjson" if orjson else "json"
+
+
+def loads(data):
+    """
+    Decodes a JSON document from bytes or str with the fastest available backend.
+    Raises ValueError on invalid or empty input, like `json.loads`.
+    """
+    if orjson:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj):
+    """
+    Encodes `obj` as a compact JSON string with the fastest available backend.
+    """
+    if orjson:
+        return orjson.dumps(obj).decode("utf-8")
+    return json.dumps(obj, separators=(",", ":"))
+
+
+class LazyJson:
+    """
+    Read-only view of a JSON response body that is decoded on first access.
+    Load-test paths that never look at the body pay nothing for decoding.
+    """
+    __slots__ = ("_raw", "_value", "_decoded")
+
+    def __init__(self, raw):
+        self._raw = raw
+        self._value = None
+        self._decoded = False
+
+    @property
+    def is_decoded(self):
+        return self._decoded
+
+    @property
+    def raw(self):
+        """Undecoded body, or None once the body has been decoded."""
+        return self._raw
+
+    @property
+    def value(self):
+        if not self._decoded:
+            try:
+                self._value = loads(self._raw) if self._raw else {}
+            except ValueError:
+                self._value = {}
+            self._raw = None
+            self._decoded = True
+        return self._value
+
+    def __getitem__(self, key):
+        return self.value[key]
+
+    def __contains__(self, item):
+        return item in self.value
+
+    def __iter__(self):
+        return iter(self.value)
+
+    def __len__(self):
+        return len(self.value)
+
+    def __bool__(self):
+        return bool(self.value)
+
+    def __eq__(self, other):
+        if isinstance(other, LazyJson):
+            other = other.value
+        return self.value == other
+
+    def __repr__(self):
+        return repr(self.value)
+
+    def get(self, key, default=None):
+        return self.value.get(key, default)
+
+    def keys(self):
+        return self.value.keys()
+
+    def values(self):
+        return self.value.values()
+
+    def items(self):
+        return self.value.items()
@@ -0,0 +1,146 @@
+import os
+import glob
+import json
+import threading
+
+REPORTED_PERCENTILES = (50, 90, 99, 99.9)
+
+
+class LatencyHistogram:
+    """
+    HDR-style log-linear histogram of latencies recorded in microseconds.
+    Values keep their top SUB_BUCKET_BITS bits, so every bucket is within ~0.1% of the real value,
+    recording is a dict increment and two histograms merge by adding counts.
+    """
+    SUB_BUCKET_BITS = 10
+
+    def __init__(self):
+        self.counts = {}
+        self.total = 0
+        self.max = 0
+
+    @classmethod
+    def _bucket(cls, micros):
+        shift = micros.bit_length() - cls.SUB_BUCKET_BITS
+        if shift <= 0:
+            return micros
+        return (micros >> shift) << shift
+
+    def record(self, seconds):
+        micros = max(int(seconds * 1_000_000), 0)
+        bucket = self._bucket(micros)
+        self.counts[bucket] = self.counts.get(bucket, 0) + 1
+        self.total += 1
+        if micros > self.max:
+            self.max = micros
+
+    def merge(self, other):
+        for bucket, count in other.counts.items():
+            self.counts[bucket] = self.counts.get(bucket, 0) + count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+        return self
+
+    def percentile(self, percentile):
+        """
+        Returns:
+            float: Latency in seconds at or below which `percentile` % of the samples fall.
+        """
+        if not self.total:
+            return 0.0
+        threshold = self.total * percentile / 100
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= threshold:
+                return min(bucket, self.max) / 1_000_000
+        return self.max / 1_000_000
+
+    def summary(self):
+        summary = {"count": self.total}
+        for percentile in REPORTED_PERCENTILES:
+            summary[f"p{percentile:g}_ms"] = round(self.percentile(percentile) * 1000, 3)
+        summary["max_ms"] = round(self.max / 1000, 3)
+        return summary
+
+    def to_dict(self):
+        return {"counts": {str(bucket): count for bucket, count in self.counts.items()},
+                "total": self.total, "max": self.max}
+
+    @classmethod
+    def from_dict(cls, data):
+        histogram = cls()
+        histogram.counts = {int(bucket): count for bucket, count in data["counts"].items()}
+        histogram.total = data["total"]
+        histogram.max = data["max"]
+        return histogram
+
+
+class LatencyRecorder:
+    """
+    Thread-safe registry of latency histograms keyed by (endpoint key, status code).
+    Every xdist worker dumps its own registry; the controller process merges the dumps.
+    """
+    LABEL_TYPE = int  # type of the second key part, the status code
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.histograms = {}
+
+    def record(self, endpoint_key, status_code, seconds):
+        key = (getattr(endpoint_key, "value", str(endpoint_key)), self.LABEL_TYPE(status_code))
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = LatencyHistogram()
+            histogram.record(seconds)
+
+    def merge(self, other):
+        with self._lock:
+            for key, histogram in other.histograms.items():
+                self.histograms.setdefault(key, LatencyHistogram()).merge(histogram)
+        return self
+
+    def reset(self):
+        with self._lock:
+            self.histograms = {}
+
+    def to_dict(self):
+        with self._lock:
+            return {f"{endpoint}|{status}": histogram.to_dict()
+                    for (endpoint, status), histogram in self.histograms.items()}
+
+    @classmethod
+    def from_dict(cls, data):
+        recorder = cls()
+        for key, histogram in data.items():
+            endpoint, status = key.rsplit("|", 1)
+            recorder.histograms[(endpoint, cls.LABEL_TYPE(status))] = LatencyHistogram.from_dict(histogram)
+        return recorder
+
+    def dump(self, path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f)
+
+    @classmethod
+    def load_and_merge(cls, directory):
+        merged = cls()
+        for path in sorted(glob.glob(os.path.join(directory, "*.json"))):
+            with open(path, encoding="utf-8") as f:
+                merged.merge(cls.from_dict(json.load(f)))
+        return merged
+
+    def report(self):
+        """
+        Returns:
+            dict: `{endpoint: {status_code: {count, p50_ms, p90_ms, p99_ms, p99.9_ms, max_ms}}}`.
+        """
+        report = {}
+        with self._lock:
+            for (endpoint, status), histogram in sorted(self.histograms.items()):
+                report.setdefault(endpoint, {})[str(status)] = histogram.summary()
+        return report
+
+
+latency_recorder = LatencyRecorder()
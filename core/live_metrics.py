@@ -0,0 +1,292 @@
+import os
+import glob
+import json
+import time
+import bisect
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from .constants import LIVE_METRICS_DIR, LIVE_METRICS_INTERVAL
+
+DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+ERROR_STATUS = "error"  # status label of requests that got no response
+
+
+def metrics_directory():
+    """Snapshot directory of this run: the session's PYTEST_LIVE_METRICS_DIR, LIVE_METRICS_DIR outside pytest."""
+    return os.getenv("PYTEST_LIVE_METRICS_DIR") or LIVE_METRICS_DIR
+
+
+def _empty_histogram():
+    return {"buckets": [0] * (len(DURATION_BUCKETS) + 1), "sum": 0.0}
+
+
+def _observe(histogram, seconds):
+    histogram["buckets"][bisect.bisect_left(DURATION_BUCKETS, seconds)] += 1
+    histogram["sum"] += seconds
+
+
+def _add_histogram(target, histogram):
+    target["buckets"] = [a + b for a, b in zip(target["buckets"], histogram["buckets"])]
+    target["sum"] += histogram["sum"]
+
+
+class LiveMetrics:
+    """
+    Per-process counters of the requests sent by `BlogApiController`, kept while a run is in flight:
+    requests and responses (by status) per endpoint, a latency histogram per endpoint, in-flight
+    requests per endpoint and the lag of the open-loop scheduler.
+
+    Recording is off until `start_publisher()`, which also writes a snapshot of this process every
+    `interval` seconds into a directory shared by all xdist workers and load processes. A
+    `MetricsExporter` merges those snapshots and serves them as OpenMetrics text.
+    """
+    def __init__(self):
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._publisher = None
+        self._stop = threading.Event()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.requests = {}
+            self.responses = {}
+            self.latency = {}
+            self.in_flight = {}
+            self.scheduler_lag = _empty_histogram()
+
+    def start(self, endpoint_key):
+        """Counts a request to `endpoint_key` as in flight. Returns its start time for `finish`."""
+        if not self.enabled:
+            return None
+        endpoint = getattr(endpoint_key, "value", str(endpoint_key))
+        with self._lock:
+            self.requests[endpoint] = self.requests.get(endpoint, 0) + 1
+            self.in_flight[endpoint] = self.in_flight.get(endpoint, 0) + 1
+        return time.perf_counter()
+
+    def finish(self, endpoint_key, started, status_code=None):
+        if started is None:
+            return
+        seconds = time.perf_counter() - started
+        endpoint = getattr(endpoint_key, "value", str(endpoint_key))
+        key = f"{endpoint}|{status_code if status_code is not None else ERROR_STATUS}"
+        with self._lock:
+            self.in_flight[endpoint] -= 1
+            self.responses[key] = self.responses.get(key, 0) + 1
+            histogram = self.latency.get(endpoint)
+            if histogram is None:
+                histogram = self.latency[endpoint] = _empty_histogram()
+            _observe(histogram, seconds)
+
+    def observe_scheduler_lag(self, seconds):
+        if self.enabled:
+            with self._lock:
+                _observe(self.scheduler_lag, max(seconds, 0.0))
+
+    def snapshot(self):
+        with self._lock:
+            return json.loads(json.dumps({
+                "requests": self.requests, "responses": self.responses, "latency": self.latency,
+                "in_flight": self.in_flight, "scheduler_lag": self.scheduler_lag,
+            }))
+
+    def publish(self, directory=None):
+        """Atomically replaces this process's snapshot file in `directory`."""
+        directory = directory or metrics_directory()
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{os.getpid()}.json")
+        with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f)
+        os.replace(f"{path}.tmp", path)  # the exporter never reads a half-written snapshot
+
+    def start_publisher(self, directory=None, interval=LIVE_METRICS_INTERVAL):
+        """Turns recording on and publishes a snapshot every `interval` seconds until `stop_publisher()`."""
+        if self._publisher is not None:
+            return
+        directory = directory or metrics_directory()
+        self.enabled = True
+        self._stop.clear()
+
+        def loop():
+            while not self._stop.wait(interval):
+                self.publish(directory)
+            self.publish(directory)  # final counts of this process
+
+        self._publisher = threading.Thread(target=loop, name="live-metrics-publisher", daemon=True)
+        self._publisher.start()
+
+    def stop_publisher(self):
+        if self._publisher is None:
+            return
+        self._stop.set()
+        self._publisher.join()
+        self._publisher = None
+        self.enabled = False
+
+
+def merge_snapshots(snapshots):
+    """Adds up the snapshots of several processes into one."""
+    merged = {"requests": {}, "responses": {}, "latency": {}, "in_flight": {}, "scheduler_lag": _empty_histogram()}
+    for snapshot in snapshots:
+        for section in ("requests", "responses", "in_flight"):
+            for key, value in snapshot[section].items():
+                merged[section][key] = merged[section].get(key, 0) + value
+        for endpoint, histogram in snapshot["latency"].items():
+            _add_histogram(merged["latency"].setdefault(endpoint, _empty_histogram()), histogram)
+        _add_histogram(merged["scheduler_lag"], snapshot["scheduler_lag"])
+    return merged
+
+
+def load_snapshots(directory=None):
+    snapshots = []
+    directory = directory or metrics_directory()
+    for path in sorted(glob.glob(os.path.join(directory, "*.json"))):
+        try:
+            with open(path, encoding="utf-8") as f:
+                snapshots.append(json.load(f))
+        except (OSError, ValueError):
+            continue  # process exited while being read
+    return snapshots
+
+
+def _histogram_lines(name, histogram, labels=""):
+    lines, cumulative = [], 0
+    separator = "," if labels else ""
+    for bound, count in zip(DURATION_BUCKETS + ("+Inf",), histogram["buckets"]):
+        cumulative += count
+        lines.append(f'{name}_bucket{{{labels}{separator}le="{bound}"}} {cumulative}')
+    lines.append(f"{name}_count{{{labels}}} {cumulative}" if labels else f"{name}_count {cumulative}")
+    lines.append(f"{name}_sum{{{labels}}} {histogram['sum']:.6f}" if labels else f"{name}_sum {histogram['sum']:.6f}")
+    return lines
+
+
+def render_openmetrics(snapshot):
+    """
+    Renders a (merged) snapshot in the OpenMetrics text format, which Prometheus also scrapes.
+
+    Returns:
+        str: The exposition, ending with `# EOF`.
+    """
+    lines = [
+        "# TYPE blog_api_requests counter",
+        "# HELP blog_api_requests Requests sent per endpoint.",
+    ]
+    lines += [f'blog_api_requests_total{{endpoint="{endpoint}"}} {count}'
+              for endpoint, count in sorted(snapshot["requests"].items())]
+    lines += [
+        "# TYPE blog_api_responses counter",
+        "# HELP blog_api_responses Responses per endpoint and status code, status=\"error\" without a response.",
+    ]
+    for key, count in sorted(snapshot["responses"].items()):
+        endpoint, status = key.rsplit("|", 1)
+        lines.append(f'blog_api_responses_total{{endpoint="{endpoint}",status="{status}"}} {count}')
+    lines += [
+        "# TYPE blog_api_request_duration_seconds histogram",
+        "# UNIT blog_api_request_duration_seconds seconds",
+        "# HELP blog_api_request_duration_seconds Time from sending a request to its full response.",
+    ]
+    for endpoint, histogram in sorted(snapshot["latency"].items()):
+        lines += _histogram_lines("blog_api_request_duration_seconds", histogram, f'endpoint="{endpoint}"')
+    lines += [
+        "# TYPE blog_api_in_flight_requests gauge",
+        "# HELP blog_api_in_flight_requests Requests sent and not answered yet.",
+    ]
+    lines += [f'blog_api_in_flight_requests{{endpoint="{endpoint}"}} {count}'
+              for endpoint, count in sorted(snapshot["in_flight"].items())]
+    lines += [
+        "# TYPE blog_api_scheduler_lag_seconds histogram",
+        "# UNIT blog_api_scheduler_lag_seconds seconds",
+        "# HELP blog_api_scheduler_lag_seconds How late the open-loop scheduler started requests.",
+    ]
+    lines += _histogram_lines("blog_api_scheduler_lag_seconds", snapshot["scheduler_lag"])
+    lines.append("# EOF")
+    return "\n".join(lines) + "\n"
+
+
+class MetricsExporter:
+    """
+    Merges the snapshots in `directory` every `interval` seconds and exposes them as OpenMetrics text:
+    over HTTP at `http://<host>:<port>/metrics`, and written to `file_path` (e.g. for the node_exporter
+    textfile collector). When the port cannot be bound, or `port` is None, only the file is written.
+    """
+    def __init__(self, directory=None, port=None, file_path=None, host="127.0.0.1", interval=LIVE_METRICS_INTERVAL):
+        self.directory = directory or metrics_directory()
+        self.port = port
+        self.file_path = file_path
+        self.host = host
+        self.interval = interval
+        self.body = render_openmetrics(merge_snapshots([]))
+        self.server = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.server.server_address[1]}/metrics" if self.server else None
+
+    def collect(self):
+        self.body = render_openmetrics(merge_snapshots(load_snapshots(self.directory)))
+        if self.file_path:
+            os.makedirs(os.path.dirname(os.path.abspath(self.file_path)), exist_ok=True)
+            with open(f"{self.file_path}.tmp", "w", encoding="utf-8") as f:
+                f.write(self.body)
+            os.replace(f"{self.file_path}.tmp", self.file_path)
+        return self.body
+
+    def _serve(self):
+        exporter = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?", 1)[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = exporter.body.encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        try:
+            self.server = ThreadingHTTPServer((self.host, self.port), Handler)
+        except OSError:
+            self.server = None
+            return False
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, name="live-metrics-http", daemon=True).start()
+        return True
+
+    def start(self):
+        """
+        Returns:
+            bool: Whether the HTTP endpoint is up (False means only the file is written).
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        serving = self._serve() if self.port is not None else False
+
+        def loop():
+            while not self._stop.wait(self.interval):
+                self.collect()
+
+        self._thread = threading.Thread(target=loop, name="live-metrics-exporter", daemon=True)
+        self._thread.start()
+        return serving
+
+    def stop(self):
+        """Stops updating, writes the final merged metrics and shuts the endpoint down."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        self.collect()
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+
+
+live_metrics = LiveMetrics()
@@ -0,0 +1,194 @@
+import time
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from .live_metrics import live_metrics
+
+
+class RequestSample:
+    """
+    Outcome of one scheduled request. `latency` is measured from the intended send time,
+    so time spent waiting for a free worker counts against the server (no coordinated omission).
+    """
+    __slots__ = ("intended_start", "actual_start", "latency", "status_code", "error")
+
+    def __init__(self, intended_start, actual_start, latency, status_code=None, error=None):
+        self.intended_start = intended_start
+        self.actual_start = actual_start
+        self.latency = latency
+        self.status_code = status_code
+        self.error = error
+
+    @property
+    def scheduler_lag(self):
+        return self.actual_start - self.intended_start
+
+
+class LoadResult:
+    """
+    All samples of one open-loop run plus the summary numbers the performance tests assert on.
+    """
+    def __init__(self, rate, duration, samples, elapsed):
+        self.rate = rate
+        self.duration = duration
+        self.samples = samples
+        self.elapsed = elapsed
+
+    @property
+    def total(self):
+        return len(self.samples)
+
+    @property
+    def achieved_rate(self):
+        return self.total / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def max_scheduler_lag(self):
+        return max((sample.scheduler_lag for sample in self.samples), default=0.0)
+
+    def latency_percentile(self, percentile):
+        latencies = sorted(sample.latency for sample in self.samples)
+        if not latencies:
+            return 0.0
+        index = min(int(round(percentile / 100 * (len(latencies) - 1))), len(latencies) - 1)
+        return latencies[index]
+
+    def status_counts(self):
+        counts = {}
+        for sample in self.samples:
+            counts[sample.status_code] = counts.get(sample.status_code, 0) + 1
+        return counts
+
+    def count_statuses(self, expected_success, expected_failure):
+        """
+        Returns:
+            Tuple[int, int, int]: A count of (successes, failures, unexpected responses or errors).
+        """
+        successes, failures, others = 0, 0, 0
+        for sample in self.samples:
+            if sample.status_code == expected_success:
+                successes += 1
+            elif sample.status_code == expected_failure:
+                failures += 1
+            else:
+                others += 1
+        return successes, failures, others
+
+    def summary(self):
+        target = f"{self.rate:.1f} rps" if self.rate else "closed-loop"
+        return (f"target={target} | achieved={self.achieved_rate:.1f} rps | requests={self.total} | "
+                f"p50={self.latency_percentile(50) * 1000:.1f}ms | p99={self.latency_percentile(99) * 1000:.1f}ms | "
+                f"max lag={self.max_scheduler_lag * 1000:.1f}ms")
+
+
+class ConstantArrivalRateScheduler:
+    """
+    Open-loop load generator: request i is due at `start + i / rate`, whether or not earlier
+    requests have returned. `run` executes a blocking request function on a thread pool of
+    `max_workers`; `run_async` starts a coroutine function as tasks on the running event loop.
+    """
+    def __init__(self, rate, duration, max_workers=50):
+        if rate <= 0 or duration <= 0:
+            raise ValueError(f"rate and duration must be positive, got rate={rate}, duration={duration}")
+        self.rate = rate
+        self.duration = duration
+        self.max_workers = max_workers
+
+    @property
+    def total_requests(self):
+        return max(int(self.rate * self.duration), 1)
+
+    def run(self, request_fn):
+        """
+        Args:
+            request_fn (Callable): Blocking function called once per arrival. Must return a status code.
+
+        Returns:
+            LoadResult: Samples of every scheduled request.
+        """
+        samples = []
+        samples_lock = threading.Lock()
+
+        def timed_call(intended_start):
+            actual_start = time.perf_counter()
+            live_metrics.observe_scheduler_lag(actual_start - intended_start)
+            status_code, error = None, None
+            try:
+                status_code = request_fn()
+            except Exception as e:
+                error = e
+            sample = RequestSample(intended_start, actual_start, time.perf_counter() - intended_start,
+                                   status_code, error)
+            with samples_lock:
+                samples.append(sample)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for index in range(self.total_requests):
+                intended_start = start + index / self.rate
+                delay = intended_start - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                executor.submit(timed_call, intended_start)
+        return LoadResult(self.rate, self.duration, samples, time.perf_counter() - start)
+
+    async def run_async(self, request_fn):
+        """
+        Same as `run`, for a coroutine `request_fn` on the running event loop.
+        """
+        async def timed_call(intended_start):
+            actual_start = time.perf_counter()
+            live_metrics.observe_scheduler_lag(actual_start - intended_start)
+            status_code, error = None, None
+            try:
+                status_code = await request_fn()
+            except Exception as e:
+                error = e
+            return RequestSample(intended_start, actual_start, time.perf_counter() - intended_start,
+                                 status_code, error)
+
+        start = time.perf_counter()
+        tasks = []
+        for index in range(self.total_requests):
+            intended_start = start + index / self.rate
+            delay = intended_start - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(timed_call(intended_start)))
+        samples = await asyncio.gather(*tasks)
+        return LoadResult(self.rate, self.duration, list(samples), time.perf_counter() - start)
+
+
+class ClosedLoopRunner:
+    """
+    Closed-loop runner used for throughput benchmarks: `concurrency` workers each send their next
+    request as soon as the previous one returns, until `total_requests` have been sent.
+    """
+    def __init__(self, total_requests, concurrency):
+        if total_requests <= 0 or concurrency <= 0:
+            raise ValueError(f"total_requests and concurrency must be positive, "
+                             f"got total_requests={total_requests}, concurrency={concurrency}")
+        self.total_requests = total_requests
+        self.concurrency = concurrency
+
+    def run(self, request_fn):
+        """
+        Args:
+            request_fn (Callable): Blocking function returning a status code.
+
+        Returns:
+            LoadResult: Samples of every request; `achieved_rate` is the throughput.
+        """
+        def timed_call():
+            started = time.perf_counter()
+            status_code, error = None, None
+            try:
+                status_code = request_fn()
+            except Exception as e:
+                error = e
+            return RequestSample(started, started, time.perf_counter() - started, status_code, error)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            samples = list(executor.map(lambda _: timed_call(), range(self.total_requests)))
+        return LoadResult(None, None, samples, time.perf_counter() - start)
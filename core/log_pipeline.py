@@ -0,0 +1,147 @@
+import os
+import re
+import glob
+import time
+import heapq
+import queue
+import logging
+import threading
+from contextlib import contextmanager
+from logging.handlers import QueueHandler, QueueListener
+from .constants import LOG_SAMPLE_EVERY, LOG_MAX_PER_SECOND
+
+LOG_FORMAT = '%(asctime)s [%(levelname)s] %(message)s'
+PER_REQUEST = {"per_request": True}  # `extra` of log records emitted once per HTTP request
+_RECORD_START = re.compile(r"\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2},\d{3} ")
+
+
+class RequestLogSampler(logging.Filter):
+    """
+    Thins out per-request log records while a load run is active, so request threads do not queue up
+    behind log formatting and handler locks inside the latency being measured.
+    During `sampling()` it keeps 1 in `sample_every` per-request records and at most `max_per_second` of them;
+    all other records pass untouched. Records of the HTTP client loggers are always per-request,
+    `pytest-logger` records opt in with `extra=PER_REQUEST`.
+    """
+    HTTP_LOGGERS = ("urllib3", "requests", "http.client")
+
+    def __init__(self, sample_every=LOG_SAMPLE_EVERY, max_per_second=LOG_MAX_PER_SECOND):
+        super().__init__()
+        self.sample_every = max(sample_every, 1)
+        self.max_per_second = max_per_second
+        self.kept = 0
+        self.dropped = 0
+        self._active = 0
+        self._seen = 0
+        self._second = 0
+        self._kept_this_second = 0
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if not self._active or not (getattr(record, "per_request", False) or record.name.startswith(self.HTTP_LOGGERS)):
+            return True
+        if getattr(record, "sampled", False):
+            return True  # already kept by the logger-level filter, now passing the handler-level one
+        with self._lock:
+            self._seen += 1
+            second = int(time.monotonic())
+            if second != self._second:
+                self._second, self._kept_this_second = second, 0
+            keep = (self._seen - 1) % self.sample_every == 0 and self._kept_this_second < self.max_per_second
+            if keep:
+                self._kept_this_second += 1
+                self.kept += 1
+            else:
+                self.dropped += 1
+        record.sampled = keep
+        return keep
+
+    @contextmanager
+    def sampling(self):
+        """
+        Samples per-request log records for the duration of the block (load mode). Nested and concurrent
+        blocks are fine; sampling ends with the last one.
+
+        Yields:
+            dict: Filled on exit with the per-request records `kept` and `dropped` during the block.
+        """
+        with self._lock:
+            self._active += 1
+            kept, dropped = self.kept, self.dropped
+        stats = {}
+        try:
+            yield stats
+        finally:
+            with self._lock:
+                self._active -= 1
+                stats.update(kept=self.kept - kept, dropped=self.dropped - dropped)
+
+
+request_log_sampler = RequestLogSampler()
+
+
+class LogPipeline:
+    """
+    Non-blocking logging for one process (xdist worker): attached loggers only put records on a queue,
+    and a QueueListener thread formats and writes them to this worker's log file and the console.
+    """
+    def __init__(self, log_file, worker, sampler=request_log_sampler):
+        os.makedirs(os.path.dirname(log_file), exist_ok=True)
+        self.log_file = log_file
+        self.queue = queue.Queue()
+        self.queue_handler = QueueHandler(self.queue)
+        self.queue_handler.addFilter(sampler)
+        self.sampler = sampler
+
+        file_handler = logging.FileHandler(log_file, encoding="utf-8")
+        file_handler.setFormatter(logging.Formatter(f'%(asctime)s [%(levelname)s] [{worker}] %(message)s'))
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        self.handlers = (file_handler, console_handler)
+        self.listener = QueueListener(self.queue, *self.handlers)
+
+    def attach(self, logger, level=logging.DEBUG):
+        logger.setLevel(level)
+        logger.addHandler(self.queue_handler)
+        logger.addFilter(self.sampler)  # drops sampled-out records before they are even propagated
+        return logger
+
+    def start(self):
+        self.listener.start()
+
+    def flush(self):
+        """Blocks until every queued record has been written."""
+        self.queue.join()
+        for handler in self.handlers:
+            handler.flush()
+
+    def stop(self):
+        self.listener.stop()
+        for handler in self.handlers:
+            handler.close()
+
+
+def _read_records(path):
+    """Yields the records of a log file, keeping multi-line messages together."""
+    record = ""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if record and _RECORD_START.match(line):
+                yield record
+                record = ""
+            record += line
+    if record:
+        yield record
+
+
+def merge_worker_logs(worker_dir, destination):
+    """
+    Merges the per-worker log files in `worker_dir` into one file ordered by timestamp.
+
+    Returns:
+        int: Number of worker log files merged.
+    """
+    paths = sorted(glob.glob(os.path.join(worker_dir, "*.log")))
+    with open(destination, "w", encoding="utf-8") as merged:
+        merged.writelines(heapq.merge(*(_read_records(path) for path in paths), key=lambda record: record[:23]))
+    return len(paths)
@@ -0,0 +1,115 @@
+import heapq
+import time
+import itertools
+from .constants import SLOWEST_REQUESTS_PER_TEST
+from .latency_histogram import LatencyHistogram, LatencyRecorder
+
+PHASES = ("throttle", "acquire", "connect", "tls", "send", "ttfb", "transfer")
+
+
+class RequestPhases:
+    """
+    Where the time of one HTTP request went, in seconds. Filled in by the dispatcher:
+
+        throttle  waiting in the client-side `RateGovernor` before the request was handed to the pool
+        acquire   taking a connection from the pool, including waiting for a free one
+        connect   TCP connect of a new connection (0 when a keep-alive connection is reused)
+        tls       TLS handshake of a new HTTPS connection (part of `connect` on the asyncio path)
+        send      writing the request line, headers and body
+        ttfb      waiting for the status line and headers, i.e. server processing plus network
+        transfer  reading the response body
+
+    Phases are measured back to back from one moving mark, so `total - sum of phases` is the
+    client-side overhead before the pool is reached (preparing the request).
+    """
+    __slots__ = PHASES + ("started", "total", "_mark")
+
+    def __init__(self):
+        self.throttle = self.acquire = self.connect = self.tls = self.send = self.ttfb = self.transfer = 0.0
+        self.total = 0.0
+        self.started = self._mark = time.perf_counter()
+
+    def begin(self):
+        self._mark = time.perf_counter()
+
+    def end(self, phase):
+        now = time.perf_counter()
+        setattr(self, phase, getattr(self, phase) + now - self._mark)
+        self._mark = now
+
+    def finish(self):
+        self.end("transfer")
+        self.total = self._mark - self.started
+        return self
+
+    def add_throttle(self, seconds):
+        """Accounts the rate governor wait that happened before the request (and these phases) started."""
+        self.throttle += seconds
+        self.total += seconds
+        return self
+
+    def to_dict(self):
+        timings = {f"{phase}_ms": round(getattr(self, phase) * 1000, 3) for phase in PHASES}
+        timings["total_ms"] = round(self.total * 1000, 3)
+        return timings
+
+    def __repr__(self):
+        return "RequestPhases(" + ", ".join(f"{key}={value}" for key, value in self.to_dict().items()) + ")"
+
+
+class PhaseRecorder(LatencyRecorder):
+    """
+    Histograms of request phase timings keyed by (endpoint key, phase), dumped and merged across
+    xdist workers like `LatencyRecorder`. Also keeps the `slowest_per_test` slowest requests since
+    the last `reset_slowest()`, which conftest attaches to the Allure report of every test.
+    """
+    LABEL_TYPE = str
+
+    def __init__(self, slowest_per_test=SLOWEST_REQUESTS_PER_TEST):
+        super().__init__()
+        self.slowest_per_test = slowest_per_test
+        self._slowest = []
+        self._sequence = itertools.count()
+
+    def record_phases(self, endpoint_key, status_code, phases):
+        if phases is None:
+            return
+        endpoint = getattr(endpoint_key, "value", str(endpoint_key))
+        with self._lock:
+            for phase in PHASES:
+                histogram = self.histograms.get((endpoint, phase))
+                if histogram is None:
+                    histogram = self.histograms[(endpoint, phase)] = LatencyHistogram()
+                histogram.record(getattr(phases, phase))
+
+            entry = (phases.total, next(self._sequence), endpoint, status_code, phases)
+            if len(self._slowest) < self.slowest_per_test:
+                heapq.heappush(self._slowest, entry)
+            elif phases.total > self._slowest[0][0]:
+                heapq.heapreplace(self._slowest, entry)
+
+    def reset_slowest(self):
+        with self._lock:
+            self._slowest = []
+
+    def slowest(self):
+        """
+        Returns:
+            List[dict]: Slowest requests since `reset_slowest()`, slowest first, with their phase timings.
+        """
+        with self._lock:
+            entries = sorted(self._slowest, reverse=True)
+        return [{"endpoint": endpoint, "status": status_code, **phases.to_dict()}
+                for _, _, endpoint, status_code, phases in entries]
+
+    def report(self):
+        """
+        Returns:
+            dict: `{endpoint: {phase: {count, p50_ms, p90_ms, p99_ms, p99.9_ms, max_ms}}}`, phases in request order.
+        """
+        report = super().report()
+        return {endpoint: {phase: phases[phase] for phase in PHASES if phase in phases}
+                for endpoint, phases in report.items()}
+
+
+phase_recorder = PhaseRecorder()
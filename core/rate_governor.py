@@ -0,0 +1,207 @@
+import os
+import time
+import asyncio
+import threading
+from email.utils import parsedate_to_datetime
+from .constants import (HTTPStatusCodes, CLIENT_RATE_LIMIT, CLIENT_RATE_LIMIT_ENDPOINTS, CLIENT_BACKOFF_BASE,
+                        CLIENT_BACKOFF_MAX)
+
+
+def parse_rate_spec(spec):
+    """
+    Parses `<requests per second>[:<burst>]`, e.g. "20:5".
+
+    Returns:
+        Tuple[float, float]: Rate and burst (the burst defaults to one second worth of requests, at least 1).
+    """
+    rate, _, burst = str(spec).partition(":")
+    rate = float(rate)
+    return rate, float(burst) if burst else max(rate, 1.0)
+
+
+def retry_after_seconds(response):
+    """Seconds from the Retry-After header of `response` (delta-seconds or HTTP date), None if absent."""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        try:
+            return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+        except (TypeError, ValueError):
+            return None
+
+
+class EndpointBudget:
+    """
+    Token bucket of one endpoint. Callers reserve a token and sleep until it is theirs, so waiting
+    requests are released in arrival order at `rate` instead of all retrying at once.
+    A 429 halves the rate and blocks the endpoint for Retry-After (or an exponential backoff);
+    every successful response wins back a tenth of the configured rate.
+    """
+    RATE_DECREASE = 0.5
+    RATE_INCREASE = 0.1
+    MIN_RATE_FRACTION = 0.05
+
+    def __init__(self, rate=None, burst=None, backoff_base=CLIENT_BACKOFF_BASE, backoff_max=CLIENT_BACKOFF_MAX):
+        self.configured_rate = rate
+        self.rate = rate
+        self.burst = burst or 1.0
+        self.tokens = self.burst
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.blocked_until = 0.0
+        self.consecutive_rate_limited = 0
+        self.updated = time.monotonic()
+        self.throttled = 0
+        self.waited = 0.0
+        self.rate_limited = 0
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """
+        Returns:
+            float: Seconds the caller has to wait before sending its request.
+        """
+        with self._lock:
+            now = time.monotonic()
+            wait = max(self.blocked_until - now, 0.0)
+            if self.rate:
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.tokens -= 1
+                wait = max(wait, -self.tokens / self.rate)
+            self.updated = now
+            if wait > 0:
+                self.throttled += 1
+                self.waited += wait
+            return wait
+
+    def observe(self, status_code, retry_after=None):
+        with self._lock:
+            if status_code != HTTPStatusCodes.TOO_MANY_REQUESTS.value:
+                self.consecutive_rate_limited = 0
+                if self.rate and self.rate < self.configured_rate:
+                    self.rate = min(self.configured_rate, self.rate + self.configured_rate * self.RATE_INCREASE)
+                return
+            now = time.monotonic()
+            backing_off = now < self.blocked_until  # other in-flight requests already reported this push back
+            self.rate_limited += 1
+            self.consecutive_rate_limited += 1
+            if retry_after is None:
+                retry_after = min(self.backoff_base * 2 ** (self.consecutive_rate_limited - 1), self.backoff_max)
+            self.blocked_until = max(self.blocked_until, now + retry_after)
+            if self.rate and not backing_off:
+                self.rate = max(self.rate * self.RATE_DECREASE, self.configured_rate * self.MIN_RATE_FRACTION)
+                self.tokens = min(self.tokens, 0.0)  # no burst right after the server pushed back
+
+    def stats(self):
+        with self._lock:
+            return {
+                "rate": round(self.rate, 2) if self.rate else None,
+                "throttled": self.throttled,
+                "waited_s": round(self.waited, 3),
+                "rate_limited": self.rate_limited,
+            }
+
+
+class RateGovernor:
+    """
+    Client-side throttle with a separate `EndpointBudget` per `BlogApiEndpointKeys`, applied by
+    `BlogApiController` before every request. Endpoints without a configured rate are not throttled,
+    but still back off after a 429.
+
+    Rates are budgets for the whole run: with xdist, each worker gets `rate / workers`.
+    Time spent waiting is reported as the `throttle` request phase, apart from the server latency.
+    """
+    def __init__(self, default_rate=None, endpoint_rates=None, workers=None):
+        """
+        Args:
+            default_rate (Tuple[float, float]): (requests per second, burst) of every endpoint, None for unlimited.
+            endpoint_rates (dict): `{endpoint key: (requests per second, burst)}` overriding the default.
+            workers (int): Processes sharing the budgets. Defaults to PYTEST_XDIST_WORKER_COUNT.
+        """
+        workers = workers or int(os.getenv("PYTEST_XDIST_WORKER_COUNT", "1"))
+        self.workers = max(workers, 1)
+        self.default_rate = self._share(default_rate)
+        self.endpoint_rates = {getattr(key, "value", key): self._share(rate)
+                               for key, rate in (endpoint_rates or {}).items()}
+        self._budgets = {}
+        self._lock = threading.Lock()
+
+    def _share(self, rate):
+        if rate is None:
+            return None
+        requests_per_second, burst = rate
+        return requests_per_second / self.workers, max(burst / self.workers, 1.0)
+
+    @classmethod
+    def from_spec(cls, default_spec=CLIENT_RATE_LIMIT, endpoint_spec=CLIENT_RATE_LIMIT_ENDPOINTS, workers=None):
+        """
+        Builds a governor from specs like `CLIENT_RATE_LIMIT="50:10"` and
+        `CLIENT_RATE_LIMIT_ENDPOINTS="GET_POSTS=20:5,CREATE_POST=5"`.
+        """
+        endpoint_rates = {}
+        for item in filter(None, (part.strip() for part in (endpoint_spec or "").split(","))):
+            key, _, spec = item.partition("=")
+            endpoint_rates[key.strip()] = parse_rate_spec(spec)
+        return cls(parse_rate_spec(default_spec) if default_spec else None, endpoint_rates, workers)
+
+    @property
+    def enabled(self):
+        return self.default_rate is not None or bool(self.endpoint_rates)
+
+    def budget(self, endpoint_key):
+        key = getattr(endpoint_key, "value", endpoint_key)
+        budget = self._budgets.get(key)
+        if budget is None:
+            with self._lock:
+                budget = self._budgets.get(key)
+                if budget is None:
+                    rate, burst = self.endpoint_rates.get(key, self.default_rate) or (None, None)
+                    budget = self._budgets[key] = EndpointBudget(rate, burst)
+        return budget
+
+    def acquire(self, endpoint_key):
+        """
+        Blocks until `endpoint_key` may send.
+
+        Returns:
+            float: Seconds waited.
+        """
+        wait = self.budget(endpoint_key).reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self, endpoint_key):
+        wait = self.budget(endpoint_key).reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    def observe(self, endpoint_key, response):
+        """Feeds the status (and Retry-After) of a response back into the endpoint's budget."""
+        retry_after = None
+        if response.status_code == HTTPStatusCodes.TOO_MANY_REQUESTS.value:
+            retry_after = retry_after_seconds(response)
+        self.budget(endpoint_key).observe(response.status_code, retry_after)
+
+    def stats(self):
+        """
+        Returns:
+            dict: `{endpoint: {rate, throttled, waited_s, rate_limited}}` of the endpoints used so far.
+        """
+        with self._lock:
+            budgets = dict(self._budgets)
+        return {key: budget.stats() for key, budget in sorted(budgets.items())}
+
+    def format_stats(self):
+        return " | ".join(
+            f"{endpoint} rate={stats['rate'] or 'unlimited'}/s throttled={stats['throttled']} "
+            f"waited={stats['waited_s']}s 429s={stats['rate_limited']}"
+            for endpoint, stats in self.stats().items()
+        )
+
+
+rate_governor = RateGovernor.from_spec()
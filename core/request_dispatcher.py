@@ -1,5 +1,312 @@
+import os
+import asyncio
+import threading
+import aiohttp
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from .constants import HTTP_POOL_SIZE, ASYNC_MAX_IN_FLIGHT
+from .phase_timing import RequestPhases
+from . import json_codec
 
 
-def http_request(method, url, headers=None, json=None, files=None):
-    return requests.request(method=method, url=url, headers=headers, json=json, files=files)
+class ConnectionStats:
+    """
+    Thread-safe counters showing whether keep-alive connections are actually reused.
+    Every xdist worker is a separate process, so each worker reports its own numbers.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests_sent = 0
+        self.new_connections = 0
+
+    def record_request(self):
+        with self._lock:
+            self.requests_sent += 1
+
+    def record_new_connection(self):
+        with self._lock:
+            self.new_connections += 1
+
+    @property
+    def reused_connections(self):
+        return max(self.requests_sent - self.new_connections, 0)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "worker": os.getenv("PYTEST_XDIST_WORKER", "master"),
+                "requests_sent": self.requests_sent,
+                "new_connections": self.new_connections,
+                "reused_connections": max(self.requests_sent - self.new_connections, 0),
+            }
+
+    def reset(self):
+        with self._lock:
+            self.requests_sent = 0
+            self.new_connections = 0
+
+
+connection_stats = ConnectionStats()
+
+
+_request_phases = threading.local()  # RequestPhases of the request the current thread is sending
+
+
+def _current_phases():
+    return getattr(_request_phases, "current", None)
+
+
+class _TimingConnectionMixin:
+    """
+    Times the phases of an urllib3 connection into the `RequestPhases` of the current thread.
+    HTTP connections connect lazily inside `request()`, so `send` only starts after the connect phases.
+    """
+    def _new_conn(self):
+        phases = _current_phases()
+        if phases:
+            phases.begin()
+        sock = super()._new_conn()
+        if phases:
+            phases.end("connect")
+        return sock
+
+    def connect(self):
+        super().connect()
+        phases = _current_phases()
+        if phases and isinstance(self, HTTPSConnection):
+            phases.end("tls")  # everything after the TCP connect
+
+    def request(self, *args, **kwargs):
+        phases = _current_phases()
+        if phases:
+            phases.begin()
+        super().request(*args, **kwargs)
+        if phases:
+            phases.end("send")
+
+    def getresponse(self):
+        response = super().getresponse()
+        phases = _current_phases()
+        if phases:
+            phases.end("ttfb")
+        return response
+
+
+class _TimedHTTPConnection(_TimingConnectionMixin, HTTPConnection):
+    pass
+
+
+class _TimedHTTPSConnection(_TimingConnectionMixin, HTTPSConnection):
+    pass
+
+
+class _CountingPoolMixin:
+    """
+    Counts every new TCP connection and times how long taking a connection from the pool takes.
+    """
+    def _new_conn(self):
+        connection_stats.record_new_connection()
+        return super()._new_conn()
+
+    def _get_conn(self, timeout=None):
+        phases = _current_phases()
+        if phases:
+            phases.begin()
+        conn = super()._get_conn(timeout)
+        if phases:
+            phases.end("acquire")
+        return conn
+
+
+class _CountingHTTPConnectionPool(_CountingPoolMixin, HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _CountingHTTPSConnectionPool(_CountingPoolMixin, HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+    """
+    HTTPAdapter whose urllib3 pools count every new TCP connection they open
+    and time the phases of every request.
+    """
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _CountingHTTPConnectionPool,
+            "https": _CountingHTTPSConnectionPool,
+        }
+
+
+class SessionPool:
+    """
+    Hands out one requests.Session per thread. All sessions of a process (xdist worker)
+    share a single adapter, so keep-alive connections are pooled across threads and
+    the pool size bounds how many sockets stay open.
+    """
+    def __init__(self, pool_size=HTTP_POOL_SIZE):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._generation = 0
+        self.pool_size = pool_size
+        self._adapter = PooledHTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+
+    def configure(self, pool_size):
+        """
+        Grows the shared connection pool to at least `pool_size` connections.
+        Existing thread sessions are remounted lazily.
+        """
+        with self._lock:
+            if pool_size <= self.pool_size:
+                return
+            old_adapter = self._adapter
+            self._adapter = PooledHTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+            self.pool_size = pool_size
+            self._generation += 1
+        old_adapter.close()
+
+    def get_session(self):
+        session = getattr(self._local, "session", None)
+        if session is None or self._local.generation != self._generation:
+            session = session or requests.Session()
+            with self._lock:
+                session.mount("http://", self._adapter)
+                session.mount("https://", self._adapter)
+                self._local.generation = self._generation
+            self._local.session = session
+        return session
+
+    def close(self):
+        with self._lock:
+            self._adapter.close()
+
+
+session_pool = SessionPool()
+
+
+def configure_session_pool(pool_size):
+    session_pool.configure(pool_size)
+
+
+def http_request(method, url, headers=None, json=None, files=None, params=None):
+    """
+    Sends a request on this thread's pooled session. The phase timings of the request are
+    available as `response.phases` (`RequestPhases`).
+    """
+    connection_stats.record_request()
+    session = session_pool.get_session()
+    phases = _request_phases.current = RequestPhases()
+    try:
+        response = session.request(method=method, url=url, headers=headers, json=json, files=files, params=params)
+    finally:
+        _request_phases.current = None
+    response.phases = phases.finish()
+    return response
+
+
+class AsyncResponse:
+    """
+    Minimal requests-like response returned by `async_http_request`.
+    The body is read eagerly so the connection goes back to the pool right away.
+    """
+    def __init__(self, status_code, headers, content, url, phases=None):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.url = url
+        self.phases = phases
+
+    @property
+    def text(self):
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self):
+        return json_codec.loads(self.content)
+
+
+class AsyncSessionPool:
+    """
+    Keeps one aiohttp.ClientSession per running event loop. The connector limit plays
+    the same role as the pool size of the synchronous `SessionPool`.
+    Trace callbacks count new connections and time the phases of every request into the
+    `RequestPhases` passed as `trace_request_ctx`.
+
+    A session is closed and dropped when its loop shuts down (`asyncio.run` finalizes the loop's
+    async generators before closing it, see `_close_on_shutdown`), so the async helper methods can
+    be awaited directly without leaking a session per loop. A loop closed by hand without
+    `loop.shutdown_asyncgens()` has to `await close_async_session()` itself.
+    """
+    def __init__(self, pool_size=ASYNC_MAX_IN_FLIGHT):
+        self.pool_size = pool_size
+        self._sessions = {}  # loop: (session, closer)
+
+    @staticmethod
+    def _trace_config():
+        def phase_end(phase):
+            async def on_event(session, context, params):
+                if context.trace_request_ctx:
+                    context.trace_request_ctx.end(phase)
+            return on_event
+
+        async def on_connection_create_end(session, context, params):
+            connection_stats.record_new_connection()
+
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_connection_reuseconn.append(phase_end("acquire"))
+        trace_config.on_connection_create_start.append(phase_end("acquire"))
+        trace_config.on_connection_create_end.append(on_connection_create_end)
+        trace_config.on_connection_create_end.append(phase_end("connect"))
+        trace_config.on_request_headers_sent.append(phase_end("send"))
+        trace_config.on_request_end.append(phase_end("ttfb"))
+        return trace_config
+
+    async def _close_on_shutdown(self, loop, session):
+        """Suspends until `loop` finalizes its async generators on shutdown, then closes and drops `session`."""
+        try:
+            yield
+        finally:
+            if self._sessions.get(loop, (None, None))[0] is session:
+                del self._sessions[loop]
+            await session.close()
+
+    def get_session(self):
+        loop = asyncio.get_running_loop()
+        session, _ = self._sessions.get(loop, (None, None))
+        if session is None or session.closed:
+            connector = aiohttp.TCPConnector(limit=self.pool_size)
+            session = aiohttp.ClientSession(connector=connector, trace_configs=[self._trace_config()])
+            # the loop only tracks its async generators weakly, so the closer is kept with the session;
+            # started here, it is finalized by the loop's shutdown_asyncgens()
+            closer = self._close_on_shutdown(loop, session)
+            loop.create_task(anext(closer))
+            self._sessions[loop] = (session, closer)
+        return session
+
+    async def close(self):
+        session, _ = self._sessions.pop(asyncio.get_running_loop(), (None, None))
+        if session is not None:
+            await session.close()
+
+    def open_sessions(self):
+        """Sessions not closed yet."""
+        return [session for session, _ in list(self._sessions.values()) if not session.closed]
+
+
+async_session_pool = AsyncSessionPool()
+
+
+async def async_http_request(method, url, headers=None, json=None, params=None):
+    connection_stats.record_request()
+    session = async_session_pool.get_session()
+    phases = RequestPhases()
+    async with session.request(method=method, url=url, headers=headers, json=json, params=params,
+                               trace_request_ctx=phases) as response:
+        content = await response.read()
+        return AsyncResponse(response.status, response.headers, content, str(response.url), phases.finish())
+
+
+async def close_async_session():
+    await async_session_pool.close()
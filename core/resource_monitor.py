@@ -0,0 +1,167 @@
+import os
+import glob
+from urllib.parse import urlparse
+from .constants import BASE_URL, SOAK_MAX_SLOPES
+
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+TCP_LISTEN = "0A"
+
+# metric: (largest allowed upward slope per hour, smallest fitted increase over the run that counts as drift)
+DEFAULT_DRIFT_LIMITS = {
+    "p50_ms": (10.0, 5.0),
+    "p99_ms": (20.0, 10.0),
+    "client_rss_mb": (20.0, 10.0),
+    "client_fds": (10.0, 5.0),
+    "server_rss_mb": (50.0, 10.0),
+}
+
+
+def process_rss_mb(pid):
+    """Resident set size of process `pid` from /proc, None when it cannot be read."""
+    try:
+        with open(f"/proc/{pid}/statm", encoding="ascii") as f:
+            return int(f.read().split()[1]) * PAGE_SIZE / (1024 * 1024)
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+def open_fd_count(pid):
+    try:
+        return len(os.listdir(f"/proc/{pid}/fd"))
+    except OSError:
+        return None
+
+
+def listening_pid(port):
+    """
+    Finds the local process listening on TCP `port` by matching the socket inode from /proc/net/tcp(6)
+    against the fds of every readable process.
+
+    Returns:
+        int: The pid, None if the port is not served by a visible local process (e.g. inside a container).
+    """
+    inodes = set()
+    for table in ("/proc/net/tcp", "/proc/net/tcp6"):
+        try:
+            with open(table, encoding="ascii") as f:
+                next(f)
+                for line in f:
+                    fields = line.split()
+                    if int(fields[1].rsplit(":", 1)[1], 16) == port and fields[3] == TCP_LISTEN:
+                        inodes.add(f"socket:[{fields[9]}]")
+        except OSError:
+            continue
+    if not inodes:
+        return None
+    for fd_dir in glob.glob("/proc/[0-9]*/fd"):
+        try:
+            if any(os.readlink(os.path.join(fd_dir, fd)) in inodes for fd in os.listdir(fd_dir)):
+                return int(fd_dir.split("/")[2])
+        except OSError:
+            continue
+    return None
+
+
+def server_pid(base_url=BASE_URL):
+    """Pid of the server under test: SOAK_SERVER_PID if set, else the local listener of BASE_URL's port."""
+    if os.getenv("SOAK_SERVER_PID"):
+        return int(os.environ["SOAK_SERVER_PID"])
+    parsed = urlparse(base_url)
+    return listening_pid(parsed.port or (443 if parsed.scheme == "https" else 80))
+
+
+def trend_slope(xs, ys):
+    """Least-squares slope of `ys` over `xs`, 0.0 with fewer than two points."""
+    points = [(x, y) for x, y in zip(xs, ys) if y is not None]
+    if len(points) < 2:
+        return 0.0
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    variance = sum((x - mean_x) ** 2 for x, _ in points)
+    if not variance:
+        return 0.0
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / variance
+
+
+def parse_drift_limits(spec=SOAK_MAX_SLOPES):
+    """
+    Parses overrides like "p99_ms=30,client_rss_mb=10:5" (slope per hour[:smallest increase]) over
+    `DEFAULT_DRIFT_LIMITS`.
+    """
+    limits = dict(DEFAULT_DRIFT_LIMITS)
+    for item in filter(None, (part.strip() for part in (spec or "").split(","))):
+        metric, _, value = item.partition("=")
+        slope, _, floor = value.partition(":")
+        limits[metric.strip()] = (float(slope), float(floor) if floor else limits.get(metric.strip(), (0, 0))[1])
+    return limits
+
+
+class ResourceMonitor:
+    """
+    Samples the resources of this process (the client) and of the server process under test.
+    The server is found once, see `server_pid`; without a visible server process only the
+    client is sampled. With the in-process stub, client and server are the same process.
+    """
+    def __init__(self, base_url=BASE_URL, pid=None):
+        self.client_pid = os.getpid()
+        self.server_pid = pid if pid is not None else server_pid(base_url)
+
+    def sample(self):
+        """
+        Returns:
+            dict: `client_rss_mb`, `client_fds` and `server_rss_mb` (None when the server is not visible).
+        """
+        return {
+            "client_rss_mb": process_rss_mb(self.client_pid),
+            "client_fds": open_fd_count(self.client_pid),
+            "server_rss_mb": process_rss_mb(self.server_pid) if self.server_pid else None,
+        }
+
+
+class SoakResult:
+    """
+    Per-window measurements of a soak run and the metrics that drifted. Each window is a dict with
+    `elapsed_s` (end of the window since the start of the run), `requests`, `errors`, `p50_ms`,
+    `p99_ms` and the `ResourceMonitor` sample taken at its end.
+
+    A metric drifts when its least-squares slope exceeds the allowed slope per hour and the fitted
+    increase over the run exceeds the metric's noise floor (see `DEFAULT_DRIFT_LIMITS`).
+    The first `warmup_windows` are left out, as pools, caches and the allocator fill up there.
+    """
+    def __init__(self, windows, limits=None, warmup_windows=1):
+        self.windows = windows
+        self.limits = limits or parse_drift_limits()
+        self.warmup_windows = warmup_windows
+
+    def slopes(self):
+        """
+        Returns:
+            dict: `{metric: slope per hour}` over the windows after the warm-up.
+        """
+        windows = self.windows[self.warmup_windows:]
+        hours = [window["elapsed_s"] / 3600 for window in windows]
+        return {metric: trend_slope(hours, [window.get(metric) for window in windows]) for metric in self.limits}
+
+    @property
+    def drifts(self):
+        """
+        Returns:
+            List[str]: One message per metric trending upward beyond its limits, empty when the run is stable.
+        """
+        windows = self.windows[self.warmup_windows:]
+        if len(windows) < 2:
+            return []
+        span_hours = (windows[-1]["elapsed_s"] - windows[0]["elapsed_s"]) / 3600
+        drifts = []
+        for metric, slope in self.slopes().items():
+            max_slope, noise_floor = self.limits[metric]
+            if slope > max_slope and slope * span_hours > noise_floor:
+                drifts.append(f"{metric} grows {slope:.1f}/h (limit {max_slope}/h), "
+                              f"+{slope * span_hours:.1f} over {span_hours * 60:.1f} min")
+        return drifts
+
+    def summary(self):
+        requests = sum(window["requests"] for window in self.windows)
+        errors = sum(window["errors"] for window in self.windows)
+        slopes = " | ".join(f"{metric} {slope:+.1f}/h" for metric, slope in self.slopes().items())
+        return f"{len(self.windows)} windows | {requests} requests | {errors} errors | slopes: {slopes}"
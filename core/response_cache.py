@@ -0,0 +1,170 @@
+import time
+import threading
+from collections import OrderedDict
+from .constants import (HTTPStatusCodes, RESPONSE_CACHE_MAX_ENTRIES, RESPONSE_CACHE_TTL,
+                        RESPONSE_CACHE_FRESH_SECONDS)
+from .request_dispatcher import AsyncResponse
+
+
+class CachedResponse(AsyncResponse):
+    """
+    Requests-like response built from a cache entry, returned instead of a 304 or for a fresh hit.
+    `phases` are those of the revalidation request, or None when no request was sent.
+    """
+    from_cache = True
+
+
+class CacheEntry:
+    __slots__ = ("endpoint_key", "url", "status_code", "headers", "content", "etag", "last_modified",
+                 "stored_at", "validated_at")
+
+    def __init__(self, endpoint_key, url, response):
+        self.endpoint_key = endpoint_key
+        self.url = url
+        self.status_code = response.status_code
+        self.headers = dict(response.headers)
+        self.content = response.content
+        self.etag = response.headers.get("ETag")
+        self.last_modified = response.headers.get("Last-Modified")
+        self.stored_at = self.validated_at = time.monotonic()
+
+    def to_response(self, phases=None):
+        return CachedResponse(self.status_code, self.headers, self.content, self.url, phases)
+
+
+class ResponseCache:
+    """
+    Client-side conditional-GET cache for `BlogApiController`. GET responses carrying an ETag or
+    Last-Modified validator are kept, and the next GET of the same URL and query sends
+    If-None-Match / If-Modified-Since: a 304 is answered from the cache without transferring the body.
+
+        fresh_seconds  entries validated less than this long ago are served without any request
+                       (0, the default, revalidates every read, so reads never go stale)
+        ttl            entries stored longer than this are evicted and fetched in full again
+        max_entries    least recently used entries are evicted beyond this
+
+    Writes invalidate the cached reads they make stale (see `CACHE_INVALIDATIONS` of the controller).
+    Counters: `hits` served without a request, `revalidations` answered by a 304, `misses` that
+    transferred a full body, and `bytes_saved` of bodies not transferred by hits and revalidations.
+    """
+    def __init__(self, max_entries=RESPONSE_CACHE_MAX_ENTRIES, ttl=RESPONSE_CACHE_TTL,
+                 fresh_seconds=RESPONSE_CACHE_FRESH_SECONDS):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.fresh_seconds = fresh_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.hits = self.revalidations = self.misses = 0
+        self.invalidations = self.evictions = 0
+        self.bytes_saved = 0
+
+    @staticmethod
+    def _key(url, params):
+        return url, tuple(sorted((str(name), str(value)) for name, value in (params or {}).items()))
+
+    def lookup(self, url, params=None):
+        """
+        Returns:
+            Tuple[CacheEntry, CachedResponse]: The entry of the URL (None if not cached) and, if the entry
+            is still fresh, the response to return without sending a request (None otherwise).
+        """
+        key = self._key(url, params)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None, None
+            if now - entry.stored_at > self.ttl:
+                del self._entries[key]
+                self.evictions += 1
+                return None, None
+            self._entries.move_to_end(key)
+            if now - entry.validated_at < self.fresh_seconds:
+                self.hits += 1
+                self.bytes_saved += len(entry.content)
+                return entry, entry.to_response()
+        return entry, None
+
+    @staticmethod
+    def conditional_headers(entry, headers=None):
+        """Returns `headers` plus the validators of `entry`."""
+        if entry is None:
+            return headers
+        headers = dict(headers or {})
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def update(self, endpoint_key, url, params, entry, response):
+        """
+        Feeds the response of a (conditional) GET back into the cache.
+
+        Returns:
+            The response to hand to the caller: a `CachedResponse` for a 304, `response` otherwise.
+        """
+        key = self._key(url, params)
+        with self._lock:
+            if response.status_code == HTTPStatusCodes.NOT_MODIFIED.value and entry is not None:
+                self.revalidations += 1
+                self.bytes_saved += len(entry.content)
+                entry.validated_at = time.monotonic()
+                entry.etag = response.headers.get("ETag", entry.etag)
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                return entry.to_response(response.phases)
+
+            self.misses += 1
+            if response.status_code == HTTPStatusCodes.OK.value and \
+                    (response.headers.get("ETag") or response.headers.get("Last-Modified")):
+                self._entries[key] = CacheEntry(endpoint_key, url, response)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+            else:
+                self._entries.pop(key, None)
+        return response
+
+    def invalidate(self, endpoint_key, url=None):
+        """Drops the entries of `endpoint_key`, only those of `url` (any query) if given."""
+        endpoint_key = getattr(endpoint_key, "value", endpoint_key)
+        with self._lock:
+            stale = [key for key, entry in self._entries.items()
+                     if getattr(entry.endpoint_key, "value", entry.endpoint_key) == endpoint_key
+                     and (url is None or entry.url == url)]
+            for key in stale:
+                del self._entries[key]
+            self.invalidations += len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "revalidations": self.revalidations,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "evictions": self.evictions,
+                "bytes_saved": self.bytes_saved,
+            }
+
+    def format_stats(self):
+        stats = self.stats()
+        return (f"{stats['hits']} hits | {stats['revalidations']} revalidated (304) | {stats['misses']} misses | "
+                f"{stats['invalidations']} invalidated | {stats['evictions']} evicted | "
+                f"{stats['bytes_saved']} body bytes saved")
+
+
+response_cache = ResponseCache()
@@ -0,0 +1,111 @@
+import random
+import asyncio
+import threading
+import aiohttp
+import requests
+from .constants import (HTTPStatusCodes, RETRY_MAX_ATTEMPTS, RETRY_BACKOFF_BASE, RETRY_BACKOFF_MAX,
+                        RETRY_BUDGET_RATIO, RETRY_BUDGET_MIN, RETRY_NON_IDEMPOTENT)
+from .rate_governor import retry_after_seconds
+
+IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS", "PUT", "DELETE")
+RETRYABLE_STATUSES = (HTTPStatusCodes.BAD_GATEWAY.value, HTTPStatusCodes.SERVICE_UNAVAILABLE.value,
+                      HTTPStatusCodes.GATEWAY_TIMEOUT.value)
+RETRYABLE_ERRORS = (requests.ConnectionError, requests.Timeout, aiohttp.ClientConnectionError, asyncio.TimeoutError)
+
+
+class RetryPolicy:
+    """
+    Request-level retries for transient failures, so one connection reset does not rerun a whole test:
+
+        what       connection errors, timeouts and 502/503/504 responses
+        which      idempotent methods (GET, PUT, DELETE); POST only with `retry_non_idempotent`
+        when       exponential backoff with full jitter, at least Retry-After when the server sends one
+        how often  up to `max_attempts` per request, and retries overall stay within a budget of
+                   `budget_min + budget_ratio * requests`, so a down server is not hammered with retries
+
+    Every retry is kept as an event until `reset_events()`; conftest attaches them to the test report.
+    """
+    def __init__(self, max_attempts=RETRY_MAX_ATTEMPTS, backoff_base=RETRY_BACKOFF_BASE,
+                 backoff_max=RETRY_BACKOFF_MAX, budget_ratio=RETRY_BUDGET_RATIO, budget_min=RETRY_BUDGET_MIN,
+                 retry_non_idempotent=RETRY_NON_IDEMPOTENT, seed=None):
+        self.max_attempts = max(max_attempts, 1)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.budget_ratio = budget_ratio
+        self.budget_min = budget_min
+        self.retry_non_idempotent = retry_non_idempotent
+        self.rng = random.Random(seed)
+        self.requests = 0
+        self.retries = 0
+        self.budget_exhausted = 0
+        self._events = []
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.max_attempts > 1
+
+    def allows(self, method):
+        return method in IDEMPOTENT_METHODS or self.retry_non_idempotent
+
+    def record_request(self):
+        with self._lock:
+            self.requests += 1
+
+    @staticmethod
+    def is_retryable(response=None, error=None):
+        if error is not None:
+            return isinstance(error, RETRYABLE_ERRORS)
+        return response.status_code in RETRYABLE_STATUSES
+
+    def next_delay(self, endpoint_key, method, attempt, response=None, error=None):
+        """
+        Decides whether failed `attempt` (1-based) of a request is retried.
+
+        Returns:
+            float: Seconds to wait before the next attempt, None to give up and return the failure.
+        """
+        if attempt >= self.max_attempts or not self.allows(method) or not self.is_retryable(response, error):
+            return None
+        delay = self.rng.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1)))
+        retry_after = retry_after_seconds(response) if response is not None else None
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.backoff_max))
+
+        with self._lock:
+            if self.retries >= self.budget_min + self.budget_ratio * self.requests:
+                self.budget_exhausted += 1
+                return None
+            self.retries += 1
+            self._events.append({
+                "endpoint": getattr(endpoint_key, "value", str(endpoint_key)),
+                "method": method,
+                "attempt": attempt,
+                "reason": repr(error) if error is not None else f"status {response.status_code}",
+                "delay_ms": round(delay * 1000, 3),
+            })
+        return delay
+
+    def reset_events(self):
+        with self._lock:
+            self._events = []
+
+    def events(self):
+        """
+        Returns:
+            List[dict]: Retries since `reset_events()`, with the endpoint, failed attempt, reason and backoff.
+        """
+        with self._lock:
+            return list(self._events)
+
+    def stats(self):
+        with self._lock:
+            return {"requests": self.requests, "retries": self.retries, "budget_exhausted": self.budget_exhausted}
+
+    def format_stats(self):
+        stats = self.stats()
+        return (f"{stats['requests']} requests | {stats['retries']} retries | "
+                f"{stats['budget_exhausted']} not retried, budget exhausted")
+
+
+retry_policy = RetryPolicy()
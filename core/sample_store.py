@@ -0,0 +1,244 @@
+import os
+import sys
+import glob
+import json
+import mmap
+import time
+import uuid
+import zipfile
+import threading
+from array import array
+from .constants import BlogApiEndpointKeys, SAMPLE_STORE_DIR, SAMPLE_STORE_CHUNK, SAMPLE_STORE_EXPORT
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # optional, only needed for the Parquet export
+    pyarrow = None
+
+# column: array typecode (fixed width), 19 bytes per sample in total
+COLUMNS = {
+    "timestamp": "d",  # send time, seconds since the epoch
+    "endpoint": "B",   # index into ENDPOINTS
+    "status": "H",     # status code, 0 when no response was received
+    "latency": "f",    # seconds
+    "bytes": "I",      # response body size
+}
+ENDPOINTS = [key.value for key in BlogApiEndpointKeys]
+ENDPOINT_IDS = {name: index for index, name in enumerate(ENDPOINTS)}
+BYTE_ORDER = "<" if sys.byteorder == "little" else ">"
+NPY_DESCR = {"d": "f8", "B": "u1", "H": "u2", "f": "f4", "I": "u4"}
+PARQUET_TYPES = {"d": "float64", "B": "uint8", "H": "uint16", "f": "float32", "I": "uint32"}
+EXPORT_FORMATS = ("npz", "parquet", "none")
+
+
+def sample_export_format(requested=SAMPLE_STORE_EXPORT):
+    """
+    Checks an export format before a run rather than when its samples are exported.
+
+    Returns:
+        Tuple[str, str]: The format to export with, and why `requested` was replaced (None if it was not).
+    """
+    if requested not in EXPORT_FORMATS:
+        return "npz", f"Unknown sample export format {requested!r}, expected one of {EXPORT_FORMATS}. Using npz"
+    if requested == "parquet" and pyarrow is None:
+        return "npz", "Parquet export needs pyarrow (pip install pyarrow). Using npz"
+    return requested, None
+
+
+class SampleColumns:
+    """
+    Read view of stored samples: each column is a list of parts (memory-mapped segment files or
+    in-memory arrays) that are only copied when a whole column is asked for with `column()`.
+    """
+    def __init__(self, parts, endpoints=ENDPOINTS, mappings=()):
+        self.parts = parts
+        self.endpoints = endpoints
+        self._mappings = list(mappings)
+
+    def __len__(self):
+        return sum(len(part) for part in self.parts["status"])
+
+    def column(self, name):
+        values = array(COLUMNS[name])
+        for part in self.parts[name]:
+            if isinstance(part, array):
+                values.extend(part)
+            else:
+                values.frombytes(part.cast("B"))
+        return values
+
+    def to_npz(self, path):
+        """
+        Writes one `.npy` array per column, plus `endpoints` (the names of the endpoint ids), into an
+        uncompressed `.npz` that `numpy.load` reads. Columns are streamed, so numpy is not needed here.
+        """
+        with zipfile.ZipFile(path, "w", zipfile.ZIP_STORED, allowZip64=True) as archive:
+            for name, typecode in COLUMNS.items():
+                with archive.open(f"{name}.npy", "w", force_zip64=True) as f:
+                    f.write(_npy_header(f"{BYTE_ORDER}{NPY_DESCR[typecode]}", len(self)))
+                    for part in self.parts[name]:
+                        f.write(part)
+            width = max((len(name) for name in self.endpoints), default=1)
+            names = b"".join(name.ljust(width, "\0").encode("utf-32-le") for name in self.endpoints)
+            with archive.open("endpoints.npy", "w") as f:
+                f.write(_npy_header(f"<U{width}", len(self.endpoints)))
+                f.write(names)
+        return path
+
+    def to_parquet(self, path):
+        """Writes the columns to Parquet, with `endpoint` as a dictionary column of endpoint names. Needs pyarrow."""
+        if pyarrow is None:
+            raise ImportError("Exporting samples to Parquet needs pyarrow: pip install pyarrow")
+        columns = {}
+        for name, typecode in COLUMNS.items():
+            values = self.column(name)
+            columns[name] = pyarrow.Array.from_buffers(getattr(pyarrow, PARQUET_TYPES[typecode])(), len(values),
+                                                       [None, pyarrow.py_buffer(values)])
+        columns["endpoint"] = pyarrow.DictionaryArray.from_arrays(columns["endpoint"], self.endpoints)
+        pyarrow.parquet.write_table(pyarrow.table(columns), path)
+        return path
+
+    def export(self, path_base, export_format):
+        """
+        Writes `<path_base>.<export_format>`, nothing for "none".
+
+        Returns:
+            str: The written path, None for "none".
+        """
+        if export_format == "npz":
+            return self.to_npz(f"{path_base}.npz")
+        if export_format == "parquet":
+            return self.to_parquet(f"{path_base}.parquet")
+        return None
+
+    def close(self):
+        for part_list in self.parts.values():
+            for part in part_list:
+                if isinstance(part, memoryview):
+                    part.release()
+        for mapping in self._mappings:
+            mapping.close()
+        self._mappings = []
+
+
+def _npy_header(descr, length):
+    header = f"{{'descr': '{descr}', 'fortran_order': False, 'shape': ({length},), }}"
+    header = header.ljust(64 * ((len(header) + 10 + 1 + 63) // 64) - 10 - 1) + "\n"  # 64-byte aligned data
+    return b"\x93NUMPY\x01\x00" + len(header).to_bytes(2, "little") + header.encode("latin1")
+
+
+class SampleStore:
+    """
+    Append-only columnar store of per-request samples (see `COLUMNS`), a fixed 19 bytes each instead
+    of a Python object per request. Appends from many threads go through one lock into typed arrays;
+    with a `directory`, every `chunk_samples` samples are spilled to one file per column in this
+    store's own segment, so memory stays at one chunk however long the run.
+
+    Each store (one per process) writes its own segment directory, so xdist workers and load
+    processes never share a file; `load(directory)` memory-maps the segments of all of them.
+    """
+    def __init__(self, directory=None, chunk_samples=SAMPLE_STORE_CHUNK):
+        self.chunk_samples = chunk_samples
+        self.segment = None
+        if directory:
+            self.segment = os.path.join(directory, f"{os.getpid()}-{uuid.uuid4().hex[:8]}")
+            os.makedirs(self.segment, exist_ok=True)
+            with open(os.path.join(self.segment, "meta.json"), "w", encoding="utf-8") as f:
+                json.dump({"columns": COLUMNS, "endpoints": ENDPOINTS}, f)
+        self.spilled = 0
+        self._lock = threading.Lock()
+        self._new_chunk()
+
+    def _new_chunk(self):
+        self._chunk = {name: array(typecode) for name, typecode in COLUMNS.items()}
+
+    def append(self, endpoint_key, status_code, latency, size=0, timestamp=None):
+        """
+        Args:
+            endpoint_key (BlogApiEndpointKeys): Route of the request.
+            status_code (int): Response status, None when the request failed without a response.
+            latency (float): Seconds from send to full response.
+            size (int): Response body bytes.
+            timestamp (float): Send time in seconds since the epoch, now by default.
+        """
+        endpoint = ENDPOINT_IDS[getattr(endpoint_key, "value", endpoint_key)]
+        timestamp = time.time() if timestamp is None else timestamp
+        with self._lock:
+            chunk = self._chunk
+            chunk["timestamp"].append(timestamp)
+            chunk["endpoint"].append(endpoint)
+            chunk["status"].append(status_code or 0)
+            chunk["latency"].append(latency)
+            chunk["bytes"].append(size)
+            if self.segment and len(chunk["status"]) >= self.chunk_samples:
+                self._spill()
+
+    def _spill(self):
+        for name, values in self._chunk.items():
+            with open(os.path.join(self.segment, f"{name}.bin"), "ab") as f:
+                values.tofile(f)
+        self.spilled += len(self._chunk["status"])
+        self._new_chunk()
+
+    def flush(self):
+        """Spills the samples still in memory, so `load` sees all of them."""
+        if self.segment:
+            with self._lock:
+                if self._chunk["status"]:
+                    self._spill()
+
+    def __len__(self):
+        with self._lock:
+            return self.spilled + len(self._chunk["status"])
+
+    def columns(self):
+        """
+        Returns:
+            SampleColumns: Everything appended so far, spilled samples memory-mapped.
+        """
+        with self._lock:
+            tail = {name: array(values.typecode, values) for name, values in self._chunk.items()}
+        columns = self.load(os.path.dirname(self.segment), [self.segment]) if self.segment else \
+            SampleColumns({name: [] for name in COLUMNS})
+        for name, values in tail.items():
+            columns.parts[name].append(values)
+        return columns
+
+    @staticmethod
+    def load(directory, segments=None):
+        """
+        Memory-maps the spilled samples of every segment under `directory` (flush the stores first).
+
+        Returns:
+            SampleColumns: All samples, segment by segment.
+        """
+        parts, mappings = {name: [] for name in COLUMNS}, []
+        for segment in segments or sorted(glob.glob(os.path.join(directory, "*", "meta.json"))):
+            segment = os.path.dirname(segment) if segment.endswith("meta.json") else segment
+            for name, typecode in COLUMNS.items():
+                path = os.path.join(segment, f"{name}.bin")
+                if not os.path.exists(path) or not os.path.getsize(path):
+                    continue
+                with open(path, "rb") as f:
+                    mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                mappings.append(mapping)
+                parts[name].append(memoryview(mapping).cast(typecode))
+        return SampleColumns(parts, mappings=mappings)
+
+
+_shared_store = None
+_shared_store_lock = threading.Lock()
+
+
+def shared_sample_store() -> SampleStore:
+    """
+    Returns this process's store, a segment under the session's PYTEST_SAMPLE_STORE_DIR
+    (SAMPLE_STORE_DIR outside pytest), created on first use.
+    """
+    global _shared_store
+    with _shared_store_lock:
+        if _shared_store is None:
+            _shared_store = SampleStore(os.getenv("PYTEST_SAMPLE_STORE_DIR") or SAMPLE_STORE_DIR)
+        return _shared_store
+
@@ -0,0 +1,93 @@
+"""
+Streams a large db.json for json-server without building the document in memory.
+
+    python create_large_db.py --posts 1000000 --comments-per-post poisson:3 --output db.json
+
+Texts come from a pool of Faker sentences and names generated once, so millions of rows
+stay fast to write; the same --seed always produces the same file.
+"""
+import sys
+import json
+import math
+import random
+import argparse
+from faker import Faker
+
+
+def comments_per_post_sampler(spec, rng):
+    """
+    Parses a comments-per-post distribution:
+        fixed:N        every post gets N comments
+        uniform:A:B    uniformly between A and B (inclusive)
+        poisson:L      Poisson with mean L
+    """
+    kind, _, args = spec.partition(":")
+    values = [float(value) for value in args.split(":") if value]
+    if kind == "fixed" and len(values) == 1:
+        return lambda: int(values[0])
+    if kind == "uniform" and len(values) == 2:
+        return lambda: rng.randint(int(values[0]), int(values[1]))
+    if kind == "poisson" and len(values) == 1:
+        def poisson():
+            # Knuth's method for small means; the normal approximation above that
+            mean = values[0]
+            if mean > 30:
+                return max(int(round(rng.gauss(mean, mean ** 0.5))), 0)
+            threshold, count, product = math.exp(-mean), 0, rng.random()
+            while product > threshold:
+                count += 1
+                product *= rng.random()
+            return count
+        return poisson
+    raise ValueError(f"Invalid comments-per-post distribution: {spec}. "
+                     f"Expected fixed:N, uniform:A:B or poisson:L")
+
+
+def write_db(output, posts, comments_per_post, seed, text_pool_size):
+    rng = random.Random(seed)
+    faker = Faker()
+    Faker.seed(seed)
+    titles = [faker.sentence(nb_words=6) for _ in range(text_pool_size)]
+    authors = [faker.name() for _ in range(text_pool_size)]
+    bodies = [faker.sentence(nb_words=10) for _ in range(text_pool_size)]
+    sample_comments = comments_per_post_sampler(comments_per_post, rng)
+    dumps = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+
+    output.write('{"posts":[\n')
+    for post_id in range(1, posts + 1):
+        post = {"id": str(post_id), "title": rng.choice(titles), "author": rng.choice(authors)}
+        output.write(("," if post_id > 1 else "") + dumps(post) + "\n")
+
+    output.write('],"comments":[\n')
+    comment_id = 0
+    for post_id in range(1, posts + 1):
+        for _ in range(sample_comments()):
+            comment_id += 1
+            comment = {"id": str(comment_id), "body": rng.choice(bodies), "postId": str(post_id)}
+            output.write(("," if comment_id > 1 else "") + dumps(comment) + "\n")
+
+    output.write('],"profile":{"name":"typicode"}}\n')
+    return comment_id
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a large json-server db.json")
+    parser.add_argument("--posts", type=int, default=100_000, help="Number of posts")
+    parser.add_argument("--comments-per-post", default="poisson:3",
+                        help="Distribution: fixed:N, uniform:A:B or poisson:L (default: poisson:3)")
+    parser.add_argument("--seed", type=int, default=42, help="Seed for reproducible output")
+    parser.add_argument("--text-pool-size", type=int, default=10_000,
+                        help="Distinct Faker titles/authors/bodies to draw rows from")
+    parser.add_argument("--output", default="db.json", help="Output file, '-' for stdout")
+    args = parser.parse_args(argv)
+
+    if args.output == "-":
+        comments = write_db(sys.stdout, args.posts, args.comments_per_post, args.seed, args.text_pool_size)
+    else:
+        with open(args.output, "w", encoding="utf-8", buffering=1024 * 1024) as output:
+            comments = write_db(output, args.posts, args.comments_per_post, args.seed, args.text_pool_size)
+    print(f"{args.output}: {args.posts} posts, {comments} comments", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,3 +3,8 @@ from .helper_posts import HelperPosts
 from .helper_comments import HelperComments
 from .helper_profile import HelperProfile
 from .helper_performance import HelperPerformance
+from .helper_benchmark import HelperBenchmark
+from .payload_pool import PayloadPool, shared_payload_pool, close_shared_payload_pool
+from .data_pool import LeasedDataPool
+from .flow import Flow, FlowResult
+from .workload_mix import WorkloadScenario, ScenarioOperation, ScenarioResult, PAYLOAD_FACTORIES, ID_FACTORIES
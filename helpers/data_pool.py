@@ -0,0 +1,109 @@
+import copy
+import threading
+from contextlib import contextmanager
+from core import PostFields
+from .helper_posts import HelperPosts
+from .helper_comments import HelperComments
+from .payload_pool import shared_payload_pool
+
+POSTS = "posts"
+COMMENTS = "comments"
+SETUP_REQUESTS = {POSTS: 1, COMMENTS: 2}  # requests a test sent to create its own post / post and comment
+
+
+class LeasedDataPool:
+    """
+    Session pool of posts and comments that tests lease instead of creating their own over HTTP.
+
+        shared lease     the test only reads the resource or attaches new data to it (e.g. a comment to a post);
+                         afterwards the resource goes back to the pool and is leased again by later tests
+        exclusive lease  the test may update or delete the resource; nobody else gets it while it is leased
+                         and it is retired afterwards, so every exclusive lease gets a pristine resource
+
+    The shared post and comment are created once, on their first lease. Exclusive resources are created
+    on demand, one per lease, so the pool never creates anything a test does not use; an exclusive
+    comment is attached to the shared post, which still saves its test the post. Every xdist worker
+    has its own pool and only leases resources it created itself; `stats()` of all workers are summed
+    up by the controller.
+    """
+    def __init__(self, helper_posts=None, helper_comments=None, payload_pool=None):
+        self.helper_posts = helper_posts or HelperPosts()
+        self.helper_comments = helper_comments or HelperComments()
+        self.payload_pool = payload_pool or shared_payload_pool()
+        self._lock = threading.Lock()
+        self._shared = {POSTS: None, COMMENTS: None}
+        self.setup_requests = 0
+        self.shared_leases = 0
+        self.exclusive_leases = 0
+        self.create_requests = 0
+
+    def _create(self, kind):
+        if kind == POSTS:
+            created = self.helper_posts.create_post(payload=self.payload_pool.next_post_payload())
+        else:
+            post_id = self._shared_resource(POSTS)[PostFields.ID.value]
+            created = self.helper_comments.create_comment(payload=self.payload_pool.next_comment_payload(post_id))
+        with self._lock:
+            self.create_requests += 1
+        return created
+
+    def _shared_resource(self, kind):
+        with self._lock:
+            resource = self._shared[kind]
+        if resource is None:
+            resource = self._create(kind)
+            with self._lock:
+                # two threads may race to create it, the first one wins
+                resource = self._shared[kind] = self._shared[kind] or resource
+        return resource
+
+    @contextmanager
+    def _lease(self, kind, exclusive):
+        resource = self._create(kind) if exclusive else self._shared_resource(kind)
+        with self._lock:
+            if exclusive:
+                self.exclusive_leases += 1
+            else:
+                self.shared_leases += 1
+            self.setup_requests += SETUP_REQUESTS[kind]
+        # tests get a copy, so editing the dict never changes what the next test is handed
+        yield copy.deepcopy(resource)
+
+    def lease_post(self, exclusive=False):
+        """
+        Args:
+            exclusive (bool): Whether the test updates or deletes the post.
+
+        Returns:
+            ContextManager[dict]: The leased post for the duration of the `with` block.
+        """
+        return self._lease(POSTS, exclusive)
+
+    def lease_comment(self, exclusive=False):
+        """
+        Args:
+            exclusive (bool): Whether the test updates or deletes the comment.
+
+        Returns:
+            ContextManager[dict]: The leased comment, attached to a pooled post, for the duration of the `with` block.
+        """
+        return self._lease(COMMENTS, exclusive)
+
+    @staticmethod
+    def format_stats(stats):
+        return (f"{stats['shared_leases']} shared + {stats['exclusive_leases']} exclusive leases | "
+                f"{stats['create_requests']} create requests | {stats['saved_requests']} setup requests saved")
+
+    def stats(self):
+        """
+        Returns:
+            dict: Leases handed out, create requests the pool sent, and setup requests saved, i.e. the
+            requests the leasing tests would have sent to create their own data minus the pool's.
+        """
+        return {
+            "shared_leases": self.shared_leases,
+            "exclusive_leases": self.exclusive_leases,
+            "create_requests": self.create_requests,
+            "saved_requests": self.setup_requests - self.create_requests,
+        }
+
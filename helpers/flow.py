@@ -0,0 +1,155 @@
+import time
+import pytest
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from core import configure_session_pool
+
+
+class FlowStep:
+    __slots__ = ("name", "fn", "depends_on", "started", "finished", "result")
+
+    def __init__(self, name, fn, depends_on):
+        self.name = name
+        self.fn = fn
+        self.depends_on = tuple(depends_on)
+        self.started = self.finished = None
+        self.result = None
+
+    @property
+    def duration(self):
+        return self.finished - self.started
+
+
+class FlowResult:
+    """
+    Results and timings of a `Flow` run. `result[name]` is the return value of step `name`.
+
+        wall_seconds           how long the run took
+        sequential_seconds     sum of all step durations, i.e. the time of running every step one after another
+        critical_path_seconds  duration of the longest dependency chain, the floor of `wall_seconds`
+    """
+    def __init__(self, name, steps, wall_seconds):
+        self.name = name
+        self.steps = steps
+        self.wall_seconds = wall_seconds
+        self.sequential_seconds = sum(step.duration for step in steps.values())
+        self.critical_path, self.critical_path_seconds = self._critical_path(steps)
+
+    @staticmethod
+    def _critical_path(steps):
+        # steps only depend on steps added before them, so insertion order is a topological order
+        finish, previous = {}, {}
+        for name, step in steps.items():
+            before = max(step.depends_on, key=lambda dependency: finish[dependency], default=None)
+            previous[name] = before
+            finish[name] = step.duration + (finish[before] if before else 0.0)
+        if not finish:
+            return [], 0.0
+        name = max(finish, key=finish.get)
+        total, path = finish[name], []
+        while name:
+            path.append(name)
+            name = previous[name]
+        return path[::-1], total
+
+    def __getitem__(self, name):
+        return self.steps[name].result
+
+    @property
+    def speedup(self):
+        return self.sequential_seconds / self.wall_seconds if self.wall_seconds else 1.0
+
+    def timeline(self):
+        """
+        Returns:
+            List[dict]: Every step with its dependencies and start/end offsets (ms) from the start of the run.
+        """
+        origin = min((step.started for step in self.steps.values()), default=0.0)
+        return [{"step": step.name, "depends_on": list(step.depends_on),
+                 "start_ms": round((step.started - origin) * 1000, 3),
+                 "end_ms": round((step.finished - origin) * 1000, 3)}
+                for step in self.steps.values()]
+
+    def summary(self):
+        return (f"{self.name} | {len(self.steps)} steps | wall {self.wall_seconds * 1000:.1f}ms | "
+                f"critical path {self.critical_path_seconds * 1000:.1f}ms ({' -> '.join(self.critical_path)}) | "
+                f"sequential {self.sequential_seconds * 1000:.1f}ms | speedup x{self.speedup:.2f}")
+
+
+class Flow:
+    """
+    Dependency graph of e2e flow steps. Each step names the steps it depends on and is called with
+    their results, in `depends_on` order; steps whose dependencies are done run concurrently, so a
+    flow takes about its critical path instead of the sum of its steps:
+
+        flow = Flow("post with comments")
+        flow.step("post", lambda: helper_posts.create_post(payload=post_payload))
+        flow.step("first", lambda post: helper_comments.create_comment(payload=...), depends_on=["post"])
+        flow.step("second", lambda post: helper_comments.create_comment(payload=...), depends_on=["post"])
+        result = flow.run()
+        result["first"], result.critical_path_seconds
+
+    Dependencies must be added before the steps using them, which also rules out cycles.
+    The first failing step fails the run: no further steps are started and its exception is re-raised.
+    """
+    def __init__(self, name="flow", max_parallel=8):
+        self.name = name
+        self.max_parallel = max_parallel
+        self._steps = {}
+
+    def step(self, name, fn, depends_on=()):
+        """
+        Args:
+            name (str): Unique step name.
+            fn (Callable): Called with the results of `depends_on` as positional arguments.
+            depends_on (Iterable[str]): Names of steps added earlier that must finish first.
+
+        Returns:
+            Flow: self, so steps can be chained.
+        """
+        if name in self._steps:
+            raise ValueError(f"Duplicate flow step: {name}")
+        unknown = [dependency for dependency in depends_on if dependency not in self._steps]
+        if unknown:
+            raise ValueError(f"Step {name} depends on unknown steps {unknown}. Add dependencies first")
+        self._steps[name] = FlowStep(name, fn, depends_on)
+        return self
+
+    @staticmethod
+    def _execute(step, dependencies):
+        step.started = time.perf_counter()
+        try:
+            step.result = step.fn(*(dependencies[name].result for name in step.depends_on))
+        finally:
+            step.finished = time.perf_counter()
+        return step
+
+    def run(self):
+        """
+        Runs every step as soon as its dependencies are done.
+
+        Returns:
+            FlowResult: Step results with the wall, critical-path and sequential time of the run.
+        """
+        configure_session_pool(pool_size=self.max_parallel)
+        steps = {name: FlowStep(name, step.fn, step.depends_on) for name, step in self._steps.items()}
+        waiting = dict(steps)
+        done = set()
+        started = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=self.max_parallel, thread_name_prefix="flow-step") as executor:
+            running = set()
+            while waiting or running:
+                for name, step in list(waiting.items()):
+                    if all(dependency in done for dependency in step.depends_on):
+                        running.add(executor.submit(self._execute, step, steps))
+                        del waiting[name]
+                finished, running = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    if future.exception() is not None:
+                        wait(running)  # let steps already in flight finish, start nothing new
+                        raise future.exception()
+                    done.add(future.result().name)
+
+        result = FlowResult(self.name, steps, time.perf_counter() - started)
+        pytest.logger.info(f"[Flow] {result.summary()}")
+        return result
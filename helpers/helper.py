@@ -1,4 +1,9 @@
+import time
 import pytest
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+from core import (BASE_URL, HTTPStatusCodes, latency_recorder, phase_recorder, json_codec, LazyJson,
+                  configure_session_pool, request_log_sampler, PER_REQUEST, RESPONSE_CACHE, response_cache,
+                  rate_governor, retry_policy, SAMPLE_STORE, shared_sample_store)
 from request_builders.request_builder_blog import BlogApiController
 
 
@@ -6,25 +11,174 @@ class Helper:
     """
     Base helper class that provides generic API request functionality
     used by other specific helper classes (Posts, Comments, Profile, Performance).
+    Every request method has an `_async` twin that runs on an asyncio event loop.
+    Each response time is recorded in `latency_recorder` per endpoint key and status code,
+    and its connect/send/time-to-first-byte/transfer phases in `phase_recorder`.
+    Bodies are decoded with the fastest available JSON backend; pass `lazy_json=True` to get a
+    `LazyJson` view that is only decoded when a field is first accessed.
+    Per-request log lines are sampled by `request_log_sampler` while a load or bulk run is active.
+    Reads go through a conditional-GET `ResponseCache` when one is passed as `cache`, or through the
+    process-wide `response_cache` with RESPONSE_CACHE=true.
+    Requests are throttled by `rate_governor` when CLIENT_RATE_LIMIT(_ENDPOINTS) is set; its wait is
+    recorded as the `throttle` phase and left out of the recorded latency.
+    Transient failures of idempotent requests are retried per request by `retry_policy`.
+    With SAMPLE_STORE=true every request is also kept as a sample in this process's `shared_sample_store()`.
     """
-    def __init__(self):
-        self.controller = BlogApiController()
+    def __init__(self, base_url=BASE_URL, cache=None):
+        if cache is None and RESPONSE_CACHE:
+            cache = response_cache
+        self.controller = BlogApiController(base_url=base_url, cache=cache, governor=self.default_governor(),
+                                            retry_policy=retry_policy if retry_policy.enabled else None,
+                                            sample_store=self.default_sample_store())
 
-    def _send_request(self, endpoint_key, expected_status, **kwargs):
-        pytest.logger.info(f"Sending request: {endpoint_key}")
-        response = self.controller.request(endpoint_key, **kwargs)
+    @staticmethod
+    def default_governor():
+        return rate_governor if rate_governor.enabled else None
+
+    @staticmethod
+    def default_sample_store():
+        return shared_sample_store() if SAMPLE_STORE else None
+
+    @staticmethod
+    def _server_latency(response, started):
+        """Seconds since `started`, minus the time the request waited in the rate governor."""
+        throttled = response.phases.throttle if response.phases else 0.0
+        return time.perf_counter() - started - throttled
+
+    @staticmethod
+    def _parse_response(response, expected_status, **kwargs):
         assert response.status_code == expected_status, \
             f"Expected status code {expected_status}. Actual status code: {response.status_code}"
 
         expect_json = kwargs.get("expect_json", True)
         if expect_json:
+            if kwargs.get("lazy_json", False):
+                return LazyJson(response.content)
             try:
-                return response.json()
+                return json_codec.loads(response.content)
             except ValueError:
                 return {}
         return None
 
-    def _send_request_and_return_response(self, endpoint_key, **kwargs):
-        pytest.logger.info(f"Sending request: {endpoint_key}")
+    def _timed_request(self, endpoint_key, **kwargs):
+        started = time.perf_counter()
         response = self.controller.request(endpoint_key, **kwargs)
+        latency_recorder.record(endpoint_key, response.status_code, self._server_latency(response, started))
+        phase_recorder.record_phases(endpoint_key, response.status_code, response.phases)
+        return response
+
+    async def _timed_request_async(self, endpoint_key, **kwargs):
+        started = time.perf_counter()
+        response = await self.controller.request_async(endpoint_key, **kwargs)
+        latency_recorder.record(endpoint_key, response.status_code, self._server_latency(response, started))
+        phase_recorder.record_phases(endpoint_key, response.status_code, response.phases)
         return response
+
+    def _send_request(self, endpoint_key, expected_status, **kwargs):
+        pytest.logger.info(f"Sending request: {endpoint_key}", extra=PER_REQUEST)
+        response = self._timed_request(endpoint_key, **kwargs)
+        return self._parse_response(response, expected_status, **kwargs)
+
+    def _send_request_and_return_response(self, endpoint_key, **kwargs):
+        pytest.logger.info(f"Sending request: {endpoint_key}", extra=PER_REQUEST)
+        response = self._timed_request(endpoint_key, **kwargs)
+        return response
+
+    async def _send_request_async(self, endpoint_key, expected_status, **kwargs):
+        pytest.logger.info(f"Sending async request: {endpoint_key}", extra=PER_REQUEST)
+        response = await self._timed_request_async(endpoint_key, **kwargs)
+        return self._parse_response(response, expected_status, **kwargs)
+
+    async def _send_request_and_return_response_async(self, endpoint_key, **kwargs):
+        pytest.logger.info(f"Sending async request: {endpoint_key}", extra=PER_REQUEST)
+        response = await self._timed_request_async(endpoint_key, **kwargs)
+        return response
+
+    @staticmethod
+    def _page_params(page_index, page_size, pagination):
+        if pagination == "page":
+            return {"_page": page_index + 1, "_per_page": page_size}
+        if pagination == "offset":
+            return {"_start": page_index * page_size, "_limit": page_size}
+        raise ValueError(f"Unknown pagination style: {pagination}. Expected 'page' or 'offset'")
+
+    def _fetch_page(self, endpoint_key, page_index, page_size, pagination, params):
+        """
+        Returns:
+            Tuple[list, bool]: Rows of the page and whether another page may follow.
+        """
+        page_params = {**(params or {}), **self._page_params(page_index, page_size, pagination)}
+        body = self._send_request(endpoint_key, HTTPStatusCodes.OK.value, params=page_params)
+        if isinstance(body, dict) and "data" in body:
+            # json-server v1 wraps `_page`/`_per_page` results: {"data": [...], "next": 2, ...}
+            return body["data"], body.get("next") is not None
+        return body, len(body) >= page_size
+
+    def _iter_pages(self, endpoint_key, page_size=100, pagination="page", prefetch=True, params=None):
+        """
+        Yields the rows of a collection endpoint one page at a time. With `prefetch`, the next page is
+        requested in the background while the caller consumes the current one, so at most two pages
+        are held in memory.
+
+        Args:
+            endpoint_key (BlogApiEndpointKeys): Collection route, e.g. GET_POSTS or GET_COMMENTS.
+            page_size (int): Rows per request.
+            pagination (str): "page" for `_page`/`_per_page`, "offset" for `_start`/`_limit`.
+            prefetch (bool): Fetch the next page while the current one is consumed.
+            params (dict): Extra query parameters, e.g. filters like {"postId": "1"}.
+        """
+        prefetcher = ThreadPoolExecutor(max_workers=1, thread_name_prefix="page-prefetch")
+
+        def fetch(page_index):
+            if prefetch:
+                return prefetcher.submit(self._fetch_page, endpoint_key, page_index, page_size, pagination, params)
+            future = Future()
+            future.set_result(self._fetch_page(endpoint_key, page_index, page_size, pagination, params))
+            return future
+
+        try:
+            page_index = 0
+            pending = fetch(page_index)
+            while pending is not None:
+                rows, has_more = pending.result()
+                pending = fetch(page_index + 1) if has_more and rows else None
+                yield from rows
+                page_index += 1
+        finally:
+            prefetcher.shutdown(wait=False, cancel_futures=True)
+
+    def _bulk_send(self, endpoint_key, expected_status, payloads, max_parallel, on_result=None):
+        """
+        Sends one request per payload with at most `max_parallel` requests in flight. Payloads are
+        consumed lazily, so a generator of millions of payloads never sits in memory at once. The
+        responses do unless `on_result` is given: then each one is handed to it as it completes and
+        dropped, which keeps seeding runs of any size flat in memory.
+
+        Args:
+            on_result (Callable[[dict], None]): Receives every decoded response instead of collecting them.
+
+        Returns:
+            list | int: Decoded responses in completion order, or the number sent when `on_result` is given.
+        """
+        configure_session_pool(pool_size=max_parallel)
+        results = []
+        sent = 0
+
+        def collect(futures):
+            for future in futures:
+                if on_result is None:
+                    results.append(future.result())
+                else:
+                    on_result(future.result())
+
+        with request_log_sampler.sampling(), \
+                ThreadPoolExecutor(max_workers=max_parallel, thread_name_prefix="bulk-send") as executor:
+            pending = set()
+            for payload in payloads:
+                if len(pending) >= max_parallel * 2:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    collect(done)
+                pending.add(executor.submit(self._send_request, endpoint_key, expected_status, payload=payload))
+                sent += 1
+            collect(wait(pending).done)
+        return results if on_result is None else sent
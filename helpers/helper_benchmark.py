@@ -0,0 +1,111 @@
+import pytest
+from collections import deque
+from .helper_performance import HelperPerformance
+from core import (BASE_URL, HTTPStatusCodes, BlogApiEndpointKeys, PostFields, CommentFields,
+                  BENCHMARK_REQUESTS, BENCHMARK_CONCURRENCY, ClosedLoopRunner)
+from .payload_pool import shared_payload_pool
+
+
+class HelperBenchmark(HelperPerformance):
+    """
+    Helper class for the throughput/latency benchmarks of every blog API route.
+    Prepares whatever a route needs (existing ids, payloads) outside the measured window,
+    then sends `total_requests` requests from `concurrency` workers in a closed loop.
+    """
+    EXPECTED_STATUS = {
+        BlogApiEndpointKeys.CREATE_POST: HTTPStatusCodes.CREATED.value,
+        BlogApiEndpointKeys.CREATE_COMMENT: HTTPStatusCodes.CREATED.value,
+    }
+
+    def __init__(self, total_requests=BENCHMARK_REQUESTS, concurrency=BENCHMARK_CONCURRENCY, base_url=BASE_URL):
+        super().__init__(threads=concurrency, base_url=base_url)
+        self.total_requests = total_requests
+        self.concurrency = concurrency
+        self.payload_pool = shared_payload_pool()
+
+    def expected_status(self, endpoint_key):
+        return self.EXPECTED_STATUS.get(endpoint_key, HTTPStatusCodes.OK.value)
+
+    def _post_payload(self):
+        return self.payload_pool.next_post_payload()
+
+    def _comment_payload(self, post_id):
+        return self.payload_pool.next_comment_payload(post_id)
+
+    def _create_post(self):
+        return self._send_request(BlogApiEndpointKeys.CREATE_POST, HTTPStatusCodes.CREATED.value,
+                                  payload=self._post_payload())[PostFields.ID.value]
+
+    def _create_comment(self, post_id):
+        return self._send_request(BlogApiEndpointKeys.CREATE_COMMENT, HTTPStatusCodes.CREATED.value,
+                                  payload=self._comment_payload(post_id))[CommentFields.ID.value]
+
+    def _call_with(self, endpoint_key, kwargs_queue):
+        """
+        Returns a request function that consumes one prepared set of request kwargs per call.
+        """
+        def make_call():
+            return self._send_request_and_return_response(endpoint_key, **kwargs_queue.popleft()).status_code
+        return make_call
+
+    def build_request_fn(self, endpoint_key: BlogApiEndpointKeys):
+        """
+        Creates the resources and payloads the route needs and returns the function to benchmark.
+
+        Args:
+            endpoint_key (BlogApiEndpointKeys): Route to benchmark.
+
+        Returns:
+            Callable: Blocking request function returning the status code.
+        """
+        total = self.total_requests
+        key = BlogApiEndpointKeys
+        if endpoint_key in (key.GET_POSTS, key.GET_COMMENTS, key.GET_PROFILE):
+            return self.endpoint_request_fn(endpoint_key)
+
+        if endpoint_key == key.UPDATE_PROFILE:
+            # PUT the current profile back, so concurrently running profile tests see no change
+            profile = self._send_request(key.GET_PROFILE, HTTPStatusCodes.OK.value)
+            return self.endpoint_request_fn(endpoint_key, payload=profile)
+
+        if endpoint_key == key.CREATE_POST:
+            return self._call_with(endpoint_key, deque({"payload": self._post_payload()} for _ in range(total)))
+
+        post_id = self._create_post()
+        if endpoint_key == key.GET_POST_BY_ID:
+            return self.endpoint_request_fn(endpoint_key, id=post_id)
+        if endpoint_key == key.UPDATE_POST:
+            return self._call_with(endpoint_key, deque({"id": post_id, "payload": self._post_payload()}
+                                                       for _ in range(total)))
+        if endpoint_key == key.DELETE_POST:
+            return self._call_with(endpoint_key, deque({"id": self._create_post()} for _ in range(total)))
+        if endpoint_key == key.CREATE_COMMENT:
+            return self._call_with(endpoint_key, deque({"payload": self._comment_payload(post_id)}
+                                                       for _ in range(total)))
+
+        comment_id = self._create_comment(post_id)
+        if endpoint_key == key.GET_COMMENT_BY_ID:
+            return self.endpoint_request_fn(endpoint_key, id=comment_id)
+        if endpoint_key == key.UPDATE_COMMENT:
+            return self._call_with(endpoint_key, deque({"id": comment_id, "payload": self._comment_payload(post_id)}
+                                                       for _ in range(total)))
+        if endpoint_key == key.DELETE_COMMENT:
+            return self._call_with(endpoint_key, deque({"id": self._create_comment(post_id)} for _ in range(total)))
+        raise ValueError(f"No benchmark defined for endpoint key: {endpoint_key}")
+
+    def benchmark_endpoint(self, endpoint_key: BlogApiEndpointKeys):
+        """
+        Args:
+            endpoint_key (BlogApiEndpointKeys): Route to benchmark.
+
+        Returns:
+            LoadResult: Samples of the measured requests; `achieved_rate` is the throughput.
+        """
+        request_fn = self.build_request_fn(endpoint_key)
+        runner = ClosedLoopRunner(total_requests=self.total_requests, concurrency=self.concurrency)
+        with self.load_mode():
+            result = runner.run(request_fn)
+        pytest.logger.info(f"[Benchmark] {endpoint_key.value} | {result.summary()} | "
+                           f"p95={result.latency_percentile(95) * 1000:.1f}ms")
+        self.last_result = result
+        return result
@@ -1,4 +1,5 @@
-from core import BlogApiEndpointKeys, HTTPStatusCodes
+from core import BASE_URL, BlogApiEndpointKeys, HTTPStatusCodes, CommentFields, BULK_MAX_PARALLEL
+from schemas import CommentPayload
 from .helper import Helper
 
 
@@ -7,11 +8,19 @@ class HelperComments(Helper):
     Helper class for handling all operations related to /comments endpoints.
     Includes create, retrieve, update, and delete functionalities for comments.
     """
-    def __init__(self):
-        super().__init__()
+    def __init__(self, base_url=BASE_URL, cache=None):
+        super().__init__(base_url=base_url, cache=cache)
 
-    def get_comments(self, expected_status=HTTPStatusCodes.OK.value):
-        return self._send_request(BlogApiEndpointKeys.GET_COMMENTS, expected_status)
+    def get_comments(self, expected_status=HTTPStatusCodes.OK.value, lazy_json=False, post_id=None):
+        params = {CommentFields.POST_ID.value: post_id} if post_id is not None else None
+        return self._send_request(BlogApiEndpointKeys.GET_COMMENTS, expected_status, lazy_json=lazy_json,
+                                  params=params)
+
+    def iter_comments(self, page_size=100, post_id=None, pagination="page", prefetch=True):
+        """Streams all comments (optionally of one post) page by page, prefetching the next page."""
+        params = {CommentFields.POST_ID.value: post_id} if post_id is not None else None
+        return self._iter_pages(BlogApiEndpointKeys.GET_COMMENTS, page_size=page_size, pagination=pagination,
+                                prefetch=prefetch, params=params)
 
     def get_comment_by_id(self, comment_id: int, expected_status=HTTPStatusCodes.OK.value, expect_json=True):
         return self._send_request(BlogApiEndpointKeys.GET_COMMENT_BY_ID, expected_status, id=comment_id,
@@ -20,9 +29,49 @@ class HelperComments(Helper):
     def create_comment(self, payload: dict, expected_status=HTTPStatusCodes.CREATED.value):
         return self._send_request(BlogApiEndpointKeys.CREATE_COMMENT, expected_status, payload=payload)
 
+    def bulk_create_comments(self, post_ids, comments_per_post=1, payload_factory=None,
+                             max_parallel=BULK_MAX_PARALLEL, expected_status=HTTPStatusCodes.CREATED.value,
+                             on_result=None) -> list | int:
+        """
+        Seeds `comments_per_post` comments on every post in `post_ids` over HTTP with bounded parallelism.
+
+        Args:
+            post_ids (Iterable[str]): Posts to comment on.
+            comments_per_post (int): Comments created per post.
+            payload_factory (Callable[[str, int], dict]): Builds the payload of comment `index` on `post_id`.
+            max_parallel (int): Maximum requests in flight.
+            on_result (Callable[[dict], None]): Receives every created comment instead of collecting them.
+
+        Returns:
+            list | int: Created comments, in completion order, or the number created with `on_result`.
+        """
+        payload_factory = payload_factory or (
+            lambda post_id, index: CommentPayload(body=f"Bulk comment {index}", postId=post_id).model_dump())
+        payloads = (payload_factory(post_id, index) for post_id in post_ids for index in range(comments_per_post))
+        return self._bulk_send(BlogApiEndpointKeys.CREATE_COMMENT, expected_status, payloads, max_parallel, on_result)
+
     def update_comment(self, comment_id: int, payload: dict, expected_status=HTTPStatusCodes.OK.value):
         return self._send_request(BlogApiEndpointKeys.UPDATE_COMMENT, expected_status, payload=payload, id=comment_id)
 
     def delete_comment(self, comment_id: int, expected_status=HTTPStatusCodes.OK.value, expect_json=True):
         return self._send_request(BlogApiEndpointKeys.DELETE_COMMENT, expected_status, id=comment_id,
                                   expect_json=expect_json)
+
+    async def get_comments_async(self, expected_status=HTTPStatusCodes.OK.value, lazy_json=False):
+        return await self._send_request_async(BlogApiEndpointKeys.GET_COMMENTS, expected_status, lazy_json=lazy_json)
+
+    async def get_comment_by_id_async(self, comment_id: int, expected_status=HTTPStatusCodes.OK.value,
+                                      expect_json=True):
+        return await self._send_request_async(BlogApiEndpointKeys.GET_COMMENT_BY_ID, expected_status, id=comment_id,
+                                              expect_json=expect_json)
+
+    async def create_comment_async(self, payload: dict, expected_status=HTTPStatusCodes.CREATED.value):
+        return await self._send_request_async(BlogApiEndpointKeys.CREATE_COMMENT, expected_status, payload=payload)
+
+    async def update_comment_async(self, comment_id: int, payload: dict, expected_status=HTTPStatusCodes.OK.value):
+        return await self._send_request_async(BlogApiEndpointKeys.UPDATE_COMMENT, expected_status, payload=payload,
+                                              id=comment_id)
+
+    async def delete_comment_async(self, comment_id: int, expected_status=HTTPStatusCodes.OK.value, expect_json=True):
+        return await self._send_request_async(BlogApiEndpointKeys.DELETE_COMMENT, expected_status, id=comment_id,
+                                              expect_json=expect_json)
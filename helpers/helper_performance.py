@@ -1,74 +1,437 @@
+import time
+import asyncio
+import inspect
+import itertools
+import threading
+import multiprocessing
 import pytest
+from contextlib import contextmanager
 from .helper import Helper
-from core import HTTPStatusCodes, BlogApiEndpointKeys
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from .payload_pool import shared_payload_pool
+from .workload_mix import WorkloadScenario, ScenarioResult
+from core import (BASE_URL, HTTPStatusCodes, BlogApiEndpointKeys, ASYNC_MAX_IN_FLIGHT, LOAD_TARGET_RPS,
+                  LOAD_DURATION_SECONDS, LOAD_PROCESSES, configure_session_pool, connection_stats, close_async_session,
+                  latency_recorder, request_log_sampler, ConstantArrivalRateScheduler, LoadResult, SOAK_DURATION_SECONDS,
+                  SOAK_WINDOW_SECONDS, SOAK_RATE, ResourceMonitor, SoakResult, CapacitySearch, CAPACITY_STEP_SECONDS,
+                  live_metrics)
+from request_builders.request_builder_blog import BlogApiController
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+
+PROCESS_START_MARGIN_SECONDS = 2.0
+
+
+def _run_load_process(base_url, endpoint_key, rate, duration, threads, start_at, request_kwargs,
+                      live_metrics_enabled=False):
+    """
+    Entry point of one load process: its own connection pool and open-loop scheduler,
+    firing `endpoint_key` at `rate` from wall-clock time `start_at`.
+
+    Returns:
+        Tuple[List[RequestSample], dict, float]: Samples, connection stats and elapsed seconds.
+    """
+    configure_session_pool(pool_size=threads)
+    controller = BlogApiController(base_url=base_url, sample_store=HelperPerformance.default_sample_store())
+    if live_metrics_enabled:
+        live_metrics.start_publisher()  # PYTEST_LIVE_METRICS_DIR is inherited from the parent
+
+    def make_call():
+        return controller.request(endpoint_key, **request_kwargs).status_code
+
+    delay = start_at - time.time()
+    if delay > 0:
+        time.sleep(delay)
+    result = ConstantArrivalRateScheduler(rate=rate, duration=duration, max_workers=threads).run(make_call)
+    live_metrics.stop_publisher()
+    if controller.sample_store is not None:
+        controller.sample_store.flush()
+    for sample in result.samples:
+        sample.error = repr(sample.error) if sample.error else None  # exceptions may not pickle
+    return result.samples, connection_stats.snapshot(), result.elapsed
 
 
 class HelperPerformance(Helper):
     """
     Helper class designed for performance and concurrency tests.
     Allows sending multiple parallel requests to simulate load or rate-limiting checks.
+    Requests are not retried, so load results show every failure the server produced.
     """
-    def __init__(self, threads=50):
-        super().__init__()
+    def __init__(self, threads=50, max_in_flight=ASYNC_MAX_IN_FLIGHT, base_url=BASE_URL):
+        super().__init__(base_url=base_url)
         self.threads = threads
+        self.controller = BlogApiController(max_in_flight=max_in_flight, base_url=base_url,
+                                            governor=self.default_governor(), sample_store=self.default_sample_store())
+        self.last_result = None
+        configure_session_pool(pool_size=threads)
+
+    @staticmethod
+    @contextmanager
+    def load_mode():
+        """
+        Samples the per-request log lines of the requests sent inside the block, so logging does not
+        end up in the measured latency. See `RequestLogSampler`.
+        """
+        with request_log_sampler.sampling() as stats:
+            yield
+        pytest.logger.info(f"[Log Sampling] {stats['kept']} per-request log lines kept | {stats['dropped']} dropped")
 
     def simulate_parallel_requests(
             self,
             request_fn,
             expected_success,
-            expected_failure
+            expected_failure,
+            total_requests=None
     ):
         """
         Executes the provided request function in parallel across multiple threads.
+        If `request_fn` is a coroutine function, the calls run on an asyncio event loop instead
+        and concurrency is capped by the controller's in-flight semaphore.
 
         Args:
             request_fn (Callable): The function to call in each thread. Must return a status code.
             expected_success (int): Expected HTTP status code for a successful request.
             expected_failure (int): Expected HTTP status code for a failed (rate-limited) request.
+            total_requests (int): Number of calls to make. Defaults to `self.threads`.
 
         Returns:
             Tuple[int, int, int]: A count of (successes, failures, unexpected responses).
         """
-        successes, failures, others = 0, 0, 0
+        if inspect.iscoroutinefunction(request_fn):
+            return asyncio.run(self._await_and_close(self.simulate_parallel_requests_async(
+                request_fn, expected_success, expected_failure, total_requests
+            )))
+
+        total_requests = total_requests or self.threads
+        stats_before = connection_stats.snapshot()
+        results = []
 
-        with ThreadPoolExecutor(max_workers=self.threads) as executor:
-            futures = [executor.submit(request_fn) for _ in range(self.threads)]
+        with self.load_mode(), ThreadPoolExecutor(max_workers=self.threads) as executor:
+            futures = [executor.submit(request_fn) for _ in range(total_requests)]
 
             for future in as_completed(futures):
                 try:
-                    status_code = future.result()
-                    if status_code == expected_failure:
-                        failures += 1
-                    elif status_code == expected_success:
-                        successes += 1
-                    else:
-                        pytest.logger.warning(f"Unexpected response: {status_code}")
-                        others += 1
+                    results.append(future.result())
                 except Exception as e:
-                    pytest.logger.error(f"Thread call error: {e}")
-                    others += 1
+                    results.append(e)
+
+        self.report_connection_reuse(stats_before)
+        return self._count_results(results, expected_success, expected_failure)
 
+    async def simulate_parallel_requests_async(
+            self,
+            request_fn,
+            expected_success,
+            expected_failure,
+            total_requests=None
+    ):
+        """
+        Awaits `total_requests` concurrent calls of the coroutine function `request_fn` on the running loop.
+
+        Args:
+            request_fn (Callable): Coroutine function to await. Must return a status code.
+            expected_success (int): Expected HTTP status code for a successful request.
+            expected_failure (int): Expected HTTP status code for a failed (rate-limited) request.
+            total_requests (int): Number of calls to make. Defaults to `self.threads`.
+
+        Returns:
+            Tuple[int, int, int]: A count of (successes, failures, unexpected responses).
+        """
+        total_requests = total_requests or self.threads
+        stats_before = connection_stats.snapshot()
+        with self.load_mode():
+            results = await asyncio.gather(*(request_fn() for _ in range(total_requests)), return_exceptions=True)
+        self.report_connection_reuse(stats_before)
+        return self._count_results(results, expected_success, expected_failure)
+
+    @staticmethod
+    def _count_results(results, expected_success, expected_failure):
+        successes, failures, others = 0, 0, 0
+        for result in results:
+            if isinstance(result, BaseException):
+                pytest.logger.error(f"Parallel call error: {result}")
+                others += 1
+            elif result == expected_failure:
+                failures += 1
+            elif result == expected_success:
+                successes += 1
+            else:
+                pytest.logger.warning(f"Unexpected response: {result}")
+                others += 1
         return successes, failures, others
 
-    def simulate_get_post_load(self, expected_success=HTTPStatusCodes.OK.value,
-                               expected_failure=HTTPStatusCodes.TOO_MANY_REQUESTS.value):
+    @staticmethod
+    def report_connection_reuse(stats_before):
         """
-        Simulates a high-load scenario by sending multiple concurrent GET /posts requests.
+        Logs how many requests of the last run reused a pooled keep-alive connection.
 
         Args:
-            expected_success (int): Status code to treat as a success.
-            expected_failure (int): Status code to treat as a rate-limit failure.
+            stats_before (dict): `connection_stats.snapshot()` taken before the run.
 
         Returns:
-            Tuple[int, int, int]: A count of successes, failures, and unexpected results.
+            dict: Requests sent, new connections and reused connections during the run.
+        """
+        stats_after = connection_stats.snapshot()
+        requests_sent = stats_after["requests_sent"] - stats_before["requests_sent"]
+        new_connections = stats_after["new_connections"] - stats_before["new_connections"]
+        run_stats = {
+            "worker": stats_after["worker"],
+            "requests_sent": requests_sent,
+            "new_connections": new_connections,
+            "reused_connections": max(requests_sent - new_connections, 0),
+        }
+        pytest.logger.info(
+            f"[Connection Pool] worker={run_stats['worker']} | {run_stats['requests_sent']} requests | "
+            f"{run_stats['new_connections']} new connections | {run_stats['reused_connections']} reused"
+        )
+        return run_stats
+
+    def endpoint_request_fn(self, endpoint_key: BlogApiEndpointKeys, use_asyncio=False, **request_kwargs):
+        """
+        Builds a request function for any `BlogApiEndpointKeys` route that returns only the status code.
+
+        Args:
+            endpoint_key (BlogApiEndpointKeys): Route to call.
+            use_asyncio (bool): Return a coroutine function for the asyncio dispatcher.
+            **request_kwargs: Forwarded to the controller (e.g. `id`, `payload`).
+
+        Returns:
+            Callable: A request function usable by `simulate_parallel_requests` and `simulate_constant_rate`.
         """
         def make_call():
-            response = self._send_request_and_return_response(BlogApiEndpointKeys.GET_POSTS)
+            return self._send_request_and_return_response(endpoint_key, **request_kwargs).status_code
+
+        async def make_call_async():
+            response = await self._send_request_and_return_response_async(endpoint_key, **request_kwargs)
             return response.status_code
 
-        return self.simulate_parallel_requests(
-            request_fn=make_call,
-            expected_success=expected_success,
-            expected_failure=expected_failure
+        return make_call_async if use_asyncio else make_call
+
+    def simulate_constant_rate(self, request_fn, rate=LOAD_TARGET_RPS, duration=LOAD_DURATION_SECONDS):
+        """
+        Fires `request_fn` open-loop at a fixed arrival rate. Latency is measured from each request's
+        intended send time, so a slow server cannot hide behind fewer requests being sent.
+
+        Args:
+            request_fn (Callable): Blocking or coroutine function returning a status code.
+            rate (float): Target arrivals per second.
+            duration (float): How long to keep firing, in seconds.
+
+        Returns:
+            LoadResult: Per-request samples with latency percentiles and status counts.
+        """
+        scheduler = ConstantArrivalRateScheduler(rate=rate, duration=duration, max_workers=self.threads)
+        stats_before = connection_stats.snapshot()
+        with self.load_mode():
+            if inspect.iscoroutinefunction(request_fn):
+                result = asyncio.run(self._await_and_close(scheduler.run_async(request_fn)))
+            else:
+                result = scheduler.run(request_fn)
+
+        pytest.logger.info(f"[Constant Rate] {result.summary()}")
+        self.report_connection_reuse(stats_before)
+        self.last_result = result
+        return result
+
+    def simulate_constant_rate_multiprocess(self, endpoint_key: BlogApiEndpointKeys, rate=LOAD_TARGET_RPS,
+                                            duration=LOAD_DURATION_SECONDS, processes=LOAD_PROCESSES,
+                                            **request_kwargs):
+        """
+        Splits an open-loop run across worker processes so JSON handling and bookkeeping are not
+        limited by a single GIL. Each process gets `rate / processes` and a phase offset, so the
+        combined arrivals stay evenly spaced at `rate`.
+
+        Args:
+            endpoint_key (BlogApiEndpointKeys): Route to call.
+            rate (float): Combined target arrivals per second.
+            duration (float): How long to keep firing, in seconds.
+            processes (int): Number of load processes.
+            **request_kwargs: Forwarded to the controller (e.g. `id`, `payload`). Must be picklable.
+
+        Returns:
+            LoadResult: Samples of all processes merged into one result.
+        """
+        processes = max(min(processes, int(rate * duration)), 1)
+        start_at = time.time() + PROCESS_START_MARGIN_SECONDS
+        process_rate = rate / processes
+        threads = max(self.threads // processes, 1)
+
+        with ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context("spawn")) as pool:
+            futures = [
+                pool.submit(_run_load_process, self.controller.base_url, endpoint_key, process_rate, duration,
+                            threads, start_at + index / rate, request_kwargs, live_metrics.enabled)
+                for index in range(processes)
+            ]
+            outcomes = [future.result() for future in futures]
+
+        samples = [sample for process_samples, _, _ in outcomes for sample in process_samples]
+        for sample in samples:
+            if sample.status_code is not None:
+                latency_recorder.record(endpoint_key, sample.status_code, sample.latency)
+        result = LoadResult(rate, duration, samples, max(elapsed for _, _, elapsed in outcomes))
+
+        requests_sent = sum(stats["requests_sent"] for _, stats, _ in outcomes)
+        new_connections = sum(stats["new_connections"] for _, stats, _ in outcomes)
+        pytest.logger.info(f"[Constant Rate x{processes} processes] {result.summary()}")
+        pytest.logger.info(
+            f"[Connection Pool] {processes} load processes | {requests_sent} requests | "
+            f"{new_connections} new connections | {max(requests_sent - new_connections, 0)} reused"
         )
+        self.last_result = result
+        return result
+
+    def simulate_scenario(self, scenario, rate=LOAD_TARGET_RPS, duration=LOAD_DURATION_SECONDS):
+        """
+        Runs a weighted workload mix open-loop at `rate`: each arrival sends one operation picked by weight.
+
+        Args:
+            scenario (WorkloadScenario | dict): The mix, or its dict form (see `WorkloadScenario.from_dict`).
+            rate (float): Target arrivals per second over all operations.
+            duration (float): How long to keep sending, in seconds.
+
+        Returns:
+            ScenarioResult: The whole run plus a `LoadResult` per operation.
+        """
+        if isinstance(scenario, dict):
+            scenario = WorkloadScenario.from_dict(scenario)
+        request_fn, samples = scenario.request_fn(self.controller)
+        load = self.simulate_constant_rate(request_fn, rate=rate, duration=duration)
+        result = ScenarioResult(scenario, load, samples)
+        for line in result.summary().splitlines():
+            pytest.logger.info(f"[Scenario] {line}")
+        self.last_result = load
+        return result
+
+    def find_capacity(self, request_fn=None, scenario=None, step_duration=CAPACITY_STEP_SECONDS, **search_kwargs):
+        """
+        Searches the highest arrival rate the server sustains within the SLO, see `CapacitySearch`.
+        Each step is a fresh open-loop run of `step_duration` seconds.
+
+        Args:
+            request_fn (Callable): Blocking request function returning a status code, GET /posts by default.
+            scenario (WorkloadScenario | dict): Run a workload mix instead of `request_fn`.
+            step_duration (float): Length of each step in seconds.
+            **search_kwargs: Forwarded to `CapacitySearch` (`slo_p99_ms`, `max_error_rate`, `start_rps`, ...).
+
+        Returns:
+            CapacityResult: The step table, `capacity_rps` and the `knee_rps` of the latency curve.
+        """
+        if scenario is not None:
+            if isinstance(scenario, dict):
+                scenario = WorkloadScenario.from_dict(scenario)
+            request_fn, _ = scenario.request_fn(self.controller)
+        request_fn = request_fn or self.endpoint_request_fn(BlogApiEndpointKeys.GET_POSTS)
+
+        def run_step(rate):
+            scheduler = ConstantArrivalRateScheduler(rate=rate, duration=step_duration, max_workers=self.threads)
+            result = scheduler.run(request_fn)
+            pytest.logger.debug(f"[Capacity] step {result.summary()}")
+            return result
+
+        with self.load_mode():
+            result = CapacitySearch(run_step, **search_kwargs).run()
+        pytest.logger.info(f"[Capacity] {result.summary()}\n{result.table()}")
+        return result
+
+    def soak_request_fn(self):
+        """
+        Steady mixed workload for `soak`: reads of /posts and /profile, and a post created and deleted
+        again, in turn. Every write is undone, so the server's data does not grow over hours.
+
+        Returns:
+            Callable: A request function returning the status code of the (last failed) request.
+        """
+        payload_pool = shared_payload_pool()
+        operations = itertools.cycle(["read_posts", "read_profile", "create_delete_post"])
+        lock = threading.Lock()
+
+        def make_call():
+            with lock:
+                operation = next(operations)
+            if operation == "read_posts":
+                return self.controller.request(BlogApiEndpointKeys.GET_POSTS).status_code
+            if operation == "read_profile":
+                return self.controller.request(BlogApiEndpointKeys.GET_PROFILE).status_code
+            created = self.controller.request(BlogApiEndpointKeys.CREATE_POST,
+                                              payload=payload_pool.next_post_payload())
+            if created.status_code != HTTPStatusCodes.CREATED.value:
+                return created.status_code
+            return self.controller.request(BlogApiEndpointKeys.DELETE_POST, id=created.json()["id"]).status_code
+
+        return make_call
+
+    def soak(self, duration=SOAK_DURATION_SECONDS, window=SOAK_WINDOW_SECONDS, rate=SOAK_RATE, request_fn=None,
+             monitor=None, limits=None, warmup_windows=1):
+        """
+        Runs a steady open-loop workload for a long time, one window after another, and records per window
+        the latency percentiles, client RSS and open file descriptors, and the server process RSS.
+        Only the window's numbers are kept, so a run of hours does not grow the client itself.
+
+        Args:
+            duration (float): Total run time in seconds.
+            window (float): Length of one measurement window in seconds.
+            rate (float): Target arrivals per second.
+            request_fn (Callable): Blocking request function, `soak_request_fn()` by default.
+            monitor (ResourceMonitor): Resource sampler, one for BASE_URL's server by default.
+            limits (dict): Drift limits, see `parse_drift_limits`.
+            warmup_windows (int): Leading windows left out of the drift check.
+
+        Returns:
+            SoakResult: The windows and the metrics trending upward beyond their limits (`drifts`).
+
+        Raises:
+            ValueError: When `duration` fits fewer than `warmup_windows + 2` windows, too few to fit a trend.
+        """
+        window_count = int(round(duration / window))
+        if window_count < warmup_windows + 2:
+            raise ValueError(f"A soak run needs at least {warmup_windows + 2} windows of {window}s to detect drift, "
+                             f"got {window_count} ({duration}s). Raise the duration or shorten the window")
+        request_fn = request_fn or self.soak_request_fn()
+        monitor = monitor or ResourceMonitor(self.controller.base_url)
+        windows = []
+        started = time.perf_counter()
+        with self.load_mode():
+            for _ in range(window_count):
+                scheduler = ConstantArrivalRateScheduler(rate=rate, duration=window, max_workers=self.threads)
+                result = scheduler.run(request_fn)
+                failed = sum(1 for sample in result.samples
+                             if sample.error or sample.status_code is None or sample.status_code >= 400)
+                windows.append({
+                    "elapsed_s": round(time.perf_counter() - started, 3),
+                    "requests": result.total,
+                    "errors": failed,
+                    "p50_ms": round(result.latency_percentile(50) * 1000, 3),
+                    "p99_ms": round(result.latency_percentile(99) * 1000, 3),
+                    **monitor.sample(),
+                })
+                pytest.logger.debug(f"[Soak] window {len(windows)} | {windows[-1]}")
+
+        soak_result = SoakResult(windows, limits, warmup_windows)
+        pytest.logger.info(f"[Soak] {soak_result.summary()}")
+        return soak_result
+
+    @staticmethod
+    async def _await_and_close(coroutine):
+        try:
+            return await coroutine
+        finally:
+            await close_async_session()
+
+    def simulate_get_post_load(self, expected_success=HTTPStatusCodes.OK.value,
+                               expected_failure=HTTPStatusCodes.TOO_MANY_REQUESTS.value,
+                               use_asyncio=False, rate=LOAD_TARGET_RPS, duration=LOAD_DURATION_SECONDS):
+        """
+        Simulates a high-load scenario by sending GET /posts requests at a constant arrival rate.
+        The full `LoadResult` of the run is kept in `self.last_result`.
+
+        Args:
+            expected_success (int): Status code to treat as a success.
+            expected_failure (int): Status code to treat as a rate-limit failure.
+            use_asyncio (bool): Send the requests from an event loop instead of a thread pool.
+            rate (float): Target requests per second.
+            duration (float): How long to keep sending, in seconds.
+
+        Returns:
+            Tuple[int, int, int]: A count of successes, failures, and unexpected results.
+        """
+        request_fn = self.endpoint_request_fn(BlogApiEndpointKeys.GET_POSTS, use_asyncio=use_asyncio)
+        result = self.simulate_constant_rate(request_fn, rate=rate, duration=duration)
+        return result.count_statuses(expected_success, expected_failure)
@@ -1,4 +1,5 @@
-from core import HTTPStatusCodes, BlogApiEndpointKeys
+from core import BASE_URL, HTTPStatusCodes, BlogApiEndpointKeys, BULK_MAX_PARALLEL
+from schemas import PostPayload
 from .helper import Helper
 
 
@@ -7,11 +8,16 @@ class HelperPosts(Helper):
     Helper class for handling all operations related to /posts endpoints.
     Includes create, retrieve, update, and delete functionalities.
     """
-    def __init__(self):
-        super().__init__()
+    def __init__(self, base_url=BASE_URL, cache=None):
+        super().__init__(base_url=base_url, cache=cache)
 
-    def get_posts(self, expected_status=HTTPStatusCodes.OK.value) -> list:
-        return self._send_request(BlogApiEndpointKeys.GET_POSTS, expected_status)
+    def get_posts(self, expected_status=HTTPStatusCodes.OK.value, lazy_json=False) -> list:
+        return self._send_request(BlogApiEndpointKeys.GET_POSTS, expected_status, lazy_json=lazy_json)
+
+    def iter_posts(self, page_size=100, pagination="page", prefetch=True):
+        """Streams all posts page by page, prefetching the next page in the background."""
+        return self._iter_pages(BlogApiEndpointKeys.GET_POSTS, page_size=page_size, pagination=pagination,
+                                prefetch=prefetch)
 
     def get_post_by_id(self, post_id, expected_status=HTTPStatusCodes.OK.value, expect_json=True):
         return self._send_request(BlogApiEndpointKeys.GET_POST_BY_ID, expected_status, id=post_id,
@@ -20,8 +26,45 @@ class HelperPosts(Helper):
     def create_post(self, payload, expected_status=HTTPStatusCodes.CREATED.value):
         return self._send_request(BlogApiEndpointKeys.CREATE_POST, expected_status, payload=payload)
 
+    def bulk_create_posts(self, count, payload_factory=None, max_parallel=BULK_MAX_PARALLEL,
+                          expected_status=HTTPStatusCodes.CREATED.value, on_result=None) -> list | int:
+        """
+        Seeds `count` posts over HTTP with bounded parallelism.
+
+        Args:
+            count (int): Number of posts to create.
+            payload_factory (Callable[[int], dict]): Builds the payload of post `index`.
+            max_parallel (int): Maximum requests in flight.
+            on_result (Callable[[dict], None]): Receives every created post instead of collecting them.
+
+        Returns:
+            list | int: Created posts, in completion order, or the number created with `on_result`.
+        """
+        payload_factory = payload_factory or (
+            lambda index: PostPayload(title=f"Bulk post {index}", author="bulk-seeder").model_dump())
+        payloads = (payload_factory(index) for index in range(count))
+        return self._bulk_send(BlogApiEndpointKeys.CREATE_POST, expected_status, payloads, max_parallel, on_result)
+
     def update_post(self, post_id, payload, expected_status=HTTPStatusCodes.OK.value):
         return self._send_request(BlogApiEndpointKeys.UPDATE_POST, expected_status, payload=payload, id=post_id)
 
     def delete_post(self, post_id, expected_status=HTTPStatusCodes.OK.value, expect_json=True):
         return self._send_request(BlogApiEndpointKeys.DELETE_POST, expected_status, id=post_id, expect_json=expect_json)
+
+    async def get_posts_async(self, expected_status=HTTPStatusCodes.OK.value, lazy_json=False) -> list:
+        return await self._send_request_async(BlogApiEndpointKeys.GET_POSTS, expected_status, lazy_json=lazy_json)
+
+    async def get_post_by_id_async(self, post_id, expected_status=HTTPStatusCodes.OK.value, expect_json=True):
+        return await self._send_request_async(BlogApiEndpointKeys.GET_POST_BY_ID, expected_status, id=post_id,
+                                              expect_json=expect_json)
+
+    async def create_post_async(self, payload, expected_status=HTTPStatusCodes.CREATED.value):
+        return await self._send_request_async(BlogApiEndpointKeys.CREATE_POST, expected_status, payload=payload)
+
+    async def update_post_async(self, post_id, payload, expected_status=HTTPStatusCodes.OK.value):
+        return await self._send_request_async(BlogApiEndpointKeys.UPDATE_POST, expected_status, payload=payload,
+                                              id=post_id)
+
+    async def delete_post_async(self, post_id, expected_status=HTTPStatusCodes.OK.value, expect_json=True):
+        return await self._send_request_async(BlogApiEndpointKeys.DELETE_POST, expected_status, id=post_id,
+                                              expect_json=expect_json)
@@ -1,4 +1,4 @@
-from core import BlogApiEndpointKeys, HTTPStatusCodes
+from core import BASE_URL, BlogApiEndpointKeys, HTTPStatusCodes
 from .helper import Helper
 
 
@@ -7,11 +7,17 @@ class HelperProfile(Helper):
     Helper class for managing the /profile endpoint.
     Handles fetching and updating the profile information.
     """
-    def __init__(self):
-        super().__init__()
+    def __init__(self, base_url=BASE_URL, cache=None):
+        super().__init__(base_url=base_url, cache=cache)
 
     def get_profile(self, expected_status=HTTPStatusCodes.OK.value):
         return self._send_request(BlogApiEndpointKeys.GET_PROFILE, expected_status)
 
     def update_profile(self, payload: dict, expected_status=HTTPStatusCodes.OK.value):
         return self._send_request(BlogApiEndpointKeys.UPDATE_PROFILE, expected_status, payload=payload)
+
+    async def get_profile_async(self, expected_status=HTTPStatusCodes.OK.value):
+        return await self._send_request_async(BlogApiEndpointKeys.GET_PROFILE, expected_status)
+
+    async def update_profile_async(self, payload: dict, expected_status=HTTPStatusCodes.OK.value):
+        return await self._send_request_async(BlogApiEndpointKeys.UPDATE_PROFILE, expected_status, payload=payload)
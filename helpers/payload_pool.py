@@ -0,0 +1,152 @@
+import os
+import mmap
+import struct
+import tempfile
+import itertools
+import threading
+from faker import Faker
+from core import json_codec, PAYLOAD_POOL_SIZE, PAYLOAD_POOL_SEED
+from schemas import PostPayload, CommentPayload, collection_adapter
+
+POOL_MAGIC = b"PAYPOOL1"
+_HEADER = struct.Struct("<8sII")  # magic, number of post payloads, number of comment payloads
+
+
+def generate_payloads(size, seed, batch_size=1000):
+    """
+    Yields `size` (post payload, comment payload) pairs in validated batches.
+    Words and names are drawn from Faker in one bulk call per batch instead of one provider call per field,
+    which keeps building 10k payloads well under a second. The same seed always yields the same payloads.
+    """
+    faker = Faker()
+    faker.seed_instance(seed)
+    person = faker.provider("faker.providers.person")
+    posts_adapter, comments_adapter = collection_adapter(PostPayload), collection_adapter(CommentPayload)
+
+    for start in range(0, size, batch_size):
+        count = min(batch_size, size - start)
+        words = iter(faker.words(nb=count * 16))
+        first_names = faker.random_elements(person.first_names, length=count, use_weighting=True)
+        last_names = faker.random_elements(person.last_names, length=count, use_weighting=True)
+
+        def sentence(nb_words):
+            return " ".join(next(words) for _ in range(nb_words)).capitalize() + "."
+
+        posts = posts_adapter.validate_python([
+            {"title": sentence(6), "author": f"{first_names[index]} {last_names[index]}"} for index in range(count)
+        ])
+        comments = comments_adapter.validate_python([{"body": sentence(10), "postId": ""} for _ in range(count)])
+        yield from zip(posts_adapter.dump_python(posts), comments_adapter.dump_python(comments))
+
+
+class PayloadPool:
+    """
+    Read-only pool of pre-generated post and comment payloads in one memory-mapped file.
+    The controller process builds the file once per session; every xdist worker maps the same file
+    and hands out payloads round-robin from its own slice, so workers never share a payload
+    and a payload costs one orjson decode instead of a round of Faker calls and a Pydantic model.
+
+    File layout: header, (posts + 1 + comments + 1) uint64 record offsets, then the JSON records.
+    """
+    def __init__(self, path, worker=None, workers=None):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, posts, comments = _HEADER.unpack_from(self._mmap)
+        if magic != POOL_MAGIC:
+            raise ValueError(f"{path} is not a payload pool file")
+        self._offsets = memoryview(self._mmap)[_HEADER.size:_HEADER.size + (posts + comments + 2) * 8].cast("Q")
+
+        worker = int(os.getenv("PYTEST_XDIST_WORKER", "gw0")[2:]) if worker is None else worker
+        workers = int(os.getenv("PYTEST_XDIST_WORKER_COUNT", "1")) if workers is None else workers
+        self.posts = self._worker_slice(0, posts, worker, workers)
+        self.comments = self._worker_slice(posts + 1, comments, worker, workers)
+        self._post_cursor = itertools.count()
+        self._comment_cursor = itertools.count()
+
+    @staticmethod
+    def _worker_slice(first, count, worker, workers):
+        if count < workers:
+            return range(first, first + count)  # too small to split, workers share the whole section
+        return range(first + count * worker // workers, first + count * (worker + 1) // workers)
+
+    @classmethod
+    def build(cls, path, size=PAYLOAD_POOL_SIZE, seed=PAYLOAD_POOL_SEED):
+        """
+        Writes a pool of `size` post and `size` comment payloads to `path`.
+
+        Args:
+            path (str): Pool file to create, replaced if it exists.
+            size (int): Payloads per kind.
+            seed (int): Seed of the generated texts.
+
+        Returns:
+            str: The path of the pool file.
+        """
+        posts, comments = [], []
+        for post, comment in generate_payloads(size, seed):
+            posts.append(json_codec.dumps(post).encode("utf-8"))
+            comments.append(json_codec.dumps(comment).encode("utf-8"))
+
+        offsets = []
+        position = _HEADER.size + (len(posts) + len(comments) + 2) * 8
+        for records in (posts, comments):
+            for record in records:
+                offsets.append(position)
+                position += len(record)
+            offsets.append(position)
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(f"{path}.tmp", "wb") as f:
+            f.write(_HEADER.pack(POOL_MAGIC, len(posts), len(comments)))
+            f.write(struct.pack(f"<{len(offsets)}Q", *offsets))
+            f.writelines(posts)
+            f.writelines(comments)
+        os.replace(f"{path}.tmp", path)  # workers never map a half-written pool
+        return path
+
+    def _read(self, section, cursor):
+        index = section[next(cursor) % len(section)]
+        return json_codec.loads(self._mmap[self._offsets[index]:self._offsets[index + 1]])
+
+    def next_post_payload(self) -> dict:
+        """Returns a fresh copy of the next post payload of this worker's slice."""
+        return self._read(self.posts, self._post_cursor)
+
+    def next_comment_payload(self, post_id="") -> dict:
+        """Returns a fresh copy of the next comment payload of this worker's slice, commenting on `post_id`."""
+        payload = self._read(self.comments, self._comment_cursor)
+        payload["postId"] = post_id
+        return payload
+
+    def close(self):
+        self._offsets.release()
+        self._mmap.close()
+
+
+_shared_pool = None
+_shared_pool_lock = threading.Lock()
+
+
+def shared_payload_pool() -> PayloadPool:
+    """
+    Returns this process's view of the session payload pool at PYTEST_PAYLOAD_POOL.
+    Outside a pytest session a private pool is built in the temp directory on first use.
+    """
+    global _shared_pool
+    with _shared_pool_lock:
+        if _shared_pool is None:
+            path = os.getenv("PYTEST_PAYLOAD_POOL")
+            if not path or not os.path.exists(path):
+                path = PayloadPool.build(os.path.join(tempfile.mkdtemp(prefix="payload-pool-"), "payloads.bin"))
+            _shared_pool = PayloadPool(path)
+        return _shared_pool
+
+
+def close_shared_payload_pool():
+    """Closes this process's view of the session payload pool, so its file can be removed."""
+    global _shared_pool
+    with _shared_pool_lock:
+        if _shared_pool is not None:
+            _shared_pool.close()
+            _shared_pool = None
@@ -0,0 +1,194 @@
+import time
+import random
+import threading
+from core import BlogApiEndpointKeys, LoadResult, RequestSample
+from stub_server import latency_sampler
+from .payload_pool import shared_payload_pool
+
+try:
+    import yaml
+except ImportError:  # optional, scenarios can always be given as dicts
+    yaml = None
+
+
+class ScenarioContext:
+    """
+    What payload and id factories draw from during a scenario run: the scenario's `rng`, the
+    session `payload_pool`, and the ids of the posts and comments that existed when the run started.
+    """
+    def __init__(self, controller, rng, payload_pool=None):
+        self.controller = controller
+        self.rng = rng
+        self.payload_pool = payload_pool or shared_payload_pool()
+        self._ids = {}
+        self._lock = threading.Lock()
+
+    def existing_ids(self, endpoint_key):
+        with self._lock:
+            if endpoint_key not in self._ids:
+                items = self.controller.request(endpoint_key).json()
+                if not items:
+                    raise ValueError(f"Scenario needs existing ids, but {endpoint_key.value} returned none")
+                self._ids[endpoint_key] = [item["id"] for item in items]
+            return self._ids[endpoint_key]
+
+    def post_id(self):
+        return self.rng.choice(self.existing_ids(BlogApiEndpointKeys.GET_POSTS))
+
+    def comment_id(self):
+        return self.rng.choice(self.existing_ids(BlogApiEndpointKeys.GET_COMMENTS))
+
+
+PAYLOAD_FACTORIES = {
+    "post": lambda context: context.payload_pool.next_post_payload(),
+    "comment": lambda context: context.payload_pool.next_comment_payload(post_id=context.post_id()),
+    "profile": lambda context: {"name": context.payload_pool.next_post_payload()["author"]},
+}
+
+ID_FACTORIES = {
+    "post": ScenarioContext.post_id,
+    "comment": ScenarioContext.comment_id,
+}
+
+
+class ScenarioOperation:
+    """
+    One weighted operation of a `WorkloadScenario`.
+
+        endpoint    the `BlogApiEndpointKeys` route to call
+        weight      relative share of the arrivals
+        payload     name in `PAYLOAD_FACTORIES` or `context -> dict`, for writes
+        id          name in `ID_FACTORIES`, a fixed id or `context -> id`, for routes with `{id}`
+        think_time  pause between the arrival and the request: a distribution spec in milliseconds
+                    (see `stub_server.latency_sampler`, e.g. "exponential:100") or `rng -> seconds`
+    """
+    def __init__(self, name, endpoint, weight, payload=None, id=None, think_time=None):
+        if weight <= 0:
+            raise ValueError(f"Operation {name} needs a positive weight, got {weight}")
+        self.name = name
+        self.endpoint = endpoint if isinstance(endpoint, BlogApiEndpointKeys) else BlogApiEndpointKeys[endpoint]
+        self.weight = weight
+        self.payload = PAYLOAD_FACTORIES[payload] if isinstance(payload, str) else payload
+        self.id = ID_FACTORIES[id] if isinstance(id, str) else id
+        self.think_time = latency_sampler(think_time)
+
+    def request_kwargs(self, context):
+        kwargs = {}
+        if self.payload is not None:
+            kwargs["payload"] = self.payload(context)
+        if self.id is not None:
+            kwargs["id"] = self.id(context) if callable(self.id) else self.id
+        return kwargs
+
+
+class WorkloadScenario:
+    """
+    Declarative traffic mix for `HelperPerformance.simulate_scenario`. Every arrival picks one
+    operation by weight, so a run at `rate` sends each operation at about `rate * weight / total`:
+
+        WorkloadScenario.from_dict({
+            "name": "production mix",
+            "operations": {
+                "GET_POSTS": {"weight": 70, "think_time": "exponential:50"},
+                "GET_COMMENT_BY_ID": {"weight": 15, "id": "comment"},
+                "CREATE_COMMENT": {"weight": 10, "payload": "comment"},
+                "UPDATE_PROFILE": {"weight": 5, "payload": "profile"},
+            },
+        })
+
+    Operations are keyed by name, which is also the endpoint unless an `endpoint` is given
+    (so one route can appear twice with different payloads). See `ScenarioOperation` for the fields.
+    The same YAML document can be loaded with `from_yaml` when PyYAML is installed.
+    """
+    def __init__(self, name, operations, seed=None):
+        if not operations:
+            raise ValueError(f"Scenario {name} has no operations")
+        self.name = name
+        self.operations = list(operations)
+        self.seed = seed
+        self.total_weight = sum(operation.weight for operation in self.operations)
+
+    @classmethod
+    def from_dict(cls, spec):
+        operations = [
+            ScenarioOperation(name, fields.get("endpoint", name), fields["weight"], fields.get("payload"),
+                              fields.get("id"), fields.get("think_time"))
+            for name, fields in spec["operations"].items()
+        ]
+        return cls(spec.get("name", "scenario"), operations, spec.get("seed"))
+
+    @classmethod
+    def from_yaml(cls, path):
+        if yaml is None:
+            raise ImportError("Loading scenarios from YAML needs PyYAML: pip install pyyaml")
+        with open(path, encoding="utf-8") as f:
+            return cls.from_dict(yaml.safe_load(f))
+
+    def share(self, operation):
+        return operation.weight / self.total_weight
+
+    def request_fn(self, controller, payload_pool=None):
+        """
+        Builds the request function of one run: each call picks an operation, waits its think time
+        and sends it. Samples of every operation are recorded from the moment its request is sent,
+        so think time is never counted as latency.
+
+        Returns:
+            Tuple[Callable, dict]: The request function and `{operation name: [RequestSample]}` it fills.
+        """
+        rng = random.Random(self.seed)
+        context = ScenarioContext(controller, rng, payload_pool)
+        samples = {operation.name: [] for operation in self.operations}
+        lock = threading.Lock()
+        weights = [operation.weight for operation in self.operations]
+
+        def make_call():
+            with lock:
+                operation = rng.choices(self.operations, weights)[0]
+                think = operation.think_time(rng) if operation.think_time else 0.0
+            if think:
+                time.sleep(think)
+            kwargs = operation.request_kwargs(context)
+            sent = time.perf_counter()
+            status_code, error = None, None
+            try:
+                status_code = controller.request(operation.endpoint, **kwargs).status_code
+                return status_code
+            except Exception as e:
+                error = e
+                raise
+            finally:
+                sample = RequestSample(sent, sent, time.perf_counter() - sent, status_code, error)
+                with lock:
+                    samples[operation.name].append(sample)
+
+        return make_call, samples
+
+
+class ScenarioResult:
+    """
+    Outcome of a scenario run: `load` holds every arrival (latency from the intended arrival time,
+    think time included), `operations` the samples of each operation from the moment it was sent.
+    """
+    def __init__(self, scenario, load, operation_samples):
+        self.scenario = scenario
+        self.load = load
+        self.operations = {
+            operation.name: LoadResult(load.rate * scenario.share(operation), load.duration,
+                                       operation_samples[operation.name], load.elapsed)
+            for operation in scenario.operations
+        }
+
+    def achieved_share(self, name):
+        return self.operations[name].total / self.load.total if self.load.total else 0.0
+
+    def summary(self):
+        lines = [f"{self.scenario.name} | {self.load.summary()}"]
+        for operation in self.scenario.operations:
+            result = self.operations[operation.name]
+            lines.append(
+                f"{operation.name} | weight {self.scenario.share(operation):.0%} (sent {self.achieved_share(operation.name):.0%}) | "
+                f"requests={result.total} | p50={result.latency_percentile(50) * 1000:.1f}ms | "
+                f"p99={result.latency_percentile(99) * 1000:.1f}ms | statuses={result.status_counts()}"
+            )
+        return "\n".join(lines)
@@ -1,5 +1,8 @@
+import time
+import asyncio
 from enum import Enum
-from core import BASE_URL, http_request, BlogApiEndpointKeys
+from core import (BASE_URL, http_request, async_http_request, BlogApiEndpointKeys, ASYNC_MAX_IN_FLIGHT,
+                  RETRYABLE_ERRORS, live_metrics)
 
 
 class BlogApiEndpoints(Enum):
@@ -23,12 +26,180 @@ class BlogApiEndpoints(Enum):
         self.path = path
         self.key = key
 
+    @property
+    def route(self):
+        """Path relative to BASE_URL, e.g. `/posts/{id}`."""
+        return self.path[len(BASE_URL):]
+
+    @property
+    def resource(self):
+        """First path segment, e.g. `posts`."""
+        return self.route.strip("/").split("/")[0]
+
+
+# Cached reads each write makes stale. By-id reads of the written resource are only invalidated for the
+# written id. Deleting a post also drops the cached comments. This controller never sends `_dependent`,
+# so json-server keeps the post's comments; dropping them is deliberately conservative, in case a
+# server does cascade the delete.
+CACHE_INVALIDATIONS = {
+    BlogApiEndpointKeys.CREATE_POST: (BlogApiEndpointKeys.GET_POSTS,),
+    BlogApiEndpointKeys.UPDATE_POST: (BlogApiEndpointKeys.GET_POSTS, BlogApiEndpointKeys.GET_POST_BY_ID),
+    BlogApiEndpointKeys.DELETE_POST: (BlogApiEndpointKeys.GET_POSTS, BlogApiEndpointKeys.GET_POST_BY_ID,
+                                      BlogApiEndpointKeys.GET_COMMENTS, BlogApiEndpointKeys.GET_COMMENT_BY_ID),
+    BlogApiEndpointKeys.CREATE_COMMENT: (BlogApiEndpointKeys.GET_COMMENTS,),
+    BlogApiEndpointKeys.UPDATE_COMMENT: (BlogApiEndpointKeys.GET_COMMENTS, BlogApiEndpointKeys.GET_COMMENT_BY_ID),
+    BlogApiEndpointKeys.DELETE_COMMENT: (BlogApiEndpointKeys.GET_COMMENTS, BlogApiEndpointKeys.GET_COMMENT_BY_ID),
+    BlogApiEndpointKeys.UPDATE_PROFILE: (BlogApiEndpointKeys.GET_PROFILE,),
+}
+
 
 class BlogApiController:
-    def request(self, key, headers=None, payload=None, **kwargs):
+    """
+    Resolves endpoint keys to URLs and sends the requests. With a `ResponseCache`, GETs are sent as
+    conditional requests and answered from the cache on a 304, and writes invalidate the cached
+    reads listed in `CACHE_INVALIDATIONS`. With a `RateGovernor`, every request first waits for its
+    endpoint's budget, and the response status (429, Retry-After) is fed back into it.
+    With a `RetryPolicy`, transient failures are retried per request; `response.retries` tells how often.
+    With a `SampleStore`, every attempt is appended as one compact sample.
+    """
+    def __init__(self, max_in_flight=ASYNC_MAX_IN_FLIGHT, base_url=BASE_URL, cache=None, governor=None,
+                 retry_policy=None, sample_store=None):
+        self.max_in_flight = max_in_flight
+        self.base_url = base_url
+        self.cache = cache
+        self.governor = governor
+        self.retry_policy = retry_policy
+        self.sample_store = sample_store
+        self._semaphores = {}
+
+    @staticmethod
+    def _endpoint(key):
         endpoint = next((e for e in BlogApiEndpoints if e.key == key), None)
         if not endpoint:
             raise ValueError(f"Unknown endpoint key: {key}")
+        return endpoint
+
+    def _resolve(self, key, **kwargs):
+        endpoint = self._endpoint(key)
+        return endpoint, self.base_url + endpoint.route.format(**kwargs)
+
+    def _in_flight_semaphore(self):
+        # asyncio primitives are bound to the loop they are first used on
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_in_flight)
+            self._semaphores = {loop: semaphore}
+        return semaphore
+
+    def _invalidate(self, endpoint, **kwargs):
+        for key in CACHE_INVALIDATIONS.get(endpoint.key, ()):
+            target = self._endpoint(key)
+            same_item = "{id}" in target.route and "id" in kwargs and target.resource == endpoint.resource
+            self.cache.invalidate(key, self.base_url + target.route.format(**kwargs) if same_item else None)
+
+    def _observe(self, endpoint, tracked, sent_at, started, response):
+        """Records one attempt in `live_metrics` and the sample store; `response` is None if it failed."""
+        status_code = response.status_code if response is not None else None
+        live_metrics.finish(endpoint.key, tracked, status_code)
+        if self.sample_store is not None:
+            self.sample_store.append(endpoint.key, status_code, time.perf_counter() - started,
+                                     len(response.content) if response is not None else 0, sent_at)
+
+    def _attempt(self, endpoint, url, headers, payload, params):
+        waited = self.governor.acquire(endpoint.key) if self.governor else 0.0
+        tracked, sent_at, started, response = (live_metrics.start(endpoint.key), time.time(), time.perf_counter(),
+                                               None)
+        try:
+            response = http_request(endpoint.method, url, headers=headers, json=payload, params=params)
+        finally:
+            self._observe(endpoint, tracked, sent_at, started, response)
+        if self.governor:
+            self.governor.observe(endpoint.key, response)
+            response.phases.add_throttle(waited)
+        return response
+
+    async def _attempt_async(self, endpoint, url, headers, payload, params):
+        # wait for the rate governor before taking an in-flight slot, so throttled requests do not hold one
+        waited = await self.governor.acquire_async(endpoint.key) if self.governor else 0.0
+        async with self._in_flight_semaphore():
+            tracked, sent_at, started, response = (live_metrics.start(endpoint.key), time.time(),
+                                                   time.perf_counter(), None)
+            try:
+                response = await async_http_request(endpoint.method, url, headers=headers, json=payload,
+                                                    params=params)
+            finally:
+                self._observe(endpoint, tracked, sent_at, started, response)
+        if self.governor:
+            self.governor.observe(endpoint.key, response)
+            response.phases.add_throttle(waited)
+        return response
+
+    def _send(self, endpoint, url, headers=None, payload=None, params=None):
+        if not self.retry_policy:
+            return self._attempt(endpoint, url, headers, payload, params)
+        self.retry_policy.record_request()
+        attempt = 1
+        while True:
+            try:
+                response = self._attempt(endpoint, url, headers, payload, params)
+                delay = self.retry_policy.next_delay(endpoint.key, endpoint.method, attempt, response=response)
+            except RETRYABLE_ERRORS as error:
+                delay = self.retry_policy.next_delay(endpoint.key, endpoint.method, attempt, error=error)
+                if delay is None:
+                    raise
+            if delay is None:
+                response.retries = attempt - 1
+                return response
+            time.sleep(delay)
+            attempt += 1
+
+    async def _send_async(self, endpoint, url, headers=None, payload=None, params=None):
+        if not self.retry_policy:
+            return await self._attempt_async(endpoint, url, headers, payload, params)
+        self.retry_policy.record_request()
+        attempt = 1
+        while True:
+            try:
+                response = await self._attempt_async(endpoint, url, headers, payload, params)
+                delay = self.retry_policy.next_delay(endpoint.key, endpoint.method, attempt, response=response)
+            except RETRYABLE_ERRORS as error:
+                delay = self.retry_policy.next_delay(endpoint.key, endpoint.method, attempt, error=error)
+                if delay is None:
+                    raise
+            if delay is None:
+                response.retries = attempt - 1
+                return response
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def request(self, key, headers=None, payload=None, params=None, **kwargs):
+        endpoint, formatted_url = self._resolve(key, **kwargs)
+        if self.cache is None or endpoint.method != "GET":
+            response = self._send(endpoint, formatted_url, headers=headers, payload=payload, params=params)
+            if self.cache is not None:
+                self._invalidate(endpoint, **kwargs)
+            return response
+
+        entry, cached = self.cache.lookup(formatted_url, params)
+        if cached is not None:
+            return cached
+        response = self._send(endpoint, formatted_url, headers=self.cache.conditional_headers(entry, headers),
+                              params=params)
+        return self.cache.update(endpoint.key, formatted_url, params, entry, response)
+
+    async def request_async(self, key, headers=None, payload=None, params=None, **kwargs):
+        endpoint, formatted_url = self._resolve(key, **kwargs)
+        if self.cache is None or endpoint.method != "GET":
+            response = await self._send_async(endpoint, formatted_url, headers=headers, payload=payload,
+                                              params=params)
+            if self.cache is not None:
+                self._invalidate(endpoint, **kwargs)
+            return response
 
-        formatted_url = endpoint.path.format(**kwargs)
-        return http_request(endpoint.method, formatted_url, headers=headers, json=payload)
+        entry, cached = self.cache.lookup(formatted_url, params)
+        if cached is not None:
+            return cached
+        response = await self._send_async(endpoint, formatted_url,
+                                          headers=self.cache.conditional_headers(entry, headers), params=params)
+        return self.cache.update(endpoint.key, formatted_url, params, entry, response)
@@ -1,3 +1,5 @@
 from .post import PostModel, PostPayload
 from .comments import CommentModel, CommentPayload
 from .profile import ProfileModel
+from .batch_validation import (collection_adapter, validate_collection, validate_posts, validate_comments,
+                               CollectionValidationResult)
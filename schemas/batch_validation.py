@@ -0,0 +1,84 @@
+from functools import lru_cache
+from pydantic import TypeAdapter, ValidationError
+from core import LazyJson
+from .post import PostModel
+from .comments import CommentModel
+
+
+@lru_cache(maxsize=None)
+def collection_adapter(model):
+    """
+    Returns the cached `TypeAdapter[list[model]]`. Building the core schema is the expensive part,
+    so every collection of the same model reuses one adapter.
+    """
+    return TypeAdapter(list[model])
+
+
+class CollectionValidationResult:
+    """
+    Outcome of validating a whole collection in one call.
+    `items` holds the validated models when every row passed; `failed_rows` maps row index to its errors.
+    """
+    def __init__(self, total, items=None, failed_rows=None):
+        self.total = total
+        self.items = items or []
+        self.failed_rows = failed_rows or {}
+
+    @property
+    def is_valid(self):
+        return not self.failed_rows
+
+    def error_summary(self, limit=10):
+        shown = list(self.failed_rows.items())[:limit]
+        lines = [f"row {index}: " + "; ".join(f"{'.'.join(map(str, e['loc']))}: {e['msg']}" for e in errors)
+                 for index, errors in shown]
+        if len(self.failed_rows) > limit:
+            lines.append(f"... and {len(self.failed_rows) - limit} more failing rows")
+        return f"{len(self.failed_rows)}/{self.total} rows failed validation:\n" + "\n".join(lines)
+
+
+def validate_collection(model, data):
+    """
+    Validates a JSON array of `model` rows in a single Pydantic call.
+
+    Args:
+        model (Type[BaseModel]): Row model, e.g. PostModel or CommentModel.
+        data (bytes | str | list | LazyJson): Raw JSON is validated straight from bytes without
+            building intermediate dicts; an undecoded LazyJson is validated from its raw body.
+
+    Returns:
+        CollectionValidationResult: Validated rows, or the indexes of the rows that failed.
+    """
+    adapter = collection_adapter(model)
+    if isinstance(data, LazyJson):
+        data = data.raw if not data.is_decoded else data.value
+
+    try:
+        if isinstance(data, (bytes, bytearray, str)):
+            items = adapter.validate_json(data)
+        else:
+            items = adapter.validate_python(data)
+        return CollectionValidationResult(total=len(items), items=items)
+    except ValidationError as e:
+        failed_rows = {}
+        for error in e.errors():
+            if error["loc"] and isinstance(error["loc"][0], int):
+                failed_rows.setdefault(error["loc"][0], []).append(
+                    {"loc": error["loc"][1:], "msg": error["msg"]})
+            else:
+                raise
+        total = len(data) if isinstance(data, list) else _count_rows(data)
+        return CollectionValidationResult(total=total, failed_rows=failed_rows)
+
+
+def _count_rows(raw):
+    rows = LazyJson(raw).value
+    return len(rows) if isinstance(rows, list) else 0
+
+
+def validate_posts(data):
+    return validate_collection(PostModel, data)
+
+
+def validate_comments(data):
+    return validate_collection(CommentModel, data)
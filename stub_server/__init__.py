@@ -0,0 +1 @@
+from .json_server_stub import JsonServerStub, TokenBucket, DEFAULT_DB, latency_sampler, stub_address_from_base_url
@@ -0,0 +1,281 @@
+import copy
+import math
+import hashlib
+import time
+import uuid
+import random
+import asyncio
+import threading
+from aiohttp import web
+from core import BASE_URL, HTTPStatusCodes, json_codec
+from request_builders.request_builder_blog import BlogApiEndpoints
+
+DEFAULT_DB = {
+    "posts": [
+        {"id": 1, "title": "Post 1", "author": "Author 1"},
+        {"id": 2, "title": "Post 2", "author": "Author 2"},
+    ],
+    "comments": [
+        {"id": 1, "body": "some comment", "postId": 1},
+        {"id": 2, "body": "another comment", "postId": 1},
+    ],
+    "profile": {"name": "typicode"},
+}
+
+
+def latency_sampler(spec):
+    """
+    Builds a function `rng -> seconds` from a latency distribution spec (values in milliseconds):
+        fixed:MS             constant latency
+        uniform:MIN:MAX      uniformly distributed
+        exponential:MEAN     exponentially distributed around MEAN
+        lognormal:MEDIAN:SIGMA  long-tailed, MEDIAN is the p50
+    A callable is returned unchanged; None means no injected latency.
+    """
+    if spec is None or callable(spec):
+        return spec
+    kind, _, args = spec.partition(":")
+    values = [float(value) for value in args.split(":") if value]
+    if kind == "fixed" and len(values) == 1:
+        return lambda rng: values[0] / 1000
+    if kind == "uniform" and len(values) == 2:
+        return lambda rng: rng.uniform(values[0], values[1]) / 1000
+    if kind == "exponential" and len(values) == 1:
+        return lambda rng: rng.expovariate(1 / values[0]) / 1000
+    if kind == "lognormal" and len(values) == 2:
+        return lambda rng: rng.lognormvariate(math.log(values[0]), values[1]) / 1000
+    raise ValueError(f"Invalid latency spec: {spec}. "
+                     f"Expected fixed:MS, uniform:MIN:MAX, exponential:MEAN or lognormal:MEDIAN:SIGMA")
+
+
+class TokenBucket:
+    """
+    Classic token bucket: `rate` tokens per second, at most `burst` stored.
+    """
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def try_acquire(self):
+        """
+        Returns:
+            Tuple[bool, float]: Whether a token was taken, and seconds until the next one is available.
+        """
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True, 0.0
+        return False, (1 - self.tokens) / self.rate
+
+
+class JsonServerStub:
+    """
+    In-process asyncio stand-in for json-server, serving the routes of `BlogApiEndpoints`
+    from an in-memory db on a background thread. Faults can be injected per run:
+
+        latency: distribution spec (see `latency_sampler`), optionally per endpoint via `endpoint_latency`
+        rate_limit: (requests per second, burst) token bucket answering 429 with Retry-After
+        error_rate: fraction of requests answered with `error_status`
+
+    A fixed `seed` makes injected latencies and errors reproducible.
+    Like json-server (express), successful GETs carry a weak ETag and a matching If-None-Match is answered with 304.
+    """
+    def __init__(self, db=None, host="127.0.0.1", port=0, latency=None, endpoint_latency=None, rate_limit=None,
+                 error_rate=0.0, error_status=HTTPStatusCodes.INTERNAL_SERVER_ERROR.value, seed=0):
+        self._collections, self._singletons = self._load(db if db is not None else DEFAULT_DB)
+        self.host = host
+        self.port = port
+        self.latency = latency_sampler(latency)
+        self.endpoint_latency = {key: latency_sampler(spec) for key, spec in (endpoint_latency or {}).items()}
+        self.bucket = TokenBucket(*rate_limit) if rate_limit else None
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.rng = random.Random(seed)
+        self.request_counts = {}
+        self.rate_limited = 0
+        self.injected_errors = 0
+        self._loop = None
+        self._thread = None
+        self._runner = None
+
+    @property
+    def base_url(self):
+        return f"http://{self.host}:{self.port}"
+
+    @staticmethod
+    def _load(db):
+        # collections are kept as insertion-ordered {id: row} dicts, so lookups, updates and deletes are O(1)
+        collections, singletons = {}, {}
+        for resource, value in copy.deepcopy(db).items():
+            if isinstance(value, list):
+                collections[resource] = {str(row["id"]): row for row in value}
+            else:
+                singletons[resource] = value
+        return collections, singletons
+
+    @property
+    def db(self):
+        """Snapshot of the current data in db.json layout."""
+        snapshot = {resource: list(rows.values()) for resource, rows in self._collections.items()}
+        snapshot.update(self._singletons)
+        return copy.deepcopy(snapshot)
+
+    def reset(self, db=None):
+        self._collections, self._singletons = self._load(db if db is not None else DEFAULT_DB)
+
+    def _build_app(self):
+        app = web.Application(middlewares=[self._fault_middleware])
+        for endpoint in BlogApiEndpoints:
+            app.router.add_route(endpoint.method, endpoint.route, self._handler_for(endpoint),
+                                 name=endpoint.key.value)
+        return app
+
+    @web.middleware
+    async def _fault_middleware(self, request, handler):
+        key = request.match_info.route.name
+        self.request_counts[key] = self.request_counts.get(key, 0) + 1
+
+        sampler = self.endpoint_latency.get(key, self.latency)
+        if sampler:
+            await asyncio.sleep(sampler(self.rng))
+
+        if self.bucket:
+            allowed, retry_after = self.bucket.try_acquire()
+            if not allowed:
+                self.rate_limited += 1
+                return web.json_response({"error": "Too Many Requests"},
+                                         status=HTTPStatusCodes.TOO_MANY_REQUESTS.value,
+                                         headers={"Retry-After": str(max(math.ceil(retry_after), 1))})
+
+        if self.error_rate and self.rng.random() < self.error_rate:
+            self.injected_errors += 1
+            return web.json_response({"error": "Injected failure"}, status=self.error_status)
+        return self._conditional(request, await handler(request))
+
+    @staticmethod
+    def _conditional(request, response):
+        if request.method != "GET" or response.status != HTTPStatusCodes.OK.value:
+            return response
+        etag = f'W/"{len(response.body):x}-{hashlib.sha1(response.body).hexdigest()[:27]}"'
+        if etag in request.headers.get("If-None-Match", ""):
+            return web.Response(status=HTTPStatusCodes.NOT_MODIFIED.value, headers={"ETag": etag})
+        response.headers["ETag"] = etag
+        return response
+
+    def _handler_for(self, endpoint):
+        resource = endpoint.route.strip("/").split("/")[0]
+        if resource in self._collections:
+            handler = {
+                ("GET", False): self._list, ("GET", True): self._get,
+                ("POST", False): self._create, ("PUT", True): self._update, ("DELETE", True): self._delete,
+            }[(endpoint.method, "{id}" in endpoint.route)]
+        else:
+            handler = {"GET": self._singleton_get, "PUT": self._singleton_put}[endpoint.method]
+
+        async def handle(request):
+            return await handler(resource, request)
+        return handle
+
+    @staticmethod
+    def _json(body, status=HTTPStatusCodes.OK.value):
+        return web.json_response(body, status=status, dumps=json_codec.dumps)
+
+    async def _list(self, resource, request):
+        query = request.query
+        filters = [(field, value) for field, value in query.items() if not field.startswith("_")]
+        rows = [row for row in self._collections[resource].values()
+                if all(str(row.get(field)) == value for field, value in filters)]
+        if "_page" in query:
+            page, per_page = int(query["_page"]), int(query.get("_per_page", 10))
+            last = max(math.ceil(len(rows) / per_page), 1)
+            return self._json({
+                "first": 1, "prev": page - 1 if page > 1 else None, "next": page + 1 if page < last else None,
+                "last": last, "pages": last, "items": len(rows), "data": rows[(page - 1) * per_page:page * per_page],
+            })
+        start = int(query.get("_start", 0))
+        end = start + int(query["_limit"]) if "_limit" in query else int(query.get("_end", len(rows)))
+        return self._json(rows[start:end])
+
+    async def _get(self, resource, request):
+        item = self._collections[resource].get(request.match_info["id"])
+        return self._json(item) if item else self._json({}, HTTPStatusCodes.NOT_FOUND.value)
+
+    async def _create(self, resource, request):
+        item = await request.json(loads=json_codec.loads)
+        rows = self._collections[resource]
+        if "id" not in item:
+            item["id"] = uuid.uuid4().hex[:8]
+            while item["id"] in rows:
+                item["id"] = uuid.uuid4().hex[:8]
+        rows[str(item["id"])] = item
+        return self._json(item, HTTPStatusCodes.CREATED.value)
+
+    async def _update(self, resource, request):
+        rows = self._collections[resource]
+        item = rows.get(request.match_info["id"])
+        if item is None:
+            return self._json({}, HTTPStatusCodes.NOT_FOUND.value)
+        replacement = await request.json(loads=json_codec.loads)
+        replacement["id"] = item["id"]
+        rows[request.match_info["id"]] = replacement
+        return self._json(replacement)
+
+    async def _delete(self, resource, request):
+        item = self._collections[resource].pop(request.match_info["id"], None)
+        if item is None:
+            return self._json({}, HTTPStatusCodes.NOT_FOUND.value)
+        return self._json(item)
+
+    async def _singleton_get(self, resource, request):
+        return self._json(self._singletons[resource])
+
+    async def _singleton_put(self, resource, request):
+        self._singletons[resource] = await request.json(loads=json_codec.loads)
+        return self._json(self._singletons[resource])
+
+    async def _start_site(self):
+        self._runner = web.AppRunner(self._build_app(), access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+
+    def start(self):
+        """
+        Starts serving on a background thread and returns the base URL (port 0 picks a free port).
+        """
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="json-server-stub", daemon=True)
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self._start_site(), self._loop).result()
+        return self.base_url
+
+    def stop(self):
+        if self._loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        self._loop = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def stub_address_from_base_url(base_url=BASE_URL):
+    """
+    Returns:
+        Tuple[str, int]: Host and port the stub must bind to for BASE_URL requests to reach it.
+    """
+    host_port = base_url.split("://", 1)[-1].split("/", 1)[0]
+    host, _, port = host_port.partition(":")
+    return host, int(port or 80)
@@ -1,23 +1,39 @@
 import pytest
-from schemas import PostPayload, CommentPayload
 
 
 @pytest.fixture
-def new_post_payload(faker_fixture) -> dict:
-    yield PostPayload(
-        title=faker_fixture.sentence(nb_words=6),
-        author=faker_fixture.name()
-    ).model_dump()
+def new_post_payload(payload_pool) -> dict:
+    yield payload_pool.next_post_payload()
 
 
 @pytest.fixture
-def new_comment_payload(faker_fixture) -> dict:
-    yield CommentPayload(
-        body=faker_fixture.sentence(nb_words=10),
-        postId=''  # Default value
-    ).model_dump()
+def new_comment_payload(payload_pool) -> dict:
+    yield payload_pool.next_comment_payload(post_id='')  # Default value
 
 
 @pytest.fixture
-def create_valid_post(helper_posts, new_post_payload):
-    yield helper_posts.create_post(payload=new_post_payload)
+def leased_post(test_data_pool) -> dict:
+    """Pooled post shared with other tests. Only read it or attach new comments to it."""
+    with test_data_pool.lease_post() as post:
+        yield post
+
+
+@pytest.fixture
+def exclusive_post(test_data_pool) -> dict:
+    """Pristine pooled post (no comments) the test may update or delete."""
+    with test_data_pool.lease_post(exclusive=True) as post:
+        yield post
+
+
+@pytest.fixture
+def leased_comment(test_data_pool) -> dict:
+    """Pooled comment shared with other tests. Only read it."""
+    with test_data_pool.lease_comment() as comment:
+        yield comment
+
+
+@pytest.fixture
+def exclusive_comment(test_data_pool) -> dict:
+    """Pristine pooled comment the test may update or delete."""
+    with test_data_pool.lease_comment(exclusive=True) as comment:
+        yield comment
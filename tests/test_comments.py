@@ -1,5 +1,5 @@
 import pytest
-from schemas import CommentModel
+from schemas import CommentModel, validate_comments
 from core import HTTPStatusCodes, CommentFields, PostFields, NONEXISTENT_ID
 from pydantic_core._pydantic_core import ValidationError
 from test_data import NEGATIVE_COMMENT_PAYLOADS
@@ -19,9 +19,9 @@ def test_get_all_comments(helper_comments):
 @pytest.mark.schema
 @pytest.mark.comments
 @pytest.mark.flaky_regression
-def test_comment_response_matches_schema(helper_comments, new_comment_payload, create_valid_post):
+def test_comment_response_matches_schema(helper_comments, new_comment_payload, leased_post):
     """Ensure that a newly created comment response matches the schema."""
-    new_comment_payload[CommentFields.POST_ID.value] = create_valid_post[PostFields.ID.value]
+    new_comment_payload[CommentFields.POST_ID.value] = leased_post[PostFields.ID.value]
     created_comment = helper_comments.create_comment(payload=new_comment_payload)
     pytest.logger.info("Validating comment schema...")
     try:
@@ -31,15 +31,27 @@ def test_comment_response_matches_schema(helper_comments, new_comment_payload, c
         pytest.fail(f"Schema validation failed for CommentModel: {e}")
 
 
+@pytest.mark.schema
 @pytest.mark.comments
 @pytest.mark.flaky_regression
-def test_get_comment_by_id_successfully(helper_comments, new_comment_payload, create_valid_post):
-    """Ensure a comment can be retrieved by ID."""
-    new_comment_payload[CommentFields.POST_ID.value] = create_valid_post[PostFields.ID.value]
-    created_comment = helper_comments.create_comment(payload=new_comment_payload)
+def test_comments_of_post_match_schema(helper_comments, exclusive_post):
+    """Comment a pristine post, then validate its GET /comments?postId= collection against CommentModel in one call."""
+    post_id = exclusive_post[PostFields.ID.value]
+    helper_comments.bulk_create_comments([post_id], comments_per_post=3, max_parallel=3)
+    comments = helper_comments.get_comments(post_id=post_id, lazy_json=True)
+    result = validate_comments(comments)
+    pytest.logger.info(f"Validated {result.total} comments, {len(result.failed_rows)} failed")
+    assert result.is_valid, result.error_summary()
+    assert result.total == 3 and all(comment.postId == post_id for comment in result.items), \
+        f"Expected the 3 comments of post {post_id}. Actual: {result.items}"
+
 
-    fetched_comment = helper_comments.get_comment_by_id(comment_id=created_comment[CommentFields.ID.value])
-    assert fetched_comment[CommentFields.ID.value] == created_comment[CommentFields.ID.value]
+@pytest.mark.comments
+@pytest.mark.flaky_regression
+def test_get_comment_by_id_successfully(helper_comments, leased_comment):
+    """Ensure a comment can be retrieved by ID."""
+    fetched_comment = helper_comments.get_comment_by_id(comment_id=leased_comment[CommentFields.ID.value])
+    assert fetched_comment[CommentFields.ID.value] == leased_comment[CommentFields.ID.value]
 
 
 @pytest.mark.comments
@@ -52,9 +64,25 @@ def test_get_nonexistent_comment_returns_404(helper_comments):
 
 @pytest.mark.comments
 @pytest.mark.flaky_regression
-def test_create_comment(helper_comments, new_comment_payload, create_valid_post):
+def test_iter_comments_of_post_across_pages(helper_comments, new_comment_payload, exclusive_post):
+    """Stream the comments of a post in pages smaller than the result set and validate every comment is returned once."""
+    new_comment_payload[CommentFields.POST_ID.value] = exclusive_post[PostFields.ID.value]
+    created_ids = [helper_comments.create_comment(payload=new_comment_payload)[CommentFields.ID.value]
+                   for _ in range(3)]
+
+    streamed_ids = [comment[CommentFields.ID.value] for comment in
+                    helper_comments.iter_comments(page_size=2, post_id=exclusive_post[PostFields.ID.value])]
+    pytest.logger.info(f"Streamed comment ids: {streamed_ids}")
+
+    assert sorted(streamed_ids) == sorted(created_ids), \
+        f"Streamed comments do not match the created ones. Expected: {created_ids}. Actual: {streamed_ids}"
+
+
+@pytest.mark.comments
+@pytest.mark.flaky_regression
+def test_create_comment(helper_comments, new_comment_payload, leased_post):
     """Verify that a new comment can be created."""
-    new_comment_payload[CommentFields.POST_ID.value] = create_valid_post[PostFields.ID.value]
+    new_comment_payload[CommentFields.POST_ID.value] = leased_post[PostFields.ID.value]
     created_comment = helper_comments.create_comment(payload=new_comment_payload)
     pytest.logger.info(f"Created comment: {created_comment}")
     assert created_comment[CommentFields.BODY.value] == new_comment_payload[CommentFields.BODY.value]
@@ -64,14 +92,13 @@ def test_create_comment(helper_comments, new_comment_payload, create_valid_post)
 
 @pytest.mark.comments
 @pytest.mark.flaky_regression
-def test_update_comment_body(helper_comments, create_valid_post, new_comment_payload, faker_fixture):
+def test_update_comment_body(helper_comments, exclusive_comment, faker_fixture):
     """Ensure that a comment body can be updated."""
-    new_comment_payload[CommentFields.POST_ID.value] = create_valid_post[PostFields.ID.value]
-    created_comment = helper_comments.create_comment(payload=new_comment_payload)
+    created_comment = exclusive_comment
 
     updated_payload = {
         CommentFields.BODY.value: faker_fixture.sentence(nb_words=8),
-        CommentFields.POST_ID.value: create_valid_post[PostFields.ID.value]
+        CommentFields.POST_ID.value: created_comment[CommentFields.POST_ID.value]
     }
 
     updated_comment = helper_comments.update_comment(
@@ -86,10 +113,9 @@ def test_update_comment_body(helper_comments, create_valid_post, new_comment_pay
 @pytest.mark.comments
 @pytest.mark.flaky_regression
 @pytest.mark.xfail(reason="POST ID of a comment should not be changed")
-def test_update_comment_post_id(helper_comments, new_comment_payload, faker_fixture, create_valid_post):
+def test_update_comment_post_id(helper_comments, faker_fixture, exclusive_comment):
     """Test that updating the postId of a comment should not be allowed."""
-    new_comment_payload[CommentFields.POST_ID.value] = create_valid_post[PostFields.ID.value]
-    created_comment = helper_comments.create_comment(payload=new_comment_payload)
+    created_comment = exclusive_comment
 
     updated_payload = {
         CommentFields.BODY.value: faker_fixture.sentence(nb_words=8),
@@ -119,9 +145,9 @@ def test_update_nonexistent_comment_fails(helper_comments, new_comment_payload):
 
 @pytest.mark.comments
 @pytest.mark.flaky_regression
-def test_delete_comment(helper_comments, new_comment_payload):
+def test_delete_comment(helper_comments, exclusive_comment):
     """Ensure that a comment can be deleted."""
-    created_comment = helper_comments.create_comment(payload=new_comment_payload)
+    created_comment = exclusive_comment
 
     deleted_comment = helper_comments.delete_comment(comment_id=created_comment[CommentFields.ID.value])
     pytest.logger.info(f"Deleted comment: {deleted_comment}")
@@ -147,17 +173,16 @@ def test_delete_nonexistent_comment_fails(helper_comments):
     "payload, is_update, expected_status, test_title", NEGATIVE_COMMENT_PAYLOADS
 )
 def test_comment_payloads_negative_cases(helper_comments, payload, is_update, expected_status, test_title,
-                                         create_valid_post, new_comment_payload):
+                                         test_data_pool):
     """Test invalid comment creation payloads."""
     pytest.logger.info(f"Running test {test_title}")
     if is_update:
-        new_comment_payload[CommentFields.POST_ID.value] = create_valid_post[PostFields.ID.value]
-        created_comment = helper_comments.create_comment(payload=new_comment_payload)
-        helper_comments.update_comment(
-            comment_id=created_comment[CommentFields.ID.value],
-            payload=payload,
-            expected_status=HTTPStatusCodes.BAD_REQUEST.value
-        )
+        with test_data_pool.lease_comment(exclusive=True) as created_comment:
+            helper_comments.update_comment(
+                comment_id=created_comment[CommentFields.ID.value],
+                payload=payload,
+                expected_status=HTTPStatusCodes.BAD_REQUEST.value
+            )
     else:
         pytest.logger.info(f"Running test {test_title}")
         helper_comments.create_comment(payload=payload, expected_status=expected_status)
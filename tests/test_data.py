@@ -1,7 +1,7 @@
+import random
 import pytest
-from faker import Faker
-from core import HTTPStatusCodes, PostFields, EXTRA_FIELD
-faker_obj = Faker()
+from core import HTTPStatusCodes, PostFields, EXTRA_FIELD, BlogApiEndpointKeys, PAYLOAD_POOL_SEED
+random_obj = random.Random(PAYLOAD_POOL_SEED)  # same values in every xdist worker
 
 NEGATIVE_POST_PAYLOADS = [
     pytest.param(
@@ -56,7 +56,7 @@ NEGATIVE_COMMENT_PAYLOADS = [
         marks=pytest.mark.xfail(reason="COMMENT cannot be created without postId")
     ),
     pytest.param(
-        {"body": "Nice comment", "postId": faker_obj.random_int(min=1000, max=9999)},
+        {"body": "Nice comment", "postId": random_obj.randint(1000, 9999)},
         False,
         HTTPStatusCodes.BAD_REQUEST.value,
         "Create comment with non-existent POST ID",
@@ -99,3 +99,32 @@ PROFILE_NEGATIVE_CASES = [
         marks=pytest.mark.skip(reason="PROFILE is updated with extra field")
     )
 ]
+
+BENCHMARK_ENDPOINTS = [
+    pytest.param(endpoint_key, id=endpoint_key.value, marks=getattr(pytest.mark, area))
+    for endpoint_key, area in [
+        (BlogApiEndpointKeys.GET_POSTS, "posts"),
+        (BlogApiEndpointKeys.GET_POST_BY_ID, "posts"),
+        (BlogApiEndpointKeys.CREATE_POST, "posts"),
+        (BlogApiEndpointKeys.UPDATE_POST, "posts"),
+        (BlogApiEndpointKeys.DELETE_POST, "posts"),
+        (BlogApiEndpointKeys.GET_COMMENTS, "comments"),
+        (BlogApiEndpointKeys.GET_COMMENT_BY_ID, "comments"),
+        (BlogApiEndpointKeys.CREATE_COMMENT, "comments"),
+        (BlogApiEndpointKeys.UPDATE_COMMENT, "comments"),
+        (BlogApiEndpointKeys.DELETE_COMMENT, "comments"),
+        (BlogApiEndpointKeys.GET_PROFILE, "profile"),
+        (BlogApiEndpointKeys.UPDATE_PROFILE, "profile"),
+    ]
+]
+
+PRODUCTION_MIX = {
+    "name": "production mix",
+    "seed": PAYLOAD_POOL_SEED,
+    "operations": {
+        "GET_POSTS": {"weight": 70, "think_time": "exponential:20"},
+        "GET_COMMENT_BY_ID": {"weight": 15, "id": "comment", "think_time": "uniform:0:20"},
+        "CREATE_COMMENT": {"weight": 10, "payload": "comment"},
+        "UPDATE_PROFILE": {"weight": 5, "payload": "profile"},
+    },
+}
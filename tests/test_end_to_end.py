@@ -1,32 +1,29 @@
 import pytest
 from schemas import PostModel, CommentModel
 from core import HTTPStatusCodes, CommentFields, PostFields
+from helpers import Flow
 
 
 @pytest.mark.e2e
 @pytest.mark.posts
 @pytest.mark.comments
 @pytest.mark.flaky_regression
-def test_create_post_and_comment(helper_posts, helper_comments, new_post_payload, new_comment_payload):
-    """Test the full flow: create post -> create comment on post -> validate comment.
+def test_create_post_and_comment(helper_posts, helper_comments, leased_post, new_comment_payload):
+    """Test the full flow: post -> create comment on post -> validate comment.
+    The post comes from the test data pool; fetching it runs alongside creating and fetching the comment.
     """
-    pytest.logger.info("# Step 1: Create a new post")
-    created_post = helper_posts.create_post(payload=new_post_payload)
-    pytest.logger.info(f"Created post: {created_post}")
-
-    # Validate created post schema
-    post_obj = PostModel(**created_post)
-
-    pytest.logger.info("# Step 2: Create a comment related to the post")
-    new_comment_payload[CommentFields.POST_ID.value] = post_obj.id
-    created_comment = helper_comments.create_comment(payload=new_comment_payload)
-    pytest.logger.info(f"Created comment: {created_comment}")
-
-    # Validate created comment schema
-    comment_obj = CommentModel(**created_comment)
-
-    pytest.logger.info("# Step 3: Fetch the comment by ID and validate contents")
-    fetched_comment = helper_comments.get_comment_by_id(comment_id=comment_obj.id)
+    post_obj = PostModel(**leased_post)
+    flow = Flow("create post and comment")
+    flow.step("fetched_post", lambda: helper_posts.get_post_by_id(post_id=post_obj.id))
+    flow.step("comment", lambda: CommentModel(**helper_comments.create_comment(
+        payload={**new_comment_payload, CommentFields.POST_ID.value: post_obj.id})))
+    flow.step("fetched_comment", lambda comment: helper_comments.get_comment_by_id(comment_id=comment.id),
+              depends_on=["comment"])
+    result = flow.run()
+    fetched_comment = result["fetched_comment"]
+    pytest.logger.info(f"Leased post: {post_obj} | created comment: {result['comment']}")
+
+    assert result["fetched_post"][PostFields.ID.value] == post_obj.id
     assert fetched_comment[CommentFields.POST_ID.value] == post_obj.id, \
         (f"Comment postId does not match the created post ID. Expected response: {post_obj.id}. "
          f"Actual response:{fetched_comment[CommentFields.POST_ID.value]}")
@@ -38,13 +35,12 @@ def test_create_post_and_comment(helper_posts, helper_comments, new_post_payload
 @pytest.mark.e2e
 @pytest.mark.comments
 @pytest.mark.flaky_regression
-def test_create_update_delete_comment(helper_posts, helper_comments, new_post_payload, new_comment_payload,
-                                      faker_fixture):
-    """Test the full flow: create post -> create comment -> update comment -> delete comment -> validate deletion.
+def test_create_update_delete_comment(helper_comments, leased_post, new_comment_payload, faker_fixture):
+    """Test the full flow: post -> create comment -> update comment -> delete comment -> validate deletion.
     """
-    pytest.logger.info("# Step 1: Create a new post")
-    created_post = helper_posts.create_post(payload=new_post_payload)
-    pytest.logger.info(f"Created post: {created_post}")
+    pytest.logger.info("# Step 1: Lease a post from the test data pool")
+    created_post = leased_post
+    pytest.logger.info(f"Leased post: {created_post}")
 
     pytest.logger.info("# Step 2: Create a new comment on that post")
     new_comment_payload[CommentFields.POST_ID.value] = created_post["id"]
@@ -80,24 +76,19 @@ def test_create_update_delete_comment(helper_posts, helper_comments, new_post_pa
 @pytest.mark.comments
 @pytest.mark.flaky_regression
 def test_create_multiple_posts_and_comments(helper_posts, helper_comments, new_post_payload, new_comment_payload):
-    """Create multiple posts and comments, then validate postId relations."""
-    posts = []
-    pytest.logger.info("# Step 1: Create multiple posts")
-    for _ in range(2):
-        post = helper_posts.create_post(payload=new_post_payload)
-        posts.append(PostModel(**post))
-        pytest.logger.info(f"Created post: {post}")
-
-    comments = []
-    pytest.logger.info("# Step 2: Create multiple comments for the created posts")
-    for post in posts:
-        new_comment_payload[CommentFields.POST_ID.value] = post.id
-        comment = helper_comments.create_comment(payload=new_comment_payload)
-        comments.append(CommentModel(**comment))
+    """Create multiple posts and comments, then validate postId relations.
+    The posts are created concurrently, and each comment as soon as its post exists."""
+    flow = Flow("create multiple posts and comments")
+    for index in range(2):
+        flow.step(f"post_{index}", lambda: PostModel(**helper_posts.create_post(payload=new_post_payload)))
+        flow.step(f"comment_{index}", lambda post: CommentModel(**helper_comments.create_comment(
+            payload={**new_comment_payload, CommentFields.POST_ID.value: post.id})), depends_on=[f"post_{index}"])
+    result = flow.run()
+
+    pytest.logger.info("# Validate comments are linked to correct posts")
+    for index in range(2):
+        post, comment = result[f"post_{index}"], result[f"comment_{index}"]
         pytest.logger.info(f"Created comment for post {post.id}: {comment}")
-
-    pytest.logger.info("# Step 3: Validate comments are linked to correct posts")
-    for comment, post in zip(comments, posts):
         assert comment.postId == post.id, f"Comment postId mismatch. Expected: {post.id}, Actual: {comment.postId}"
 
 
@@ -105,28 +96,25 @@ def test_create_multiple_posts_and_comments(helper_posts, helper_comments, new_p
 @pytest.mark.posts
 @pytest.mark.comments
 @pytest.mark.flaky_regression
-def test_update_post_with_existing_comments(helper_posts, helper_comments, new_post_payload, new_comment_payload, faker_fixture):
-    """Create a post with comments, update the post, and validate comments are still linked."""
-    post = helper_posts.create_post(payload=new_post_payload)
-    post_obj = PostModel(**post)
-    pytest.logger.info(f"Created post: {post_obj}")
-
-    pytest.logger.info("# Step 1: Create comment attached to post")
-    new_comment_payload[CommentFields.POST_ID.value] = post_obj.id
-    comment = helper_comments.create_comment(payload=new_comment_payload)
-    comment_obj = CommentModel(**comment)
-    pytest.logger.info(f"Created comment: {comment_obj}")
-
-    pytest.logger.info("# Step 2: Update the post")
+def test_update_post_with_existing_comments(helper_posts, helper_comments, exclusive_post, new_comment_payload,
+                                            faker_fixture):
+    """Add a comment to a post, update the post, and validate the comment is still linked.
+    Creating the comment and updating the post run concurrently."""
     updated_payload = {
         PostFields.TITLE.value: faker_fixture.sentence(nb_words=5),
         PostFields.AUTHOR.value: faker_fixture.name()
     }
-    updated_post = helper_posts.update_post(post_id=post_obj.id, payload=updated_payload)
-    pytest.logger.info(f"Updated post: {updated_post}")
+    post_obj = PostModel(**exclusive_post)
+    flow = Flow("update post with existing comments")
+    flow.step("comment", lambda: CommentModel(**helper_comments.create_comment(
+        payload={**new_comment_payload, CommentFields.POST_ID.value: post_obj.id})))
+    flow.step("updated_post", lambda: helper_posts.update_post(post_id=post_obj.id, payload=updated_payload))
+    flow.step("fetched_comment", lambda comment, updated_post: helper_comments.get_comment_by_id(comment_id=comment.id),
+              depends_on=["comment", "updated_post"])
+    result = flow.run()
+    fetched_comment = result["fetched_comment"]
+    pytest.logger.info(f"Leased post: {post_obj} | updated post: {result['updated_post']}")
 
-    pytest.logger.info("# Step 3: Fetch the comment again")
-    fetched_comment = helper_comments.get_comment_by_id(comment_id=comment_obj.id)
     assert fetched_comment[CommentFields.POST_ID.value] == post_obj.id, \
         (f"Fetched comment postId mismatch after post update. Expected: {post_obj.id}, "
          f"Actual: {fetched_comment[CommentFields.POST_ID.value]}")
@@ -136,11 +124,10 @@ def test_update_post_with_existing_comments(helper_posts, helper_comments, new_p
 @pytest.mark.posts
 @pytest.mark.comments
 @pytest.mark.flaky_regression
-def test_delete_post_and_validate_comments(helper_posts, helper_comments, new_post_payload, new_comment_payload):
-    """Create post, comment, delete post, and try fetching comment."""
-    post = helper_posts.create_post(payload=new_post_payload)
-    post_obj = PostModel(**post)
-    pytest.logger.info(f"Created post: {post_obj}")
+def test_delete_post_and_validate_comments(helper_posts, helper_comments, exclusive_post, new_comment_payload):
+    """Comment on a post, delete the post, and try fetching the comment."""
+    post_obj = PostModel(**exclusive_post)
+    pytest.logger.info(f"Leased post: {post_obj}")
 
     pytest.logger.info("# Step 1: Create comment attached to post")
     new_comment_payload[CommentFields.POST_ID.value] = post_obj.id
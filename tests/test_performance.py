@@ -1,6 +1,17 @@
 import pytest
-from core import HTTPStatusCodes
+import allure
+from core import (HTTPStatusCodes, BlogApiEndpointKeys, BENCHMARK_UPDATE_BASELINE, phase_recorder, ResponseCache,
+                  RateGovernor, RetryPolicy, SOAK_DURATION_SECONDS, SoakResult, parse_drift_limits, live_metrics,
+                  MetricsExporter,
+                  SampleStore, COLUMNS, ENDPOINTS, sample_export_format)
+from core import sample_store as sample_store_module
+from test_data import BENCHMARK_ENDPOINTS, PRODUCTION_MIX
+from helpers import HelperPerformance, HelperPosts, HelperComments, Flow
 import threading
+import urllib.request
+import zipfile
+import ast
+from array import array
 
 
 @pytest.mark.performance
@@ -20,3 +31,311 @@ def test_rate_limiting_on_get_posts(helper_performance):
     assert failures >= 1, (
             f"Expected at least one {HTTPStatusCodes.TOO_MANY_REQUESTS.value} error under load"
         )
+
+
+@pytest.mark.performance
+@pytest.mark.posts
+def test_phase_timings_attribute_server_latency_to_ttfb(json_server_stub_factory):
+    """Call GET /posts on a stub that delays every response and expect the delay in time-to-first-byte."""
+    stub = json_server_stub_factory(latency="fixed:50")
+    HelperPosts(base_url=stub.base_url).get_posts()
+
+    slowest = phase_recorder.slowest()[0]
+    pytest.logger.info(f"[Phases] {slowest}")
+    assert slowest["endpoint"] == BlogApiEndpointKeys.GET_POSTS.value
+    assert slowest["ttfb_ms"] >= 50, f"Expected the injected 50ms latency in ttfb. Phases: {slowest}"
+    assert slowest["ttfb_ms"] > slowest["total_ms"] / 2, f"Expected ttfb to dominate the request. Phases: {slowest}"
+
+
+@pytest.mark.performance
+@pytest.mark.posts
+def test_response_cache_revalidates_reads_and_invalidates_on_write(json_server_stub_factory):
+    """Re-read a post through the conditional-GET cache, expect 304s, and a full read of the new data after an update."""
+    stub = json_server_stub_factory()
+    cache = ResponseCache()
+    helper_posts = HelperPosts(base_url=stub.base_url, cache=cache)
+
+    post = helper_posts.get_post_by_id(post_id=1)
+    for _ in range(3):
+        assert helper_posts.get_post_by_id(post_id=1) == post
+    assert (cache.misses, cache.revalidations) == (1, 3), f"Expected 1 full read and 3 revalidations. {cache.stats()}"
+    assert cache.bytes_saved > 0
+
+    updated_post = helper_posts.update_post(post_id=1, payload={"title": "Updated title", "author": post["author"]})
+    assert cache.invalidations >= 1, f"Expected UPDATE_POST to invalidate the cached post. {cache.stats()}"
+    assert helper_posts.get_post_by_id(post_id=1) == updated_post
+    pytest.logger.info(f"[Response Cache] {cache.format_stats()}")
+    assert stub.request_counts[BlogApiEndpointKeys.GET_POST_BY_ID.value] == 5
+
+
+@pytest.mark.performance
+@pytest.mark.posts
+def test_rate_limiting_on_stub_server(json_server_stub_factory):
+    """Send GET /posts above the stub server's token-bucket limit and expect 429s with Retry-After."""
+    stub = json_server_stub_factory(rate_limit=(20, 5))
+    helper_performance = HelperPerformance(threads=20, base_url=stub.base_url)
+    successes, failures, others = helper_performance.simulate_get_post_load(rate=100, duration=1)
+    pytest.logger.info(f"[Stub Rate Limit] {successes} successful | {failures} failed | {others} other")
+
+    assert failures >= 1, f"Expected at least one {HTTPStatusCodes.TOO_MANY_REQUESTS.value} from the rate-limited stub"
+    assert successes >= 1, "Expected the token bucket to let some requests through"
+    assert others == 0, \
+        f"Expected only 200 and 429 responses. Status counts: {helper_performance.last_result.status_counts()}"
+    assert failures == stub.rate_limited, \
+        f"Client saw {failures} rate-limited responses but the stub answered {stub.rate_limited}"
+
+
+@pytest.mark.performance
+@pytest.mark.posts
+def test_rate_governor_keeps_load_under_server_limit(json_server_stub_factory):
+    """Offer GET /posts above a stub's rate limit through a client rate governor below it and expect no 429s."""
+    stub = json_server_stub_factory(rate_limit=(20, 5))
+    helper_performance = HelperPerformance(threads=20, base_url=stub.base_url)
+    governor = helper_performance.controller.governor = RateGovernor(default_rate=(16, 4), workers=1)
+
+    successes, failures, others = helper_performance.simulate_get_post_load(rate=40, duration=1)
+    budget = governor.stats()[BlogApiEndpointKeys.GET_POSTS.value]
+    pytest.logger.info(f"[Rate Governor] {successes} successful | {failures} rate limited | {budget}")
+
+    assert failures == stub.rate_limited == 0, f"Expected the governor to prevent 429s. Governor: {budget}"
+    assert successes == helper_performance.last_result.total
+    assert budget["throttled"] > 0 and budget["waited_s"] > 0, f"Expected requests to wait. Governor: {budget}"
+
+
+@pytest.mark.performance
+@pytest.mark.posts
+def test_request_retries_absorb_transient_errors(json_server_stub_factory):
+    """Read posts from a stub failing 30% of its responses with 503: GETs succeed by retrying, POSTs are never retried."""
+    stub = json_server_stub_factory(error_rate=0.3, error_status=HTTPStatusCodes.SERVICE_UNAVAILABLE.value, seed=1)
+    helper_posts = HelperPosts(base_url=stub.base_url)
+    policy = helper_posts.controller.retry_policy = RetryPolicy(max_attempts=5, backoff_base=0.001, budget_min=100,
+                                                                seed=1)
+    for _ in range(20):
+        helper_posts.get_post_by_id(post_id=1)
+    pytest.logger.info(f"[Retries] {policy.format_stats()}")
+    assert policy.retries == stub.injected_errors > 0, \
+        f"Expected every injected 503 to be retried. Stub errors: {stub.injected_errors}, {policy.stats()}"
+
+    statuses = [helper_posts.controller.request(BlogApiEndpointKeys.CREATE_POST, payload={"title": "t", "author": "a"})
+                for _ in range(10)]
+    assert all(response.retries == 0 for response in statuses), "Expected POST requests not to be retried"
+    assert HTTPStatusCodes.SERVICE_UNAVAILABLE.value in {response.status_code for response in statuses}
+
+
+@pytest.mark.performance
+@pytest.mark.e2e
+def test_flow_finishes_in_critical_path_time(json_server_stub_factory):
+    """Run a flow of one post read fanning out to four independent reads on a 50ms stub, expect critical-path time."""
+    stub = json_server_stub_factory(latency="fixed:50")
+    helper_posts, helper_comments = HelperPosts(base_url=stub.base_url), HelperComments(base_url=stub.base_url)
+
+    flow = Flow("fan out reads")
+    flow.step("post", lambda: helper_posts.get_post_by_id(post_id=1))
+    for index in range(4):
+        flow.step(f"comments_{index}", lambda post: helper_comments.get_comments(), depends_on=["post"])
+    result = flow.run()
+
+    assert len(result.critical_path) == 2, f"Expected the post and one read on the critical path: {result.timeline()}"
+    assert result.wall_seconds < result.sequential_seconds * 0.6, \
+        f"Expected independent steps to overlap. {result.summary()}"
+    assert result.wall_seconds < result.critical_path_seconds * 1.5, f"Expected critical-path time. {result.summary()}"
+
+
+@pytest.mark.performance
+@pytest.mark.posts
+@pytest.mark.flaky_regression
+def test_async_get_posts_load(helper_performance):
+    """Send GET /posts at a constant arrival rate from an asyncio event loop and expect all requests to succeed."""
+    successes, failures, others = helper_performance.simulate_get_post_load(use_asyncio=True)
+    result = helper_performance.last_result
+    pytest.logger.info(f"[Async Load] {successes} successful | {failures} failed | {others} other")
+
+    assert successes == result.total, \
+        f"Expected {result.total} successful responses. Actual: {successes} (failed: {failures}, other: {others})"
+
+
+@pytest.mark.performance
+@pytest.mark.posts
+@pytest.mark.flaky_regression
+def test_multiprocess_get_posts_load(helper_performance):
+    """Split a constant-rate GET /posts load across worker processes and expect all requests to succeed."""
+    result = helper_performance.simulate_constant_rate_multiprocess(BlogApiEndpointKeys.GET_POSTS, processes=2)
+    successes, failures, others = result.count_statuses(HTTPStatusCodes.OK.value,
+                                                        HTTPStatusCodes.TOO_MANY_REQUESTS.value)
+    pytest.logger.info(f"[Multiprocess Load] {successes} successful | {failures} failed | {others} other")
+
+    assert successes == result.total, \
+        f"Expected {result.total} successful responses. Actual: {successes} (status counts: {result.status_counts()})"
+
+
+@pytest.mark.performance
+def test_workload_mix_follows_scenario_weights(json_server_stub_factory):
+    """Run the production traffic mix against a stub, expect every operation at about its weight and no errors."""
+    stub = json_server_stub_factory()
+    helper_performance = HelperPerformance(threads=20, base_url=stub.base_url)
+    result = helper_performance.simulate_scenario(PRODUCTION_MIX, rate=100, duration=2)
+
+    assert result.load.count_statuses(HTTPStatusCodes.OK.value, HTTPStatusCodes.CREATED.value)[2] == 0, \
+        f"Expected only 200 and 201 responses. Status counts: {result.load.status_counts()}"
+    for operation in result.scenario.operations:
+        share, achieved = result.scenario.share(operation), result.achieved_share(operation.name)
+        assert abs(achieved - share) < 0.1, f"{operation.name} sent {achieved:.0%}, expected about {share:.0%}"
+
+
+@pytest.mark.performance
+@pytest.mark.posts
+def test_capacity_search_finds_server_rate_limit(json_server_stub_factory, record_property):
+    """Search the capacity of a stub limited to 40 requests per second, expect it close to the limit."""
+    stub = json_server_stub_factory(rate_limit=(40, 5))
+    helper_performance = HelperPerformance(threads=20, base_url=stub.base_url)
+    result = helper_performance.find_capacity(step_duration=1, start_rps=10, max_rps=160, precision=0.1)
+    record_property("capacity_rps", result.capacity_rps)
+    allure.attach(result.table(), name="Capacity search steps", attachment_type=allure.attachment_type.TEXT)
+
+    assert result.capacity_rps is not None and 30 <= result.capacity_rps <= 45, \
+        f"Expected a capacity close to the 40 rps limit.\n{result.table()}"
+    assert any(not step["passed"] for step in result.steps), f"Expected the search to hit the limit.\n{result.table()}"
+
+
+@pytest.mark.performance
+@pytest.mark.posts
+def test_live_metrics_export_load_run(json_server_stub_factory, tmp_path):
+    """Export the counters of a GET /posts load run over HTTP and to a file, expect OpenMetrics text with every request."""
+    stub = json_server_stub_factory()
+    helper_performance = HelperPerformance(threads=10, base_url=stub.base_url)
+    exporter = MetricsExporter(directory=str(tmp_path), port=0, file_path=str(tmp_path / "live.prom"))
+    was_enabled, live_metrics.enabled = live_metrics.enabled, True
+    exporter.start()
+    try:
+        helper_performance.simulate_get_post_load(rate=50, duration=1)
+        live_metrics.publish(str(tmp_path))
+        exporter.collect()
+        with urllib.request.urlopen(exporter.url) as response:
+            content_type, body = response.headers["Content-Type"], response.read().decode()
+    finally:
+        live_metrics.enabled = was_enabled
+        exporter.stop()
+
+    metrics = dict(line.rsplit(" ", 1) for line in body.splitlines() if not line.startswith("#"))
+    assert content_type.startswith("application/openmetrics-text") and body.endswith("# EOF\n")
+    assert int(metrics['blog_api_requests_total{endpoint="GET_POSTS"}']) >= 50, body
+    assert int(metrics['blog_api_responses_total{endpoint="GET_POSTS",status="200"}']) >= 50, body
+    assert int(metrics['blog_api_request_duration_seconds_count{endpoint="GET_POSTS"}']) >= 50, body
+    assert metrics['blog_api_in_flight_requests{endpoint="GET_POSTS"}'] == "0", body
+    assert int(metrics["blog_api_scheduler_lag_seconds_count"]) >= 50, body
+    assert (tmp_path / "live.prom").read_text() == body
+
+
+@pytest.mark.performance
+@pytest.mark.posts
+def test_sample_store_keeps_every_request_compactly(json_server_stub_factory, tmp_path):
+    """Store the samples of a GET /posts load run in spilled columns, expect 19 bytes per request and an NPZ export."""
+    stub = json_server_stub_factory()
+    helper_performance = HelperPerformance(threads=10, base_url=stub.base_url)
+    store = helper_performance.controller.sample_store = SampleStore(str(tmp_path / "samples"), chunk_samples=16)
+    helper_performance.simulate_get_post_load(rate=100, duration=1)
+    store.flush()
+
+    samples = SampleStore.load(str(tmp_path / "samples"))
+    try:
+        assert len(samples) == len(store) == 100
+        assert set(samples.column("status")) == {HTTPStatusCodes.OK.value}
+        assert set(samples.column("endpoint")) == {ENDPOINTS.index(BlogApiEndpointKeys.GET_POSTS.value)}
+        assert min(samples.column("bytes")) > 0 and min(samples.column("latency")) > 0
+        on_disk = sum(path.stat().st_size for path in (tmp_path / "samples").glob("*/*.bin"))
+        assert on_disk == 100 * sum(array(typecode).itemsize for typecode in COLUMNS.values()) == 1900
+
+        with zipfile.ZipFile(samples.to_npz(str(tmp_path / "samples.npz"))) as archive:
+            data = archive.read("status.npy")
+    finally:
+        samples.close()
+    header_length = int.from_bytes(data[8:10], "little")
+    header = ast.literal_eval(data[10:10 + header_length].decode("latin1"))
+    assert (10 + header_length) % 64 == 0 and header["shape"] == (100,)
+    assert set(array("H", data[10 + header_length:])) == {HTTPStatusCodes.OK.value}
+
+
+@pytest.mark.performance
+def test_parquet_sample_export_without_pyarrow_falls_back_to_npz(tmp_path, monkeypatch):
+    """Request a Parquet export without pyarrow, expect the run to be told up front and to export NPZ instead."""
+    monkeypatch.setattr(sample_store_module, "pyarrow", None)
+    export_format, warning = sample_export_format("parquet")
+    assert export_format == "npz" and "pyarrow" in warning
+
+    store = SampleStore(str(tmp_path / "samples"))
+    store.append(BlogApiEndpointKeys.GET_POSTS, HTTPStatusCodes.OK.value, 0.01, 100)
+    store.flush()
+    samples = SampleStore.load(str(tmp_path / "samples"))
+    try:
+        with pytest.raises(ImportError, match="pyarrow"):
+            samples.export(str(tmp_path / "samples"), "parquet")
+        assert samples.export(str(tmp_path / "samples"), export_format) == str(tmp_path / "samples.npz")
+    finally:
+        samples.close()
+
+
+@pytest.mark.performance
+@pytest.mark.soak
+@pytest.mark.skipif(not SOAK_DURATION_SECONDS, reason="Set SOAK_DURATION_SECONDS to run the soak test")
+def test_soak_mixed_workload(helper_performance):
+    """Run a steady mixed workload for SOAK_DURATION_SECONDS, expect latency and memory/fd usage not to drift upward."""
+    result = helper_performance.soak()
+    assert not result.drifts, f"Resource or latency drift: {result.drifts}. {result.summary()}"
+    errors = sum(window["errors"] for window in result.windows)
+    assert errors == 0, f"Expected no failed requests during the soak run. {result.summary()}"
+
+
+def soak_windows(client_rss_mb):
+    """Synthetic soak windows ten minutes apart, flat except for the given client RSS per window."""
+    return [{"elapsed_s": 600 * (index + 1), "requests": 100, "errors": 0, "p50_ms": 5.0, "p99_ms": 20.0,
+             "client_rss_mb": rss, "client_fds": 12, "server_rss_mb": 80.0}
+            for index, rss in enumerate(client_rss_mb)]
+
+
+@pytest.mark.performance
+@pytest.mark.soak
+def test_soak_result_flags_rising_memory_only():
+    """A run whose client RSS only jumps in the warm-up window is stable, one growing 10 MB per window drifts."""
+    limits = parse_drift_limits("")
+    flat = SoakResult(soak_windows([40, 100, 100.5, 99.8, 100.2, 100]), limits)
+    rising = SoakResult(soak_windows([40, 100, 110, 120, 130, 140]), limits)
+
+    assert flat.drifts == [], f"Expected no drift after the warm-up. {flat.summary()}"
+    assert len(rising.drifts) == 1 and rising.drifts[0].startswith("client_rss_mb grows 60.0/h"), \
+        f"Expected only client RSS to drift. Actual: {rising.drifts}"
+
+
+@pytest.mark.performance
+@pytest.mark.soak
+def test_short_soak_run_on_stub(json_server_stub_factory):
+    """Soak the stub for three half-second windows, expect every window measured and no failed requests.
+    Ten requests per window are too few for stable percentiles, so drift is checked on synthetic windows above."""
+    stub = json_server_stub_factory()
+    helper_performance = HelperPerformance(threads=5, base_url=stub.base_url)
+    result = helper_performance.soak(duration=1.5, window=0.5, rate=20)
+
+    assert len(result.windows) == 3, result.summary()
+    assert all(window["requests"] and window["client_rss_mb"] for window in result.windows), result.windows
+    assert sum(window["errors"] for window in result.windows) == 0, result.summary()
+    assert result.warmup_windows == 1 and set(result.slopes()) == set(result.limits), result.summary()
+    with pytest.raises(ValueError, match="at least 3 windows"):
+        helper_performance.soak(duration=1, window=0.5, rate=20)
+
+
+@pytest.mark.performance
+@pytest.mark.parametrize("endpoint_key", BENCHMARK_ENDPOINTS)
+def test_endpoint_benchmark(helper_benchmark, benchmark_baseline, endpoint_key):
+    """Benchmark one API route and fail if its p95 latency or throughput regressed beyond the baseline tolerance."""
+    result = helper_benchmark.benchmark_endpoint(endpoint_key)
+    successes, failures, others = result.count_statuses(helper_benchmark.expected_status(endpoint_key), None)
+    assert successes == result.total, \
+        f"Expected {result.total} successful {endpoint_key.value} responses. Actual: {successes} " \
+        f"(status counts: {result.status_counts()})"
+
+    if BENCHMARK_UPDATE_BASELINE:
+        entry = benchmark_baseline.update(endpoint_key.value, result)
+        pytest.logger.info(f"Updated baseline for {endpoint_key.value}: {entry}")
+        return
+
+    regressions = benchmark_baseline.check(endpoint_key.value, result)
+    assert not regressions, "Benchmark gate failed:\n" + "\n".join(regressions)
@@ -1,6 +1,7 @@
 import pytest
-from schemas import PostModel
-from core import NONEXISTENT_ID, HTTPStatusCodes, PostFields
+import asyncio
+from schemas import PostModel, validate_posts
+from core import NONEXISTENT_ID, HTTPStatusCodes, PostFields, async_session_pool
 from pydantic_core._pydantic_core import ValidationError
 from test_data import NEGATIVE_POST_PAYLOADS
 
@@ -20,17 +21,35 @@ def test_get_all_posts(helper_posts):
 @pytest.mark.schema
 @pytest.mark.posts
 @pytest.mark.flaky_regression
-def test_post_response_matches_schema(helper_posts, new_post_payload):
-    """Ensure that a newly created post response conforms to the defined schema."""
-    create_post_response = helper_posts.create_post(payload=new_post_payload)
-    pytest.logger.info(f"Created post for schema validation: {create_post_response}")
+def test_post_response_matches_schema(leased_post):
+    """Ensure that a created post response (the pooled post's) conforms to the defined schema."""
+    pytest.logger.info(f"Leased post for schema validation: {leased_post}")
     try:
-        PostModel(**create_post_response)
+        PostModel(**leased_post)
     except ValidationError as e:
         pytest.logger.error(f"PostModel response schema has failed: {e}")
         pytest.fail(f"Schema validation failed for PostModel: {e}")
 
 
+@pytest.mark.schema
+@pytest.mark.posts
+def test_validate_posts_reports_failing_rows():
+    """Validate a raw JSON post collection in one call, expect only the invalid rows reported, by index and field."""
+    valid_rows = b'[{"id": "1", "title": "First", "author": "Ann"}, {"id": "4", "title": "Fourth", "author": "Bo"}]'
+    result = validate_posts(valid_rows)
+    assert result.is_valid and result.total == 2, result.error_summary()
+    assert [post.id for post in result.items] == ["1", "4"]
+
+    raw = (b'[{"id": "1", "title": "First", "author": "Ann"}, {"id": 2, "title": "Second", "author": "Ann"},'
+           b' {"id": "3", "title": "Third"}, {"id": "4", "title": "Fourth", "author": "Bo"}]')
+    result = validate_posts(raw)
+    pytest.logger.info(result.error_summary())
+    assert result.total == 4 and not result.items
+    assert result.failed_rows.keys() == {1, 2}, f"Expected rows 1 and 2 to fail. {result.error_summary()}"
+    assert [error["loc"] for error in result.failed_rows[1]] == [(PostFields.ID.value,)]
+    assert [error["loc"] for error in result.failed_rows[2]] == [(PostFields.AUTHOR.value,)]
+
+
 @pytest.mark.posts
 @pytest.mark.flaky_regression
 def test_create_post(helper_posts, new_post_payload):
@@ -51,10 +70,45 @@ def test_create_post(helper_posts, new_post_payload):
 
 @pytest.mark.posts
 @pytest.mark.flaky_regression
-def test_update_post(helper_posts, new_post_payload, faker_fixture):
+def test_bulk_create_posts(helper_posts):
+    """Seed several posts concurrently and validate every one was created with a unique ID."""
+    created_posts = helper_posts.bulk_create_posts(20, max_parallel=5)
+    pytest.logger.info(f"Bulk created {len(created_posts)} posts")
+
+    created_ids = {post[PostFields.ID.value] for post in created_posts}
+    assert len(created_ids) == 20, f"Expected 20 unique post IDs. Actual: {len(created_ids)}"
+
+
+@pytest.mark.posts
+@pytest.mark.flaky_regression
+def test_bulk_create_posts_streams_results(helper_posts):
+    """Seed posts handing each created post to a callback, expect nothing collected and every post seen once."""
+    created_ids = set()
+    created = helper_posts.bulk_create_posts(20, max_parallel=5,
+                                             on_result=lambda post: created_ids.add(post[PostFields.ID.value]))
+    assert created == 20, f"Expected 20 posts reported as created. Actual: {created}"
+    assert len(created_ids) == 20, f"Expected 20 unique post IDs streamed. Actual: {len(created_ids)}"
+
+
+@pytest.mark.posts
+@pytest.mark.flaky_regression
+def test_bulk_create_posts_from_payload_pool(helper_posts, payload_pool):
+    """Seed posts with payloads from the shared payload pool and validate the server stored them unchanged."""
+    payloads = [payload_pool.next_post_payload() for _ in range(20)]
+    created_posts = helper_posts.bulk_create_posts(len(payloads), payload_factory=payloads.__getitem__,
+                                                   max_parallel=5)
+
+    created = sorted((post[PostFields.TITLE.value], post[PostFields.AUTHOR.value]) for post in created_posts)
+    expected = sorted((payload[PostFields.TITLE.value], payload[PostFields.AUTHOR.value]) for payload in payloads)
+    assert created == expected, "Created posts do not match the pooled payloads"
+
+
+@pytest.mark.posts
+@pytest.mark.flaky_regression
+def test_update_post(helper_posts, exclusive_post, faker_fixture):
     """Ensure that a post can be updated via PUT /posts/{id}."""
-    create_post_response = helper_posts.create_post(payload=new_post_payload)
-    pytest.logger.info(f"Created post to update: {create_post_response}")
+    create_post_response = exclusive_post
+    pytest.logger.info(f"Leased post to update: {create_post_response}")
 
     updated_payload = {
         PostFields.TITLE.value: faker_fixture.sentence(nb_words=5),
@@ -70,10 +124,10 @@ def test_update_post(helper_posts, new_post_payload, faker_fixture):
 
 @pytest.mark.posts
 @pytest.mark.flaky_regression
-def test_delete_post(helper_posts, new_post_payload):
+def test_delete_post(helper_posts, exclusive_post):
     """Ensure a post can be deleted via DELETE /posts/{id}."""
-    create_post_response = helper_posts.create_post(payload=new_post_payload)
-    pytest.logger.info(f"Created post to delete: {create_post_response}")
+    create_post_response = exclusive_post
+    pytest.logger.info(f"Leased post to delete: {create_post_response}")
 
     delete_post_response = helper_posts.delete_post(post_id=create_post_response[PostFields.ID.value])
     pytest.logger.info(f"Deleted post: {delete_post_response}")
@@ -86,6 +140,21 @@ def test_delete_post(helper_posts, new_post_payload):
     pytest.logger.info(f"Verified post with ID {create_post_response[PostFields.ID.value]} is deleted")
 
 
+@pytest.mark.posts
+@pytest.mark.flaky_regression
+def test_async_post_helpers_close_their_sessions(helper_posts, new_post_payload):
+    """Create, fetch and delete a post with the async helpers, each on its own event loop, expect no session left open."""
+    created_post = asyncio.run(helper_posts.create_post_async(payload=new_post_payload))
+    fetched_post = asyncio.run(helper_posts.get_post_by_id_async(post_id=created_post[PostFields.ID.value]))
+    assert fetched_post == created_post, f"Expected the created post back. Actual: {fetched_post}"
+
+    asyncio.run(helper_posts.delete_post_async(post_id=created_post[PostFields.ID.value]))
+    helper_posts.get_post_by_id(post_id=created_post[PostFields.ID.value],
+                                expected_status=HTTPStatusCodes.NOT_FOUND.value)
+    open_sessions = async_session_pool.open_sessions()
+    assert not open_sessions, f"Expected every event loop to close its session. Open: {len(open_sessions)}"
+
+
 @pytest.mark.posts
 @pytest.mark.negative
 @pytest.mark.flaky_regression
@@ -107,10 +176,10 @@ def test_get_nonexistent_post_returns_404(helper_posts):
 @pytest.mark.posts
 @pytest.mark.negative
 @pytest.mark.flaky_regression
-def test_delete_post_twice_returns_404(helper_posts, new_post_payload):
+def test_delete_post_twice_returns_404(helper_posts, exclusive_post):
     """Ensure deleting the same post twice yields a 404 the second time."""
-    created_post = helper_posts.create_post(payload=new_post_payload)
-    pytest.logger.info(f"Created post for delete-twice test: {created_post}")
+    created_post = exclusive_post
+    pytest.logger.info(f"Leased post for delete-twice test: {created_post}")
 
     helper_posts.delete_post(post_id=created_post[PostFields.ID.value])
     pytest.logger.info("First delete successful")
@@ -125,16 +194,16 @@ def test_delete_post_twice_returns_404(helper_posts, new_post_payload):
 @pytest.mark.parametrize(
     "payload, is_update, expected_status, test_title", NEGATIVE_POST_PAYLOADS
 )
-def test_post_payload_negative_cases(helper_posts, new_post_payload, create_valid_post, payload, is_update,
-                                     expected_status, test_title):
+def test_post_payload_negative_cases(helper_posts, test_data_pool, payload, is_update, expected_status, test_title):
     """Test various invalid payloads for create and update post operations."""
     pytest.logger.info(f"Running test {test_title}")
     if is_update:
-        pytest.logger.info(f"Trying to update post ID {create_valid_post[PostFields.ID.value]} with payload: {payload}")
-        helper_posts.update_post(
-            post_id=create_valid_post[PostFields.ID.value],
-            payload=payload,
-            expected_status=expected_status)
+        with test_data_pool.lease_post(exclusive=True) as post:
+            pytest.logger.info(f"Trying to update post ID {post[PostFields.ID.value]} with payload: {payload}")
+            helper_posts.update_post(
+                post_id=post[PostFields.ID.value],
+                payload=payload,
+                expected_status=expected_status)
     else:
         pytest.logger.info(f"Trying to create post with payload: {payload}")
         helper_posts.create_post(payload=payload, expected_status=expected_status)